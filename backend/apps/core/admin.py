@@ -1,9 +1,11 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.html import format_html
+from .catalogo import anotar_conteos
 from .models import (
     Usuario, Materia, Competencia, Pregunta, Sesion, 
-    RespuestaUsuario, Clase, Asignacion, Insignia, LogroUsuario
+    RespuestaUsuario, Clase, Asignacion, Insignia, LogroUsuario,
+    ImportacionPreguntas
 )
 
 
@@ -38,9 +40,13 @@ class MateriaAdmin(admin.ModelAdmin):
     search_fields = ('nombre', 'nombre_display')
     ordering = ('nombre',)
     
+    def get_queryset(self, request):
+        return anotar_conteos(super().get_queryset(request))
+    
     def preguntas_count(self, obj):
-        return obj.preguntas.count()
+        return obj.preguntas_total
     preguntas_count.short_description = 'Preguntas'
+    preguntas_count.admin_order_field = 'preguntas_total'
 
 
 @admin.register(Competencia)
@@ -48,12 +54,17 @@ class CompetenciaAdmin(admin.ModelAdmin):
     """Admin para el modelo Competencia"""
     list_display = ('nombre', 'materia', 'peso_icfes', 'preguntas_count')
     list_filter = ('materia', 'peso_icfes')
+    list_select_related = ('materia',)
     search_fields = ('nombre', 'materia__nombre')
     ordering = ('materia__nombre', 'nombre')
     
+    def get_queryset(self, request):
+        return anotar_conteos(super().get_queryset(request))
+    
     def preguntas_count(self, obj):
-        return obj.preguntas.count()
+        return obj.preguntas_total
     preguntas_count.short_description = 'Preguntas'
+    preguntas_count.admin_order_field = 'preguntas_total'
 
 
 @admin.register(Pregunta)
@@ -190,3 +201,13 @@ class LogroUsuarioAdmin(admin.ModelAdmin):
     search_fields = ('usuario__username', 'insignia__nombre')
     ordering = ('-fecha_obtenido',)
     readonly_fields = ('fecha_obtenido',)
+
+
+@admin.register(ImportacionPreguntas)
+class ImportacionPreguntasAdmin(admin.ModelAdmin):
+    """Admin para el modelo ImportacionPreguntas"""
+    list_display = ('nombre_archivo', 'usuario', 'estado', 'procesadas', 'exitosas', 'errores', 'fecha_creacion')
+    list_filter = ('estado', 'formato', 'fecha_creacion')
+    search_fields = ('nombre_archivo', 'usuario__username')
+    ordering = ('-fecha_creacion',)
+    readonly_fields = ('total', 'procesadas', 'exitosas', 'errores', 'fecha_creacion', 'fecha_inicio', 'fecha_fin')
@@ -0,0 +1,81 @@
+"""
+Utilidades de cache compartidas por ``core``, ``simulacion`` y ``reportes``.
+
+Funcionan con cualquier backend de ``settings.CACHES`` (ver
+``CACHE_BACKEND``); con uno compartido entre procesos (redis, file, db) los
+workers reutilizan lo que otro ya calculó.
+
+- Versiones por espacio: ``version`` y ``clave_versionada`` arman claves que
+  incluyen el número de versión de un espacio (p. ej. el roster de un
+  docente); ``invalidar`` lo incrementa y todas las claves anteriores dejan
+  de usarse sin tener que borrarlas una por una.
+- Protección contra estampidas: ``obtener_o_calcular`` deja que un solo
+  proceso recalcule una clave vencida (candado con ``cache.add``) mientras los
+  demás esperan brevemente el resultado.
+"""
+import time
+
+from django.core.cache import cache
+
+CLAVE_VERSION = '{}:version'
+CLAVE_CANDADO = '{}:candado'
+TIEMPO_CANDADO = 30
+ESPERA_CANDADO = 2
+INTERVALO_ESPERA = 0.05
+
+_AUSENTE = object()
+
+
+def version(espacio):
+    """Versión actual del espacio; arranca en 1 y no expira"""
+    clave = CLAVE_VERSION.format(espacio)
+    actual = cache.get(clave)
+    if actual is None:
+        cache.add(clave, 1, None)
+        actual = cache.get(clave, 1)
+    return actual
+
+
+def invalidar(*espacios):
+    """Incrementa la versión de cada espacio, descartando sus claves"""
+    for espacio in set(espacios):
+        clave = CLAVE_VERSION.format(espacio)
+        try:
+            cache.incr(clave)
+        except ValueError:
+            cache.set(clave, 2, None)
+
+
+def clave_versionada(espacio, *partes):
+    """Clave del espacio con su versión actual, p. ej. ``reportes:roster:7:v3``"""
+    return ':'.join([espacio, f'v{version(espacio)}', *map(str, partes)])
+
+
+def obtener_o_calcular(clave, calcular, timeout):
+    """
+    Retorna el valor cacheado en ``clave`` o lo calcula con ``calcular()``.
+
+    Si otro proceso ya está calculando la misma clave, espera hasta
+    ``ESPERA_CANDADO`` segundos a que aparezca antes de calcularla por su
+    cuenta.
+    """
+    valor = cache.get(clave, _AUSENTE)
+    if valor is not _AUSENTE:
+        return valor
+
+    candado = CLAVE_CANDADO.format(clave)
+    if not cache.add(candado, 1, TIEMPO_CANDADO):
+        limite = time.monotonic() + ESPERA_CANDADO
+        while time.monotonic() < limite:
+            time.sleep(INTERVALO_ESPERA)
+            valor = cache.get(clave, _AUSENTE)
+            if valor is not _AUSENTE:
+                return valor
+        return calcular()
+
+    try:
+        valor = calcular()
+        cache.set(clave, valor, timeout)
+        return valor
+    finally:
+        cache.delete(candado)
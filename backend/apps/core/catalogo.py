@@ -0,0 +1,95 @@
+"""
+Conteos de preguntas del catálogo de materias y competencias.
+
+``anotar_conteos`` agrega a un queryset de ``Materia`` o ``Competencia`` los
+conteos de sus preguntas (total, activas y activas por dificultad) en la
+misma consulta. ``conteos_catalogo`` guarda en el cache los conteos de todo
+el catálogo, para serializar materias o competencias sueltas (p. ej. la
+materia anidada en una sesión) sin consultar la base de datos.
+
+Las señales de ``Pregunta``, ``Competencia`` y ``Materia`` y las
+importaciones masivas llaman ``invalidar_catalogo``.
+"""
+from django.db.models import Count, Q
+
+from . import cache
+from .models import Competencia, Materia, Pregunta
+
+ESPACIO_CATALOGO = 'core:catalogo'
+TIEMPO_CATALOGO = 60 * 60
+
+DIFICULTADES = [valor for valor, _ in Pregunta.DIFICULTAD_CHOICES]
+
+
+def _anotaciones():
+    anotaciones = {
+        'preguntas_total': Count('preguntas'),
+        'preguntas_activas': Count('preguntas', filter=Q(preguntas__activa=True)),
+    }
+    for dificultad in DIFICULTADES:
+        anotaciones[f'preguntas_{dificultad}'] = Count(
+            'preguntas', filter=Q(preguntas__activa=True, preguntas__dificultad=dificultad)
+        )
+    return anotaciones
+
+
+def anotar_conteos(queryset):
+    """Agrega a ``queryset`` los conteos que lee ``conteos_de``"""
+    return queryset.annotate(**_anotaciones())
+
+
+def _conteos_fila(fila):
+    return {
+        'total': fila['preguntas_total'],
+        'activas': fila['preguntas_activas'],
+        'por_dificultad': {dificultad: fila[f'preguntas_{dificultad}'] for dificultad in DIFICULTADES},
+    }
+
+
+def _calcular_catalogo():
+    return {
+        'materias': {
+            fila['id']: _conteos_fila(fila)
+            for fila in Materia.objects.annotate(**_anotaciones()).values('id', *_anotaciones())
+        },
+        'competencias': {
+            fila['id']: _conteos_fila(fila)
+            for fila in Competencia.objects.annotate(**_anotaciones()).values('id', *_anotaciones())
+        },
+    }
+
+
+def conteos_catalogo():
+    """Conteos de todas las materias y competencias, por id, desde el cache"""
+    return cache.obtener_o_calcular(
+        cache.clave_versionada(ESPACIO_CATALOGO, 'conteos'),
+        _calcular_catalogo,
+        TIEMPO_CATALOGO
+    )
+
+
+def conteos_de(obj):
+    """
+    Conteos de preguntas de una materia o competencia: los anotados con
+    ``anotar_conteos`` si los tiene, si no los del catálogo cacheado. Se
+    guardan en la instancia para no repetir la búsqueda por cada campo.
+    """
+    conteos = getattr(obj, '_conteos_preguntas', None)
+    if conteos is not None:
+        return conteos
+    if hasattr(obj, 'preguntas_total'):
+        conteos = _conteos_fila({
+            columna: getattr(obj, columna) for columna in _anotaciones()
+        })
+    else:
+        seccion = 'materias' if isinstance(obj, Materia) else 'competencias'
+        conteos = conteos_catalogo()[seccion].get(obj.pk) or _conteos_fila(
+            dict.fromkeys(_anotaciones(), 0)
+        )
+    obj._conteos_preguntas = conteos
+    return conteos
+
+
+def invalidar_catalogo():
+    """Descarta los conteos cacheados del catálogo"""
+    cache.invalidar(ESPACIO_CATALOGO)
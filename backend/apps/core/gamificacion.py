@@ -0,0 +1,236 @@
+"""
+Procesamiento de los eventos de gamificación fuera de la request.
+
+Las señales de ``RespuestaUsuario``, ``Sesion`` y ``LogroUsuario`` solo
+registran un ``EventoGamificacion`` (bandeja de salida) en la transacción de
+la request. Al confirmarse, un hilo del propio proceso (sin broker) toma los
+eventos pendientes por lotes y, en una transacción por lote:
+
+- suma los puntos de cada usuario con ``F()``, una actualización por cada
+  delta distinto en lugar de un ``usuario.save()`` por respuesta;
+- otorga las insignias de sesión (primera sesión, alto rendimiento, racha
+  semanal) con un ``bulk_create`` para todos los usuarios del lote;
+- evalúa ``Insignia.evaluar_criterio`` para los usuarios con logros nuevos,
+  en cascada hasta que no se otorgue ninguno más;
+- elimina los eventos aplicados.
+
+Como los eventos viven en la base de datos, los que queden pendientes si el
+proceso se reinicia se aplican con el comando ``procesar_gamificacion``. Con
+``GAMIFICACION_EN_SEGUNDO_PLANO`` en False se aplican en línea.
+"""
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+
+from .models import EventoGamificacion, Insignia, LogroUsuario
+
+logger = logging.getLogger(__name__)
+
+PUNTOS_RESPUESTA_CORRECTA = 10
+TAMANO_LOTE = 500
+PUNTAJE_ALTO = 80
+DIAS_RACHA_SEMANAL = 7
+
+# Insignias que otorga completar una sesión; se crean la primera vez que se usan
+INSIGNIAS_SESION = {
+    'primera_sesion': {
+        'nombre': 'Primera Sesión',
+        'defaults': {
+            'descripcion': 'Completaste tu primera sesión de práctica',
+            'icono': 'star',
+            'color': '#10b981',
+            'criterio': {'tipo': 'primera_sesion'},
+            'puntos': 50
+        },
+    },
+    'puntaje_alto': {
+        'nombre': 'Alto Rendimiento',
+        'defaults': {
+            'descripcion': 'Obtuviste un puntaje de 80% o más',
+            'icono': 'trophy',
+            'color': '#f59e0b',
+            'criterio': {'tipo': 'puntaje_alto', 'minimo': PUNTAJE_ALTO},
+            'puntos': 100
+        },
+    },
+    'racha_semana': {
+        'nombre': 'Racha Semanal',
+        'defaults': {
+            'descripcion': 'Practicaste 7 días seguidos',
+            'icono': 'fire',
+            'color': '#ef4444',
+            'criterio': {'tipo': 'racha', 'dias': DIAS_RACHA_SEMANAL},
+            'puntos': 200
+        },
+    },
+}
+
+_ejecutor = None
+_programado = False
+_candado = threading.Lock()
+
+
+def _obtener_ejecutor():
+    global _ejecutor
+    with _candado:
+        if _ejecutor is None:
+            _ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gamificacion')
+        return _ejecutor
+
+
+def registrar_evento(usuario_id, tipo, puntos=0, **datos):
+    """
+    Registra un evento de gamificación para ``usuario_id`` y programa su
+    procesamiento al confirmar la transacción actual.
+    """
+    EventoGamificacion.objects.create(usuario_id=usuario_id, tipo=tipo, puntos=puntos, datos=datos)
+    if not getattr(settings, 'GAMIFICACION_EN_SEGUNDO_PLANO', True):
+        procesar_eventos()
+        return
+    transaction.on_commit(programar_procesamiento)
+
+
+def programar_procesamiento():
+    """Encola una pasada del procesador; las llamadas seguidas se agrupan en una"""
+    global _programado
+    with _candado:
+        if _programado:
+            return
+        _programado = True
+    _obtener_ejecutor().submit(_procesar_en_hilo)
+
+
+def _procesar_en_hilo():
+    global _programado
+    with _candado:
+        # Lo que llegue desde aquí programa otra pasada
+        _programado = False
+    close_old_connections()
+    try:
+        procesar_eventos()
+    except Exception:
+        logger.exception('Error procesando eventos de gamificación')
+    finally:
+        connection.close()
+
+
+def procesar_eventos(tamano_lote=TAMANO_LOTE):
+    """Aplica los eventos pendientes por lotes. Retorna cuántos aplicó"""
+    procesados = 0
+    while True:
+        with transaction.atomic():
+            # skip_locked: varios procesos pueden vaciar la bandeja a la vez
+            eventos = list(
+                EventoGamificacion.objects.select_for_update(skip_locked=True).order_by('id')[:tamano_lote]
+            )
+            if not eventos:
+                return procesados
+            aplicar_eventos(eventos)
+            EventoGamificacion.objects.filter(pk__in=[evento.pk for evento in eventos]).delete()
+        procesados += len(eventos)
+
+
+def aplicar_eventos(eventos):
+    """Aplica un lote de eventos agrupando el trabajo por usuario"""
+    puntos = defaultdict(int)
+    sesiones = defaultdict(list)
+    con_logros = set()
+    for evento in eventos:
+        puntos[evento.usuario_id] += evento.puntos
+        if evento.tipo == EventoGamificacion.SESION_COMPLETADA:
+            sesiones[evento.usuario_id].append(evento.datos)
+        elif evento.tipo == EventoGamificacion.LOGRO_OBTENIDO:
+            con_logros.add(evento.usuario_id)
+
+    _sumar_puntos(puntos)
+    otorgados = otorgar_insignias_sesion(sesiones)
+    evaluar_insignias(con_logros | otorgados)
+
+
+def _sumar_puntos(puntos):
+    por_delta = defaultdict(list)
+    for usuario_id, delta in puntos.items():
+        if delta:
+            por_delta[delta].append(usuario_id)
+    for delta, usuario_ids in por_delta.items():
+        get_user_model().objects.filter(pk__in=usuario_ids).update(
+            puntos_totales=F('puntos_totales') + delta
+        )
+
+
+def _crear_logros(logros):
+    """Crea los logros que no existan. Retorna los IDs de usuario con logros nuevos"""
+    if not logros:
+        return set()
+    existentes = set(LogroUsuario.objects.filter(
+        usuario_id__in={logro.usuario_id for logro in logros},
+        insignia_id__in={logro.insignia_id for logro in logros}
+    ).values_list('usuario_id', 'insignia_id'))
+    nuevos = [logro for logro in logros if (logro.usuario_id, logro.insignia_id) not in existentes]
+    LogroUsuario.objects.bulk_create(nuevos, ignore_conflicts=True)
+    return {logro.usuario_id for logro in nuevos}
+
+
+def otorgar_insignias_sesion(sesiones):
+    """
+    Otorga las insignias de sesión a los usuarios de ``sesiones``
+    (``{usuario_id: [datos de cada sesión completada]}``). Retorna los IDs
+    de usuario que recibieron alguna.
+    """
+    if not sesiones:
+        return set()
+    rachas = dict(get_user_model().objects.filter(pk__in=sesiones).values_list('id', 'racha_actual'))
+
+    candidatos = []
+    for usuario_id, completadas in sesiones.items():
+        # Todo evento viene de una sesión completada
+        candidatos.append((usuario_id, 'primera_sesion', {'obtenida_por': 'primera_sesion'}))
+        puntaje = max((datos.get('puntaje_final') or 0 for datos in completadas), default=0)
+        if puntaje >= PUNTAJE_ALTO:
+            candidatos.append((usuario_id, 'puntaje_alto', {'obtenida_por': 'puntaje_alto', 'puntaje': puntaje}))
+        racha = rachas.get(usuario_id) or 0
+        if racha >= DIAS_RACHA_SEMANAL:
+            candidatos.append((usuario_id, 'racha_semana', {'obtenida_por': 'racha_semana', 'racha': racha}))
+
+    insignias = {}
+    for clave in {clave for _, clave, _ in candidatos}:
+        definicion = INSIGNIAS_SESION[clave]
+        insignias[clave], _ = Insignia.objects.get_or_create(
+            nombre=definicion['nombre'], defaults=definicion['defaults']
+        )
+    return _crear_logros([
+        LogroUsuario(usuario_id=usuario_id, insignia=insignias[clave], contexto=contexto)
+        for usuario_id, clave, contexto in candidatos
+    ])
+
+
+def evaluar_insignias(usuario_ids):
+    """
+    Evalúa ``Insignia.evaluar_criterio`` de las insignias que aún no tienen
+    los usuarios, repitiendo con quienes obtuvieron alguna nueva.
+    """
+    insignias = None
+    pendientes = set(usuario_ids)
+    while pendientes:
+        if insignias is None:
+            insignias = list(Insignia.objects.all())
+        obtenidas = set(LogroUsuario.objects.filter(
+            usuario_id__in=pendientes
+        ).values_list('usuario_id', 'insignia_id'))
+        usuarios = get_user_model().objects.in_bulk(pendientes)
+        pendientes = _crear_logros([
+            LogroUsuario(
+                usuario_id=usuario_id,
+                insignia=insignia,
+                contexto={'obtenida_por': 'evaluacion_automatica'}
+            )
+            for usuario_id, usuario in usuarios.items()
+            for insignia in insignias
+            if (usuario_id, insignia.pk) not in obtenidas and insignia.evaluar_criterio(usuario)
+        ])
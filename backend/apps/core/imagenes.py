@@ -0,0 +1,141 @@
+"""
+Metadatos de las imágenes de contexto de las preguntas.
+
+``Pregunta.imagen_metadatos`` guarda si el archivo existe, su URL, sus
+dimensiones y su tamaño. Se calcula una sola vez cuando la imagen se sube o se
+carga masivamente (ver ``signals.actualizar_metadatos_imagen``), así que
+serializar preguntas no consulta el storage. En un storage remoto (S3 y
+similares) cada ``exists()`` es una petición de red.
+
+Al subir una imagen también se generan sus variantes responsivas (ver
+``variantes_imagenes``), que quedan en ``imagen_metadatos['variantes']``.
+"""
+import logging
+
+from .models import Pregunta
+from .variantes_imagenes import generar_variantes_archivo
+
+logger = logging.getLogger(__name__)
+
+METADATOS_VACIOS = {
+    'nombre': '',
+    'existe': False,
+    'url': None,
+    'ancho': None,
+    'alto': None,
+    'bytes': None,
+    'variantes': {},
+}
+
+
+def calcular_metadatos_imagen(imagen):
+    """Consulta el storage y retorna los metadatos de un ``ImageFieldFile``"""
+    nombre = getattr(imagen, 'name', None) or ''
+    if not nombre:
+        return dict(METADATOS_VACIOS)
+
+    metadatos = dict(METADATOS_VACIOS, nombre=nombre)
+    try:
+        if not imagen.storage.exists(nombre):
+            return metadatos
+        metadatos['existe'] = True
+        metadatos['url'] = imagen.url
+        metadatos['bytes'] = imagen.size
+    except Exception as e:
+        logger.warning(f"No se pudo consultar la imagen {nombre}: {e}")
+        return metadatos
+
+    try:
+        metadatos['ancho'] = imagen.width
+        metadatos['alto'] = imagen.height
+    except Exception:
+        # Archivo presente pero ilegible como imagen: se sirve sin dimensiones
+        pass
+    return metadatos
+
+
+def calcular_metadatos_con_variantes(imagen, reemplazar=False):
+    """``calcular_metadatos_imagen`` más las variantes responsivas de la imagen"""
+    metadatos = calcular_metadatos_imagen(imagen)
+    if metadatos['existe'] and metadatos['ancho']:
+        metadatos['variantes'] = generar_variantes_archivo(imagen, reemplazar)
+    return metadatos
+
+
+def metadatos_vigentes(nombre, metadatos):
+    """Indica si ``metadatos`` corresponde al archivo ``nombre`` actual"""
+    if not metadatos:
+        return not nombre
+    return metadatos.get('nombre', '') == (nombre or '')
+
+
+def obtener_metadatos_imagen(pregunta):
+    """
+    Retorna los metadatos vigentes de la imagen de ``pregunta``.
+
+    Las preguntas creadas antes de existir el campo se calculan una vez contra
+    el storage y el resultado queda guardado.
+    """
+    nombre = getattr(pregunta.imagen, 'name', None) or ''
+    if metadatos_vigentes(nombre, pregunta.imagen_metadatos):
+        return pregunta.imagen_metadatos
+    if not nombre:
+        return METADATOS_VACIOS
+
+    metadatos = calcular_metadatos_imagen(pregunta.imagen)
+    guardar_metadatos_imagen(pregunta, metadatos)
+    return metadatos
+
+
+def guardar_metadatos_imagen(pregunta, metadatos):
+    """Persiste los metadatos sin disparar ``save()`` ni sus señales"""
+    Pregunta.objects.filter(pk=pregunta.pk).update(imagen_metadatos=metadatos)
+    pregunta.imagen_metadatos = metadatos
+
+
+def url_desde_metadatos(metadatos, request=None):
+    """URL (absoluta si hay ``request``) de la imagen, o ``None`` si no existe"""
+    if not metadatos or not metadatos.get('existe') or not metadatos.get('url'):
+        return None
+    if request:
+        return request.build_absolute_uri(metadatos['url'])
+    return metadatos['url']
+
+
+def srcset_desde_metadatos(metadatos, request=None):
+    """
+    Mapa formato -> ``srcset`` (``"url 320w, url 640w"``) de las variantes
+    guardadas; vacío si la imagen no tiene variantes.
+    """
+    if not metadatos or not metadatos.get('existe'):
+        return {}
+    srcset = {}
+    for formato, variantes in (metadatos.get('variantes') or {}).items():
+        urls = [
+            f"{request.build_absolute_uri(v['url']) if request else v['url']} {v['ancho']}w"
+            for v in variantes
+        ]
+        if urls:
+            srcset[formato] = ', '.join(urls)
+    return srcset
+
+
+def url_imagen_pregunta(pregunta, request=None):
+    """URL de la imagen de ``pregunta`` sin consultar el storage"""
+    return url_desde_metadatos(obtener_metadatos_imagen(pregunta), request)
+
+
+def metadatos_desde_valores(pregunta_id, nombre, metadatos):
+    """
+    Metadatos vigentes para una fila leída con ``values()``. Solo consulta la
+    base de datos (y el storage) si no corresponden al archivo actual.
+    """
+    if metadatos_vigentes(nombre, metadatos):
+        return metadatos
+    pregunta = Pregunta.objects.only('id', 'imagen', 'imagen_metadatos').get(pk=pregunta_id)
+    return obtener_metadatos_imagen(pregunta)
+
+
+def srcset_imagen_pregunta(pregunta, request=None):
+    """``srcset`` por formato de la imagen de ``pregunta`` sin consultar el storage"""
+    return srcset_desde_metadatos(obtener_metadatos_imagen(pregunta), request)
@@ -0,0 +1,348 @@
+"""
+Importación masiva de preguntas.
+
+``ImportadorPreguntas`` valida cada fila en memoria y guarda las válidas en
+lotes con ``bulk_create``. Materias y competencias se cargan una sola vez en
+diccionarios; las que faltan se crean en bloque al guardar cada lote. El
+reporte ``detalles`` conserva una entrada por fila, en el orden del archivo.
+
+Las imágenes de ``imagen_archivo`` pasan por ``ingesta_imagenes``: se validan
+en paralelo antes de insertar el lote y se guardan (una vez por contenido)
+después.
+
+``bulk_create`` no envía ``post_save``, así que al terminar se invalida una
+sola vez el pool de muestreo de simulación.
+"""
+import logging
+import os
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .catalogo import invalidar_catalogo
+from .ingesta_imagenes import guardar_imagenes, preparar_imagenes
+from .models import Competencia, Materia, Pregunta
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 500
+
+CAMPOS_REQUERIDOS = (
+    'materia', 'enunciado', 'opciones', 'respuesta_correcta', 'retroalimentacion'
+)
+EXTENSIONES_IMAGEN = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+DIRECTORIO_IMAGENES = 'temp_images'
+
+
+def opciones_permitidas(materia_nombre):
+    """Opciones requeridas y adicionales según la materia"""
+    if materia_nombre.lower() == 'inglés':
+        # Inglés: mínimo 3 opciones (A, B, C), opcional D y más
+        return ['A', 'B', 'C'], ['D', 'E', 'F', 'G', 'H', 'I', 'J']
+    # Otras materias: 4 opciones (A, B, C, D)
+    return ['A', 'B', 'C', 'D'], []
+
+
+def validar_fila(pregunta_data):
+    """
+    Valida una fila del archivo y retorna sus campos normalizados.
+    Lanza ``ValueError`` con el mensaje para el reporte.
+    """
+    if not isinstance(pregunta_data, dict):
+        raise ValueError('Cada pregunta debe ser un objeto JSON')
+
+    campos_faltantes = [campo for campo in CAMPOS_REQUERIDOS if campo not in pregunta_data]
+    if campos_faltantes:
+        raise ValueError(f'Campos requeridos faltantes: {", ".join(campos_faltantes)}')
+
+    materia_nombre = pregunta_data['materia']
+    if not materia_nombre or not materia_nombre.strip():
+        raise ValueError('El nombre de la materia no puede estar vacío')
+
+    opciones = pregunta_data['opciones']
+    if not isinstance(opciones, dict):
+        raise ValueError('Las opciones deben ser un diccionario')
+    if not opciones:
+        raise ValueError('Las opciones no pueden estar vacías')
+
+    opciones_requeridas, opciones_adicionales = opciones_permitidas(materia_nombre)
+    if any(opt not in opciones for opt in opciones_requeridas):
+        raise ValueError(f'Para {materia_nombre} se requieren las opciones: {", ".join(opciones_requeridas)}')
+    permitidas = opciones_requeridas + opciones_adicionales
+    if any(opt not in permitidas for opt in opciones):
+        raise ValueError(f'Para {materia_nombre} solo se permiten las opciones: {", ".join(permitidas)}')
+
+    respuesta_correcta = pregunta_data['respuesta_correcta'].upper()
+    if respuesta_correcta not in opciones:
+        raise ValueError(f'La respuesta correcta "{respuesta_correcta}" no está en las opciones')
+
+    # Contenido de las opciones: texto o {"texto": ..., "imagen": ...}
+    for letra, opcion in opciones.items():
+        if isinstance(opcion, dict):
+            if 'texto' not in opcion:
+                raise ValueError(f'La opción {letra} debe tener campo "texto"')
+            texto = opcion['texto']
+        elif isinstance(opcion, str):
+            texto = opcion
+        else:
+            raise ValueError(f'Formato inválido para opción {letra}')
+        if not texto or not texto.strip():
+            raise ValueError(f'La opción {letra} no puede estar vacía')
+
+    imagen_archivo = pregunta_data.get('imagen_archivo') or None
+    if imagen_archivo:
+        if os.path.basename(imagen_archivo) != imagen_archivo:
+            raise ValueError(f'Error al procesar imagen "{imagen_archivo}": Debe ser un nombre de archivo sin rutas')
+        extension = os.path.splitext(imagen_archivo)[1].lower()
+        if extension not in EXTENSIONES_IMAGEN:
+            raise ValueError(
+                f'Error al procesar imagen "{imagen_archivo}": Formato de imagen no soportado: {extension}'
+            )
+
+    enunciado = pregunta_data['enunciado']
+    retroalimentacion = pregunta_data['retroalimentacion']
+    if not enunciado or not enunciado.strip():
+        raise ValueError('El enunciado no puede estar vacío')
+    if not retroalimentacion or not retroalimentacion.strip():
+        raise ValueError('La retroalimentación no puede estar vacía')
+
+    return {
+        'materia': materia_nombre,
+        'competencia': pregunta_data.get('competencia'),
+        'imagen_archivo': imagen_archivo,
+        'campos': {
+            'contexto': pregunta_data.get('contexto', ''),
+            'enunciado': enunciado,
+            'opciones': opciones,
+            'respuesta_correcta': respuesta_correcta,
+            'retroalimentacion': retroalimentacion,
+            'explicacion': pregunta_data.get('explicacion', ''),
+            'habilidad_evaluada': pregunta_data.get('habilidad_evaluada', ''),
+            'explicacion_opciones_incorrectas': pregunta_data.get('explicacion_opciones_incorrectas', {}),
+            'estrategias_resolucion': pregunta_data.get('estrategias_resolucion', ''),
+            'errores_comunes': pregunta_data.get('errores_comunes', ''),
+            'dificultad': pregunta_data.get('dificultad', 'media'),
+            'tiempo_estimado': pregunta_data.get('tiempo_estimado', 60),
+            'tags': pregunta_data.get('tags', []),
+        },
+    }
+
+
+class ImportadorPreguntas:
+    """
+    Importa filas de preguntas por lotes. Uso::
+
+        importador = ImportadorPreguntas()
+        importador.agregar(filas)      # se puede llamar varias veces
+        resultado = importador.finalizar()
+
+    ``filas`` puede ser cualquier iterable (p. ej. ``iterar_arreglo_json``);
+    se consume a medida que se guardan los lotes. ``al_progresar`` se llama
+    con el importador después de guardar cada lote.
+    """
+
+    def __init__(self, tamano_lote=TAMANO_LOTE, al_progresar=None):
+        self.tamano_lote = tamano_lote
+        self.al_progresar = al_progresar
+        self.materias = {m.nombre: m for m in Materia.objects.all()}
+        self.competencias = {
+            (c.materia_id, c.nombre): c for c in Competencia.objects.all()
+        }
+        self.procesadas = 0
+        self.exitosas = 0
+        self.errores = 0
+        self.detalles = []
+        # (fila, datos validados o None, mensaje de error o None)
+        self._pendientes = []
+
+    def agregar(self, filas):
+        """Valida ``filas`` y guarda cada lote completo"""
+        for pregunta_data in filas:
+            self.procesadas += 1
+            try:
+                self._pendientes.append((self.procesadas, validar_fila(pregunta_data), None))
+            except (ValueError, AttributeError, TypeError) as e:
+                self._pendientes.append((self.procesadas, None, str(e)))
+            if len(self._pendientes) >= self.tamano_lote:
+                self.guardar_lote()
+
+    def finalizar(self):
+        """Guarda el lote pendiente y retorna el resultado de la importación"""
+        self.guardar_lote()
+        if self.exitosas:
+            from apps.simulacion.catalogo import invalidar_materias_disponibles
+            from apps.simulacion.muestreo import pool_preguntas
+            transaction.on_commit(pool_preguntas.invalidar)
+            transaction.on_commit(invalidar_materias_disponibles)
+            transaction.on_commit(invalidar_catalogo)
+        return {
+            'exitosas': self.exitosas,
+            'errores': self.errores,
+            'detalles': self.detalles,
+        }
+
+    @property
+    def progreso(self):
+        return {
+            'procesadas': self.procesadas,
+            'exitosas': self.exitosas,
+            'errores': self.errores,
+        }
+
+    def guardar_lote(self):
+        if not self._pendientes:
+            return
+        pendientes, self._pendientes = self._pendientes, []
+        imagenes, advertencias = self._preparar_imagenes(pendientes)
+        validas = [(fila, datos) for fila, datos, _ in pendientes if datos]
+        preguntas = {}
+        if validas:
+            with transaction.atomic():
+                self._resolver_relaciones([datos for _, datos in validas])
+                preguntas = self._insertar(validas)
+        advertencias.update(self._adjuntar_imagenes(validas, preguntas, imagenes))
+
+        for fila, datos, error in pendientes:
+            if fila in advertencias:
+                self.detalles.append({'fila': fila, 'estado': 'advertencia', 'mensaje': advertencias[fila]})
+            pregunta = preguntas.get(fila)
+            if isinstance(pregunta, Pregunta):
+                self.exitosas += 1
+                self.detalles.append({
+                    'fila': fila,
+                    'estado': 'exitosa',
+                    'id_pregunta': pregunta.id,
+                    'mensaje': 'Pregunta creada correctamente'
+                })
+            else:
+                self.errores += 1
+                self.detalles.append({'fila': fila, 'estado': 'error', 'mensaje': error or pregunta})
+
+        if self.al_progresar:
+            self.al_progresar(self)
+
+    def _resolver_relaciones(self, validas):
+        """Crea en bloque las materias y competencias que aún no existen"""
+        nuevas = {}
+        for datos in validas:
+            nombre = datos['materia']
+            if nombre not in self.materias and nombre not in nuevas:
+                nuevas[nombre] = Materia(nombre=nombre, nombre_display=nombre)
+        if nuevas:
+            Materia.objects.bulk_create(nuevas.values())
+            self.materias.update({m.nombre: m for m in Materia.objects.filter(nombre__in=nuevas)})
+
+        nuevas = {}
+        for datos in validas:
+            if not datos['competencia']:
+                continue
+            materia = self.materias[datos['materia']]
+            clave = (materia.id, datos['competencia'])
+            if clave not in self.competencias and clave not in nuevas:
+                nuevas[clave] = Competencia(
+                    materia=materia,
+                    nombre=datos['competencia'],
+                    descripcion=f"Competencia: {datos['competencia']}"
+                )
+        if nuevas:
+            Competencia.objects.bulk_create(nuevas.values())
+            materias = {materia_id for materia_id, _ in nuevas}
+            self.competencias.update({
+                (c.materia_id, c.nombre): c
+                for c in Competencia.objects.filter(materia_id__in=materias)
+            })
+
+    def _construir(self, datos):
+        materia = self.materias[datos['materia']]
+        competencia = None
+        if datos['competencia']:
+            competencia = self.competencias[(materia.id, datos['competencia'])]
+        return Pregunta(materia=materia, competencia=competencia, **datos['campos'])
+
+    def _insertar(self, validas):
+        """
+        Inserta el lote con un solo ``bulk_create``. Si la base de datos lo
+        rechaza, reintenta fila por fila para reportar cuál falló.
+        """
+        preguntas = [self._construir(datos) for _, datos in validas]
+        try:
+            with transaction.atomic():
+                Pregunta.objects.bulk_create(preguntas)
+            return {fila: pregunta for (fila, _), pregunta in zip(validas, preguntas)}
+        except IntegrityError:
+            logger.warning('Lote de importación rechazado; reintentando fila por fila')
+
+        resultado = {}
+        for fila, datos in validas:
+            pregunta = self._construir(datos)
+            try:
+                with transaction.atomic():
+                    Pregunta.objects.bulk_create([pregunta])
+                resultado[fila] = pregunta
+            except IntegrityError as e:
+                resultado[fila] = str(e)
+        return resultado
+
+    def _preparar_imagenes(self, pendientes):
+        """
+        Lee y valida en paralelo las imágenes del lote. Las filas cuya imagen
+        es inválida pasan a error; si el archivo no existe la pregunta se crea
+        sin imagen y queda una advertencia.
+        """
+        nombres = {datos['imagen_archivo'] for _, datos, _ in pendientes if datos and datos['imagen_archivo']}
+        if not nombres:
+            return {}, {}
+        directorio = os.path.join(settings.MEDIA_ROOT, DIRECTORIO_IMAGENES)
+        imagenes, errores, faltantes = preparar_imagenes(nombres, directorio)
+
+        advertencias = {}
+        for indice, (fila, datos, error) in enumerate(pendientes):
+            nombre = datos and datos['imagen_archivo']
+            if nombre in errores:
+                pendientes[indice] = (fila, None, f'Error al procesar imagen "{nombre}": {errores[nombre]}')
+            elif nombre in faltantes:
+                advertencias[fila] = f'Imagen no encontrada: {nombre}. Pregunta creada sin imagen.'
+        return imagenes, advertencias
+
+    def _adjuntar_imagenes(self, validas, preguntas, imagenes):
+        """
+        Guarda cada imagen distinta una sola vez y la asigna a sus preguntas
+        con un ``bulk_update``; retorna advertencias por fila.
+        """
+        con_imagen = [
+            (fila, preguntas[fila], imagenes[datos['imagen_archivo']])
+            for fila, datos in validas
+            if datos['imagen_archivo'] in imagenes and isinstance(preguntas.get(fila), Pregunta)
+        ]
+        if not con_imagen:
+            return {}
+        storage = Pregunta._meta.get_field('imagen').storage
+        guardadas = guardar_imagenes([imagen for _, _, imagen in con_imagen], storage)
+
+        advertencias = {}
+        actualizadas = []
+        for fila, pregunta, imagen in con_imagen:
+            metadatos = guardadas[imagen['huella']]
+            if isinstance(metadatos, str):
+                advertencias[fila] = (
+                    f'No se pudo guardar la imagen: {metadatos}. Pregunta creada sin imagen.'
+                )
+                continue
+            pregunta.imagen.name = metadatos['nombre']
+            pregunta.imagen_metadatos = metadatos
+            actualizadas.append(pregunta)
+        Pregunta.objects.bulk_update(actualizadas, ['imagen', 'imagen_metadatos'])
+        return advertencias
+
+
+def registrar_progreso_importacion(importador):
+    """Callback ``al_progresar`` que deja el avance en el log"""
+    logger.info('Importación de preguntas: %(procesadas)s procesadas, %(exitosas)s exitosas, '
+                '%(errores)s con error', importador.progreso)
+
+
+def importar_preguntas(datos, tamano_lote=TAMANO_LOTE):
+    """Importa una lista de preguntas; retorna exitosas, errores y detalles"""
+    importador = ImportadorPreguntas(tamano_lote)
+    importador.agregar(datos)
+    return importador.finalizar()
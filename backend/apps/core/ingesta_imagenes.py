@@ -0,0 +1,140 @@
+"""
+Ingesta de las imágenes de contexto de una importación de preguntas.
+
+Las imágenes referenciadas con ``imagen_archivo`` se leen de
+``MEDIA_ROOT/temp_images`` en un pool de hilos. Cada archivo se valida con
+Pillow (tamaño real en bytes, formato y dimensiones) y se identifica por el
+SHA-256 de su contenido, que también da el nombre en el storage: un mismo
+archivo usado por muchas preguntas, aunque venga con nombres distintos, se
+guarda una sola vez y las preguntas comparten la ruta.
+
+Las imágenes con un lado mayor a ``LADO_MAXIMO`` se reducen y recomprimen en
+su mismo formato; las demás se copian sin cambios. Las variantes responsivas
+se generan en el mismo hilo que guarda cada imagen.
+"""
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.base import ContentFile
+from PIL import Image, UnidentifiedImageError
+
+from .variantes_imagenes import generar_variantes
+
+TAMANO_MAXIMO_IMAGEN = 5 * 1024 * 1024
+# Por encima de esto el archivo se rechaza; entre LADO_MAXIMO y esto se reduce
+DIMENSION_MAXIMA = 10000
+LADO_MAXIMO = 2048
+HILOS_IMAGENES = 4
+DIRECTORIO_IMPORTADAS = 'preguntas/imagenes/importadas'
+
+FORMATOS_PILLOW = {
+    'JPEG': '.jpg',
+    'PNG': '.png',
+    'GIF': '.gif',
+    'WEBP': '.webp',
+}
+
+
+def _reducir(imagen, formato):
+    """Reduce ``imagen`` para que su lado mayor sea ``LADO_MAXIMO`` y la recomprime"""
+    imagen.thumbnail((LADO_MAXIMO, LADO_MAXIMO))
+    if formato == 'JPEG' and imagen.mode not in ('RGB', 'L'):
+        imagen = imagen.convert('RGB')
+    buffer = io.BytesIO()
+    opciones = {'quality': 85, 'optimize': True} if formato in ('JPEG', 'WEBP') else {'optimize': True}
+    imagen.save(buffer, format=formato, **opciones)
+    return buffer.getvalue(), imagen.size
+
+
+def preparar_imagen(ruta):
+    """
+    Lee y valida la imagen en ``ruta``. Retorna ``huella``, ``extension``,
+    ``contenido`` (listo para guardar), ``ancho`` y ``alto``. Lanza
+    ``ValueError`` si el archivo no es una imagen aceptable.
+    """
+    tamano = os.path.getsize(ruta)
+    if tamano > TAMANO_MAXIMO_IMAGEN:
+        raise ValueError(f'La imagen es muy grande (máximo {TAMANO_MAXIMO_IMAGEN // (1024 * 1024)}MB)')
+    with open(ruta, 'rb') as archivo:
+        contenido = archivo.read()
+
+    try:
+        with Image.open(io.BytesIO(contenido)) as imagen:
+            formato = imagen.format
+            ancho, alto = imagen.size
+            if formato not in FORMATOS_PILLOW:
+                raise ValueError(f'Formato de imagen no soportado: {formato}')
+            if max(ancho, alto) > DIMENSION_MAXIMA:
+                raise ValueError(f'La imagen supera {DIMENSION_MAXIMA}px de lado ({ancho}x{alto})')
+            imagen.load()
+            animada = getattr(imagen, 'is_animated', False)
+            huella = hashlib.sha256(contenido).hexdigest()
+            if max(ancho, alto) > LADO_MAXIMO and not animada:
+                contenido, (ancho, alto) = _reducir(imagen, formato)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise ValueError(f'El archivo no es una imagen válida ({e})')
+
+    return {
+        'huella': huella,
+        'extension': FORMATOS_PILLOW[formato],
+        'contenido': contenido,
+        'ancho': ancho,
+        'alto': alto,
+    }
+
+
+def preparar_imagenes(nombres, directorio, hilos=HILOS_IMAGENES):
+    """
+    Prepara en paralelo las imágenes ``nombres`` de ``directorio``. Retorna
+    ``(preparadas, errores, faltantes)``: preparadas y errores son
+    diccionarios por nombre; faltantes, el conjunto de nombres sin archivo.
+    """
+    faltantes = {nombre for nombre in nombres if not os.path.isfile(os.path.join(directorio, nombre))}
+    pendientes = [nombre for nombre in nombres if nombre not in faltantes]
+
+    def preparar(nombre):
+        try:
+            return nombre, preparar_imagen(os.path.join(directorio, nombre)), None
+        except (ValueError, OSError) as e:
+            return nombre, None, str(e)
+
+    preparadas, errores = {}, {}
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        for nombre, imagen, error in ejecutor.map(preparar, pendientes):
+            if error:
+                errores[nombre] = error
+            else:
+                preparadas[nombre] = imagen
+    return preparadas, errores, faltantes
+
+
+def guardar_imagenes(imagenes, storage, hilos=HILOS_IMAGENES):
+    """
+    Guarda en ``storage`` las imágenes preparadas, una vez por huella.
+    Retorna ``{huella: metadatos o mensaje de error}``; los metadatos tienen
+    la forma de ``Pregunta.imagen_metadatos``.
+    """
+    unicas = {imagen['huella']: imagen for imagen in imagenes}
+
+    def guardar(imagen):
+        huella = imagen['huella']
+        nombre = f"{DIRECTORIO_IMPORTADAS}/{huella[:2]}/{huella}{imagen['extension']}"
+        try:
+            if not storage.exists(nombre):
+                nombre = storage.save(nombre, ContentFile(imagen['contenido']))
+            return huella, {
+                'nombre': nombre,
+                'existe': True,
+                'url': storage.url(nombre),
+                'ancho': imagen['ancho'],
+                'alto': imagen['alto'],
+                'bytes': len(imagen['contenido']),
+                'variantes': generar_variantes(imagen['contenido'], nombre, storage),
+            }
+        except Exception as e:
+            return huella, str(e)
+
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        return dict(ejecutor.map(guardar, unicas.values()))
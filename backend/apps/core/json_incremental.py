@@ -0,0 +1,127 @@
+"""
+Lectura incremental de archivos JSON grandes.
+
+``iterar_arreglo_json`` recorre un arreglo JSON (``[{...}, {...}]``) y
+``iterar_ndjson`` un archivo con un objeto por línea, ambos a partir de
+fragmentos de bytes (p. ej. ``archivo.chunks()``). Entregan cada elemento en
+cuanto está completo, así que la memoria depende del tamaño de un elemento y
+no del archivo.
+"""
+import codecs
+import json
+
+# Un elemento que no termina dentro de este tamaño se considera inválido
+TAMANO_MAXIMO_ELEMENTO = 10 * 1024 * 1024
+
+_ESPACIOS = ' \t\n\r'
+
+
+class ErrorFormatoJSON(ValueError):
+    """El archivo es JSON válido hasta donde se leyó, pero no tiene la forma esperada"""
+
+
+def _saltar_espacios(texto, pos):
+    while pos < len(texto) and texto[pos] in _ESPACIOS:
+        pos += 1
+    return pos
+
+
+def iterar_arreglo_json(fragmentos, tamano_maximo=TAMANO_MAXIMO_ELEMENTO):
+    """
+    Itera los elementos de un arreglo JSON leído por fragmentos de bytes.
+
+    Lanza ``ErrorFormatoJSON`` si el contenido no es un arreglo y
+    ``json.JSONDecodeError`` si el JSON es inválido.
+    """
+    decodificador = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8-sig')()
+    texto = ''
+    # inicio -> primero -> (elemento -> separador)* -> fin
+    estado = 'inicio'
+    fragmentos = iter(fragmentos)
+    final = False
+
+    while True:
+        try:
+            texto += utf8.decode(next(fragmentos))
+        except StopIteration:
+            texto += utf8.decode(b'', final=True)
+            final = True
+
+        pos = 0
+        while True:
+            pos = _saltar_espacios(texto, pos)
+            if pos == len(texto):
+                break
+            caracter = texto[pos]
+
+            if estado == 'inicio':
+                if caracter != '[':
+                    raise ErrorFormatoJSON('El JSON debe contener una lista de preguntas')
+                pos += 1
+                estado = 'primero'
+            elif estado == 'primero' and caracter == ']':
+                pos += 1
+                estado = 'fin'
+            elif estado in ('primero', 'elemento'):
+                try:
+                    elemento, fin = decodificador.raw_decode(texto, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break
+                if fin == len(texto) and not final:
+                    # Un número al final del fragmento puede seguir en el próximo
+                    break
+                pos = fin
+                estado = 'separador'
+                yield elemento
+            elif estado == 'separador':
+                if caracter not in ',]':
+                    raise json.JSONDecodeError("Se esperaba ',' o ']'", texto, pos)
+                pos += 1
+                estado = 'elemento' if caracter == ',' else 'fin'
+            else:
+                raise json.JSONDecodeError('Contenido después del final del arreglo', texto, pos)
+
+        texto = texto[pos:]
+        if len(texto) > tamano_maximo:
+            raise ErrorFormatoJSON('Una pregunta supera el tamaño máximo permitido o el JSON es inválido')
+        if final:
+            break
+
+    if estado == 'inicio':
+        raise ErrorFormatoJSON('El archivo JSON está vacío')
+    if estado != 'fin':
+        raise json.JSONDecodeError('El arreglo JSON no está cerrado', texto, len(texto))
+
+
+def iterar_ndjson(fragmentos, tamano_maximo=TAMANO_MAXIMO_ELEMENTO):
+    """
+    Itera los objetos de un archivo NDJSON (un JSON por línea, líneas vacías
+    ignoradas) leído por fragmentos de bytes.
+    """
+    utf8 = codecs.getincrementaldecoder('utf-8-sig')()
+    pendiente = ''
+    numero_linea = 0
+
+    def decodificar(linea):
+        try:
+            return json.loads(linea)
+        except json.JSONDecodeError as e:
+            raise json.JSONDecodeError(f'Línea {numero_linea}: {e.msg}', e.doc, e.pos) from e
+
+    for fragmento in fragmentos:
+        pendiente += utf8.decode(fragmento)
+        *lineas, pendiente = pendiente.split('\n')
+        for linea in lineas:
+            numero_linea += 1
+            if linea.strip():
+                yield decodificar(linea)
+        if len(pendiente) > tamano_maximo:
+            raise ErrorFormatoJSON('Una pregunta supera el tamaño máximo permitido o el JSON es inválido')
+
+    pendiente += utf8.decode(b'', final=True)
+    numero_linea += 1
+    if pendiente.strip():
+        yield decodificar(pendiente)
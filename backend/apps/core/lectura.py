@@ -0,0 +1,160 @@
+"""
+Constructores de respuestas de solo lectura para preguntas.
+
+Producen lo mismo que ``PreguntaSerializer``, ``PreguntaSimulacionSerializer``
+y ``PreguntaRetroalimentacionSerializer`` leyendo con una proyección
+``values()`` (una consulta, sin instanciar modelos ni campos DRF). Los campos
+salen del ``Meta.fields`` de cada serializer, así que agregar un campo simple
+al serializer lo agrega aquí; uno calculado necesita su entrada en
+``_CALCULADOS``.
+
+``comparar_serializacion`` (ver el comando ``benchmark_serializacion``) mide
+ambos caminos y verifica que la salida sea idéntica.
+"""
+from .imagenes import metadatos_desde_valores, srcset_desde_metadatos, url_desde_metadatos
+from .models import Pregunta
+from .serializers import (
+    PreguntaRetroalimentacionSerializer, PreguntaSerializer, PreguntaSimulacionSerializer
+)
+
+# Columna de values() para los campos que no se llaman igual que en el modelo
+_COLUMNAS = {
+    'materia': 'materia_id',
+    'competencia': 'competencia_id',
+    'materia_nombre': 'materia__nombre_display',
+    'competencia_nombre': 'competencia__nombre',
+}
+# Campos que no salen directo de una columna
+_CALCULADOS = {'imagen', 'imagen_url', 'imagen_srcset'}
+
+
+class ConstructorPreguntas:
+    """
+    Construye las representaciones de ``serializer_class`` a partir de
+    ``values()``. Las columnas y el orden de los campos se resuelven una vez
+    al crear el constructor.
+    """
+
+    def __init__(self, serializer_class):
+        self.campos = tuple(serializer_class.Meta.fields)
+        desconocidos = [
+            campo for campo in self.campos
+            if campo not in _CALCULADOS and campo not in _COLUMNAS
+            and not hasattr(Pregunta, campo) and campo != 'id'
+        ]
+        if desconocidos:
+            raise ValueError(f'Campos sin columna para {serializer_class.__name__}: {desconocidos}')
+        self.columnas = tuple(dict.fromkeys(
+            [_COLUMNAS.get(campo, campo) for campo in self.campos if campo not in _CALCULADOS]
+            + ['id', 'competencia_id', 'imagen', 'imagen_metadatos']
+        ))
+        self.rutas = tuple((columna, tuple(columna.split('__'))) for columna in self.columnas)
+        self.pares = tuple(
+            (campo, _COLUMNAS.get(campo, campo)) for campo in self.campos if campo not in _CALCULADOS
+        )
+        self.con_imagen = bool(_CALCULADOS.intersection(self.campos))
+        self.omitir_competencia = 'competencia_nombre' in self.campos
+        self.storage = Pregunta._meta.get_field('imagen').storage
+
+    def _fila(self, fila, request):
+        datos = {campo: fila[columna] for campo, columna in self.pares}
+        if self.omitir_competencia and fila['competencia_id'] is None:
+            # Como DRF: source='competencia.nombre' sin competencia omite el campo
+            del datos['competencia_nombre']
+        if self.con_imagen:
+            nombre = fila['imagen']
+            metadatos = metadatos_desde_valores(fila['id'], nombre, fila['imagen_metadatos'])
+            imagen = None
+            if nombre:
+                imagen = self.storage.url(nombre)
+                if request is not None:
+                    imagen = request.build_absolute_uri(imagen)
+            calculados = {
+                'imagen': imagen,
+                'imagen_url': url_desde_metadatos(metadatos, request),
+                'imagen_srcset': srcset_desde_metadatos(metadatos, request),
+            }
+            datos.update({campo: calculados[campo] for campo in _CALCULADOS if campo in self.campos})
+            # Mismo orden de claves que el serializer
+            datos = {campo: datos[campo] for campo in self.campos if campo in datos}
+        return datos
+
+    def valores(self, queryset):
+        """Proyección ``values()`` de ``queryset`` con las columnas necesarias"""
+        return queryset.values(*self.columnas)
+
+    def construir(self, filas, request=None):
+        """Representaciones de filas obtenidas con ``valores`` (p. ej. una página)"""
+        return [self._fila(fila, request) for fila in filas]
+
+    def desde_queryset(self, queryset, request=None):
+        """Representaciones de ``queryset`` en su orden, con una consulta"""
+        return self.construir(self.valores(queryset), request)
+
+    def desde_instancias(self, preguntas, request=None):
+        """
+        Representaciones de instancias ya cargadas, sin consultar la base de
+        datos. Deben traer ``materia`` y ``competencia`` (``select_related``).
+        """
+        return [self._fila(self._valores_de(pregunta), request) for pregunta in preguntas]
+
+    def _valores_de(self, pregunta):
+        fila = {}
+        for columna, ruta in self.rutas:
+            valor = pregunta
+            for atributo in ruta:
+                valor = getattr(valor, atributo) if valor is not None else None
+            fila[columna] = valor
+        fila['imagen'] = pregunta.imagen.name or None
+        return fila
+
+    def desde_ids(self, ids, request=None):
+        """Representaciones de las preguntas ``ids`` en ese mismo orden"""
+        ids = list(ids)
+        filas = {fila['id']: fila for fila in self.valores(Pregunta.objects.filter(pk__in=ids))}
+        return [self._fila(filas[pk], request) for pk in ids if pk in filas]
+
+
+preguntas_gestion = ConstructorPreguntas(PreguntaSerializer)
+preguntas_simulacion = ConstructorPreguntas(PreguntaSimulacionSerializer)
+preguntas_retroalimentacion = ConstructorPreguntas(PreguntaRetroalimentacionSerializer)
+
+
+def comparar_serializacion(constructor, serializer_class, ids, repeticiones=10):
+    """
+    Serializa ``ids`` ``repeticiones`` veces con ``serializer_class`` (con
+    ``select_related``) y con ``constructor``. Retorna los segundos promedio
+    de cada camino, las consultas de cada uno y si la salida coincide.
+    """
+    import json
+    import time
+
+    from django.core.serializers.json import DjangoJSONEncoder
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def medir(serializar):
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = serializar()
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            serializar()
+        return resultado, (time.perf_counter() - inicio) / repeticiones, len(consultas)
+
+    def con_drf():
+        preguntas = Pregunta.objects.filter(pk__in=ids).select_related('materia', 'competencia')
+        por_id = {pregunta.pk: pregunta for pregunta in preguntas}
+        return serializer_class([por_id[pk] for pk in ids if pk in por_id], many=True).data
+
+    esperado, tiempo_drf, consultas_drf = medir(con_drf)
+    obtenido, tiempo_rapido, consultas_rapido = medir(lambda: constructor.desde_ids(ids))
+    return {
+        'preguntas': len(obtenido),
+        'drf_segundos': tiempo_drf,
+        'rapido_segundos': tiempo_rapido,
+        'aceleracion': tiempo_drf / tiempo_rapido if tiempo_rapido else None,
+        'drf_consultas': consultas_drf,
+        'rapido_consultas': consultas_rapido,
+        # Compara también el orden de las claves
+        'identico': json.dumps(esperado, cls=DjangoJSONEncoder) == json.dumps(obtenido, cls=DjangoJSONEncoder),
+    }
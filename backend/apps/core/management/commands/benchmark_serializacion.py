@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.lectura import (
+    comparar_serializacion, preguntas_gestion, preguntas_retroalimentacion, preguntas_simulacion
+)
+from apps.core.models import Pregunta
+from apps.core.serializers import (
+    PreguntaRetroalimentacionSerializer, PreguntaSerializer, PreguntaSimulacionSerializer
+)
+
+CASOS = {
+    'gestion': (preguntas_gestion, PreguntaSerializer),
+    'simulacion': (preguntas_simulacion, PreguntaSimulacionSerializer),
+    'retroalimentacion': (preguntas_retroalimentacion, PreguntaRetroalimentacionSerializer),
+}
+
+
+class Command(BaseCommand):
+    help = 'Compara la serialización DRF de preguntas con los constructores de apps.core.lectura'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cantidad',
+            type=int,
+            default=50,
+            help='Preguntas por serialización (default: 50)'
+        )
+        parser.add_argument(
+            '--repeticiones',
+            type=int,
+            default=20,
+            help='Repeticiones para promediar (default: 20)'
+        )
+        parser.add_argument(
+            '--caso',
+            choices=['todos', *CASOS],
+            default='todos',
+            help='Serializer a comparar (default: todos)'
+        )
+
+    def handle(self, *args, **options):
+        ids = list(
+            Pregunta.objects.filter(activa=True).order_by('id').values_list('id', flat=True)[:options['cantidad']]
+        )
+        if not ids:
+            raise CommandError('No hay preguntas activas para medir')
+
+        casos = CASOS if options['caso'] == 'todos' else {options['caso']: CASOS[options['caso']]}
+        self.stdout.write(f'📏 {len(ids)} preguntas, {options["repeticiones"]} repeticiones\n')
+
+        distintos = []
+        for nombre, (constructor, serializer_class) in casos.items():
+            resultado = comparar_serializacion(constructor, serializer_class, ids, options['repeticiones'])
+            self.stdout.write(
+                f'{nombre:<18} DRF {resultado["drf_segundos"] * 1000:8.2f} ms '
+                f'({resultado["drf_consultas"]} consultas) | '
+                f'values() {resultado["rapido_segundos"] * 1000:8.2f} ms '
+                f'({resultado["rapido_consultas"]} consultas) | '
+                f'x{resultado["aceleracion"]:.1f}'
+            )
+            if not resultado['identico']:
+                distintos.append(nombre)
+
+        if distintos:
+            raise CommandError(f'La salida no coincide con el serializer en: {", ".join(distintos)}')
+        self.stdout.write(self.style.SUCCESS('\n✅ Salida idéntica a los serializers'))
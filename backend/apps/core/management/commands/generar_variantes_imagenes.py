@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.core.imagenes import calcular_metadatos_con_variantes, guardar_metadatos_imagen
+from apps.core.models import Pregunta
+
+
+class Command(BaseCommand):
+    help = 'Genera las variantes responsivas (AVIF/WebP por ancho) de las imágenes de preguntas existentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerar también las imágenes que ya tienen variantes'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Preguntas leídas por consulta (default: 100)'
+        )
+
+    def handle(self, *args, **options):
+        force = options['force']
+
+        preguntas = Pregunta.objects.exclude(imagen='').exclude(imagen__isnull=True)
+        if not force:
+            # Los metadatos calculados al leer una pregunta antigua traen
+            # ``variantes`` vacío: también quedan pendientes
+            preguntas = preguntas.filter(
+                ~Q(imagen_metadatos__has_key='variantes') | Q(imagen_metadatos__variantes={})
+            )
+
+        total = preguntas.count()
+        if total == 0:
+            self.stdout.write(self.style.SUCCESS('✅ Todas las imágenes tienen variantes'))
+            return
+
+        self.stdout.write(f'🖼️  Generando variantes para {total} imágenes...')
+        con_variantes = sin_archivo = 0
+        for pregunta in preguntas.only('id', 'imagen', 'imagen_metadatos').iterator(chunk_size=options['batch_size']):
+            metadatos = calcular_metadatos_con_variantes(pregunta.imagen, reemplazar=force)
+            guardar_metadatos_imagen(pregunta, metadatos)
+            if metadatos['existe']:
+                con_variantes += 1
+            else:
+                sin_archivo += 1
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Imágenes procesadas: {con_variantes}'))
+        if sin_archivo:
+            self.stdout.write(self.style.WARNING(f'⚠️  Preguntas con imagen inexistente: {sin_archivo}'))
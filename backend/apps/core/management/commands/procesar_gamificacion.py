@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.gamificacion import TAMANO_LOTE, procesar_eventos
+
+
+class Command(BaseCommand):
+    help = 'Aplica los eventos de gamificación pendientes (puntos e insignias)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=TAMANO_LOTE,
+            help=f'Eventos aplicados por transacción (default: {TAMANO_LOTE})'
+        )
+
+    def handle(self, *args, **options):
+        procesados = procesar_eventos(tamano_lote=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Eventos de gamificación aplicados: {procesados}'))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from datetime import timedelta
+
+from apps.core.models import ImportacionPreguntas
+from apps.core.trabajos import ejecutar_importacion
+
+
+class Command(BaseCommand):
+    help = 'Procesa importaciones de preguntas pendientes y cierra las interrumpidas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutes',
+            type=int,
+            default=60,
+            help='Minutos tras los cuales una importación en proceso se considera interrumpida (default: 60)'
+        )
+
+    def handle(self, *args, **options):
+        minutes = options['minutes']
+        cutoff_time = timezone.now() - timedelta(minutes=minutes)
+
+        # Una importación interrumpida ya confirmó algunos lotes, así que no se
+        # reintenta: se marca como fallida y el reporte conserva lo guardado
+        interrumpidas = ImportacionPreguntas.objects.filter(
+            estado=ImportacionPreguntas.PROCESANDO,
+            fecha_inicio__lt=cutoff_time
+        ).update(
+            estado=ImportacionPreguntas.FALLIDA,
+            mensaje_error='La importación se interrumpió antes de terminar',
+            fecha_fin=timezone.now()
+        )
+        if interrumpidas:
+            self.stdout.write(self.style.WARNING(f'⚠️  Importaciones interrumpidas: {interrumpidas}'))
+
+        pendientes = ImportacionPreguntas.objects.filter(
+            estado=ImportacionPreguntas.PENDIENTE
+        ).order_by('fecha_creacion').values_list('id', flat=True)
+
+        procesadas = 0
+        for importacion_id in pendientes:
+            if ejecutar_importacion(importacion_id):
+                procesadas += 1
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Importaciones procesadas: {procesadas}'))
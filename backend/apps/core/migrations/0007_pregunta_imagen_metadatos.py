@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0006_pregunta_retroalimentacion_estructurada"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pregunta",
+            name="imagen_metadatos",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Metadatos de Imagen",
+            ),
+        ),
+    ]
@@ -0,0 +1,177 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0007_pregunta_imagen_metadatos"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportacionPreguntas",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "archivo",
+                    models.FileField(
+                        upload_to="importaciones/%Y/%m/", verbose_name="Archivo"
+                    ),
+                ),
+                (
+                    "nombre_archivo",
+                    models.CharField(max_length=255, verbose_name="Nombre del Archivo"),
+                ),
+                (
+                    "formato",
+                    models.CharField(
+                        choices=[("json", "Arreglo JSON"), ("ndjson", "NDJSON")],
+                        default="json",
+                        max_length=10,
+                        verbose_name="Formato",
+                    ),
+                ),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("pendiente", "Pendiente"),
+                            ("procesando", "Procesando"),
+                            ("completada", "Completada"),
+                            ("fallida", "Fallida"),
+                        ],
+                        default="pendiente",
+                        max_length=20,
+                        verbose_name="Estado",
+                    ),
+                ),
+                (
+                    "total",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="Total de Filas"
+                    ),
+                ),
+                (
+                    "procesadas",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Filas Procesadas"
+                    ),
+                ),
+                (
+                    "exitosas",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Filas Exitosas"
+                    ),
+                ),
+                (
+                    "errores",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Filas con Error"
+                    ),
+                ),
+                (
+                    "mensaje_error",
+                    models.TextField(blank=True, verbose_name="Mensaje de Error"),
+                ),
+                (
+                    "fecha_creacion",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Fecha de Creación"
+                    ),
+                ),
+                (
+                    "fecha_inicio",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Fecha de Inicio"
+                    ),
+                ),
+                (
+                    "fecha_fin",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Fecha de Fin"
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="importaciones_preguntas",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuario",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Importación de Preguntas",
+                "verbose_name_plural": "Importaciones de Preguntas",
+                "db_table": "importaciones_preguntas",
+                "ordering": ["-fecha_creacion"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DetalleImportacion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fila", models.PositiveIntegerField(verbose_name="Fila")),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("exitosa", "Exitosa"),
+                            ("advertencia", "Advertencia"),
+                            ("error", "Error"),
+                        ],
+                        max_length=20,
+                        verbose_name="Estado",
+                    ),
+                ),
+                ("mensaje", models.TextField(verbose_name="Mensaje")),
+                (
+                    "importacion",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="detalles",
+                        to="core.importacionpreguntas",
+                        verbose_name="Importación",
+                    ),
+                ),
+                (
+                    "pregunta",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="core.pregunta",
+                        verbose_name="Pregunta",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Detalle de Importación",
+                "verbose_name_plural": "Detalles de Importación",
+                "db_table": "detalles_importacion",
+                "ordering": ["fila", "id"],
+            },
+        ),
+    ]
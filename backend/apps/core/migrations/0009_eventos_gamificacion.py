@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0008_importaciones_preguntas"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventoGamificacion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[
+                            ("respuesta_correcta", "Respuesta correcta"),
+                            ("sesion_completada", "Sesión completada"),
+                            ("logro_obtenido", "Logro obtenido"),
+                        ],
+                        max_length=30,
+                        verbose_name="Tipo",
+                    ),
+                ),
+                ("puntos", models.IntegerField(default=0, verbose_name="Puntos")),
+                (
+                    "datos",
+                    models.JSONField(blank=True, default=dict, verbose_name="Datos"),
+                ),
+                (
+                    "fecha_creacion",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Fecha de Creación"
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="eventos_gamificacion",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuario",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Evento de Gamificación",
+                "verbose_name_plural": "Eventos de Gamificación",
+                "db_table": "eventos_gamificacion",
+                "ordering": ["id"],
+            },
+        ),
+    ]
@@ -78,7 +78,8 @@ class Usuario(AbstractUser):
             self.racha_actual = 1
         
         self.ultima_practica = timezone.now()
-        self.save()
+        # Sin tocar puntos_totales, que la gamificación actualiza con F()
+        self.save(update_fields=['racha_actual', 'ultima_practica'])
 
 
 class Materia(models.Model):
@@ -187,6 +188,13 @@ class Pregunta(models.Model):
         verbose_name='Imagen de Contexto',
         help_text='Imagen opcional para análisis, gráficos, diagramas, mapas, etc.'
     )
+    # {"nombre", "existe", "url", "ancho", "alto", "bytes"}; se recalcula al cambiar la imagen
+    imagen_metadatos = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Metadatos de Imagen'
+    )
     enunciado = models.TextField(
         verbose_name='Enunciado'
     )
@@ -632,3 +640,191 @@ class LogroUsuario(models.Model):
     
     def __str__(self):
         return f"{self.usuario.username} - {self.insignia.nombre}"
+
+
+class EventoGamificacion(models.Model):
+    """
+    Evento pendiente de gamificación (bandeja de salida). Las señales lo
+    registran en la transacción de la request y ``apps.core.gamificacion``
+    lo aplica y lo elimina.
+    """
+    RESPUESTA_CORRECTA = 'respuesta_correcta'
+    SESION_COMPLETADA = 'sesion_completada'
+    LOGRO_OBTENIDO = 'logro_obtenido'
+    TIPOS_CHOICES = [
+        (RESPUESTA_CORRECTA, 'Respuesta correcta'),
+        (SESION_COMPLETADA, 'Sesión completada'),
+        (LOGRO_OBTENIDO, 'Logro obtenido'),
+    ]
+    
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='eventos_gamificacion',
+        verbose_name='Usuario'
+    )
+    tipo = models.CharField(
+        max_length=30,
+        choices=TIPOS_CHOICES,
+        verbose_name='Tipo'
+    )
+    puntos = models.IntegerField(
+        default=0,
+        verbose_name='Puntos'
+    )
+    datos = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Datos'
+    )
+    fecha_creacion = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Creación'
+    )
+    
+    class Meta:
+        verbose_name = 'Evento de Gamificación'
+        verbose_name_plural = 'Eventos de Gamificación'
+        db_table = 'eventos_gamificacion'
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"{self.get_tipo_display()} ({self.usuario_id})"
+
+
+class ImportacionPreguntas(models.Model):
+    """Trabajo de carga masiva de preguntas procesado en segundo plano"""
+    PENDIENTE = 'pendiente'
+    PROCESANDO = 'procesando'
+    COMPLETADA = 'completada'
+    FALLIDA = 'fallida'
+    ESTADOS_CHOICES = [
+        (PENDIENTE, 'Pendiente'),
+        (PROCESANDO, 'Procesando'),
+        (COMPLETADA, 'Completada'),
+        (FALLIDA, 'Fallida'),
+    ]
+    FORMATOS_CHOICES = [
+        ('json', 'Arreglo JSON'),
+        ('ndjson', 'NDJSON'),
+    ]
+    
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL, 
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='importaciones_preguntas',
+        verbose_name='Usuario'
+    )
+    archivo = models.FileField(
+        upload_to='importaciones/%Y/%m/',
+        verbose_name='Archivo'
+    )
+    nombre_archivo = models.CharField(
+        max_length=255,
+        verbose_name='Nombre del Archivo'
+    )
+    formato = models.CharField(
+        max_length=10,
+        choices=FORMATOS_CHOICES,
+        default='json',
+        verbose_name='Formato'
+    )
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADOS_CHOICES,
+        default=PENDIENTE,
+        verbose_name='Estado'
+    )
+    total = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Total de Filas'
+    )
+    procesadas = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Filas Procesadas'
+    )
+    exitosas = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Filas Exitosas'
+    )
+    errores = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Filas con Error'
+    )
+    mensaje_error = models.TextField(
+        blank=True,
+        verbose_name='Mensaje de Error'
+    )
+    fecha_creacion = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Creación'
+    )
+    fecha_inicio = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Inicio'
+    )
+    fecha_fin = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Fin'
+    )
+    
+    class Meta:
+        verbose_name = 'Importación de Preguntas'
+        verbose_name_plural = 'Importaciones de Preguntas'
+        db_table = 'importaciones_preguntas'
+        ordering = ['-fecha_creacion']
+    
+    def __str__(self):
+        return f"{self.nombre_archivo} ({self.get_estado_display()})"
+    
+    @property
+    def terminada(self):
+        return self.estado in (self.COMPLETADA, self.FALLIDA)
+
+
+class DetalleImportacion(models.Model):
+    """Resultado de una fila de una importación de preguntas"""
+    ESTADOS_CHOICES = [
+        ('exitosa', 'Exitosa'),
+        ('advertencia', 'Advertencia'),
+        ('error', 'Error'),
+    ]
+    
+    importacion = models.ForeignKey(
+        ImportacionPreguntas,
+        on_delete=models.CASCADE,
+        related_name='detalles',
+        verbose_name='Importación'
+    )
+    fila = models.PositiveIntegerField(
+        verbose_name='Fila'
+    )
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADOS_CHOICES,
+        verbose_name='Estado'
+    )
+    mensaje = models.TextField(
+        verbose_name='Mensaje'
+    )
+    pregunta = models.ForeignKey(
+        Pregunta,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Pregunta'
+    )
+    
+    class Meta:
+        verbose_name = 'Detalle de Importación'
+        verbose_name_plural = 'Detalles de Importación'
+        db_table = 'detalles_importacion'
+        ordering = ['fila', 'id']
+    
+    def __str__(self):
+        return f"Fila {self.fila}: {self.estado}"
@@ -2,8 +2,11 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import (
     Materia, Competencia, Pregunta, Sesion, RespuestaUsuario,
-    Clase, Asignacion, Insignia, LogroUsuario
+    Clase, Asignacion, Insignia, LogroUsuario,
+    ImportacionPreguntas, DetalleImportacion
 )
+from .catalogo import conteos_de
+from .imagenes import srcset_imagen_pregunta, url_imagen_pregunta
 
 User = get_user_model()
 
@@ -51,32 +54,50 @@ class UsuarioRegistroSerializer(serializers.ModelSerializer):
 class MateriaSerializer(serializers.ModelSerializer):
     """Serializer para el modelo Materia"""
     preguntas_count = serializers.SerializerMethodField()
+    preguntas_activas = serializers.SerializerMethodField()
+    preguntas_por_dificultad = serializers.SerializerMethodField()
     
     class Meta:
         model = Materia
         fields = [
             'id', 'nombre', 'nombre_display', 'color', 'icono',
-            'descripcion', 'activa', 'preguntas_count'
+            'descripcion', 'activa', 'preguntas_count',
+            'preguntas_activas', 'preguntas_por_dificultad'
         ]
     
     def get_preguntas_count(self, obj):
-        return obj.preguntas.count()
+        return conteos_de(obj)['total']
+
+    def get_preguntas_activas(self, obj):
+        return conteos_de(obj)['activas']
+
+    def get_preguntas_por_dificultad(self, obj):
+        return conteos_de(obj)['por_dificultad']
 
 
 class CompetenciaSerializer(serializers.ModelSerializer):
     """Serializer para el modelo Competencia"""
     materia_nombre = serializers.CharField(source='materia.nombre_display', read_only=True)
     preguntas_count = serializers.SerializerMethodField()
+    preguntas_activas = serializers.SerializerMethodField()
+    preguntas_por_dificultad = serializers.SerializerMethodField()
     
     class Meta:
         model = Competencia
         fields = [
             'id', 'materia', 'materia_nombre', 'nombre', 'descripcion',
-            'peso_icfes', 'preguntas_count'
+            'peso_icfes', 'preguntas_count',
+            'preguntas_activas', 'preguntas_por_dificultad'
         ]
     
     def get_preguntas_count(self, obj):
-        return obj.preguntas.count()
+        return conteos_de(obj)['total']
+
+    def get_preguntas_activas(self, obj):
+        return conteos_de(obj)['activas']
+
+    def get_preguntas_por_dificultad(self, obj):
+        return conteos_de(obj)['por_dificultad']
 
 
 class PreguntaSerializer(serializers.ModelSerializer):
@@ -84,33 +105,26 @@ class PreguntaSerializer(serializers.ModelSerializer):
     materia_nombre = serializers.CharField(source='materia.nombre_display', read_only=True)
     competencia_nombre = serializers.CharField(source='competencia.nombre', read_only=True)
     imagen_url = serializers.SerializerMethodField()
+    imagen_srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = Pregunta
         fields = [
             'id', 'materia', 'materia_nombre', 'competencia', 'competencia_nombre',
-            'contexto', 'imagen', 'imagen_url', 'enunciado', 'opciones', 'respuesta_correcta',
+            'contexto', 'imagen', 'imagen_url', 'imagen_srcset', 'enunciado', 'opciones', 'respuesta_correcta',
             'retroalimentacion', 'retroalimentacion_estructurada', 'explicacion', 'habilidad_evaluada', 
             'explicacion_opciones_incorrectas', 'estrategias_resolucion', 
             'errores_comunes', 'dificultad', 'tiempo_estimado', 'activa', 'tags'
         ]
-        read_only_fields = ['id', 'imagen_url']
+        read_only_fields = ['id', 'imagen_url', 'imagen_srcset']
     
     def get_imagen_url(self, obj):
-        """Obtener URL de imagen de forma segura (evita 500 si el archivo no existe)."""
-        try:
-            if obj.imagen and getattr(obj.imagen, 'name', None):
-                # Verificar existencia en el storage antes de acceder a .url
-                from django.core.files.storage import default_storage
-                if default_storage.exists(obj.imagen.name):
-                    request = self.context.get('request')
-                    if request:
-                        return request.build_absolute_uri(obj.imagen.url)
-                    return obj.imagen.url
-        except Exception:
-            # Si hay cualquier problema con el archivo, no bloquear la respuesta
-            return None
-        return None
+        """URL de la imagen según sus metadatos guardados (sin consultar el storage)"""
+        return url_imagen_pregunta(obj, self.context.get('request'))
+    
+    def get_imagen_srcset(self, obj):
+        """``srcset`` por formato (avif, webp) de las variantes de la imagen"""
+        return srcset_imagen_pregunta(obj, self.context.get('request'))
     
     def validate_opciones(self, value):
         """Validar formato de opciones (texto o texto+imagen)"""
@@ -145,27 +159,22 @@ class PreguntaSimulacionSerializer(serializers.ModelSerializer):
     materia_nombre = serializers.CharField(source='materia.nombre_display', read_only=True)
     competencia_nombre = serializers.CharField(source='competencia.nombre', read_only=True)
     imagen_url = serializers.SerializerMethodField()
+    imagen_srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = Pregunta
         fields = [
             'id', 'materia', 'materia_nombre', 'competencia', 'competencia_nombre',
-            'contexto', 'imagen', 'imagen_url', 'enunciado', 'opciones', 'respuesta_correcta', 'dificultad', 'tiempo_estimado', 'retroalimentacion_estructurada'
+            'contexto', 'imagen', 'imagen_url', 'imagen_srcset', 'enunciado', 'opciones', 'respuesta_correcta', 'dificultad', 'tiempo_estimado', 'retroalimentacion_estructurada'
         ]
     
     def get_imagen_url(self, obj):
-        """Obtener URL de imagen de forma segura (evita 500 si el archivo no existe)."""
-        try:
-            if obj.imagen and getattr(obj.imagen, 'name', None):
-                from django.core.files.storage import default_storage
-                if default_storage.exists(obj.imagen.name):
-                    request = self.context.get('request')
-                    if request:
-                        return request.build_absolute_uri(obj.imagen.url)
-                    return obj.imagen.url
-        except Exception:
-            return None
-        return None
+        """URL de la imagen según sus metadatos guardados (sin consultar el storage)"""
+        return url_imagen_pregunta(obj, self.context.get('request'))
+    
+    def get_imagen_srcset(self, obj):
+        """``srcset`` por formato (avif, webp) de las variantes de la imagen"""
+        return srcset_imagen_pregunta(obj, self.context.get('request'))
 
 
 class PreguntaRetroalimentacionSerializer(serializers.ModelSerializer):
@@ -173,28 +182,23 @@ class PreguntaRetroalimentacionSerializer(serializers.ModelSerializer):
     materia_nombre = serializers.CharField(source='materia.nombre_display', read_only=True)
     competencia_nombre = serializers.CharField(source='competencia.nombre', read_only=True)
     imagen_url = serializers.SerializerMethodField()
+    imagen_srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = Pregunta
         fields = [
-            'id', 'materia_nombre', 'competencia_nombre', 'contexto', 'imagen', 'imagen_url', 'enunciado', 'opciones',
+            'id', 'materia_nombre', 'competencia_nombre', 'contexto', 'imagen', 'imagen_url', 'imagen_srcset', 'enunciado', 'opciones',
             'respuesta_correcta', 'retroalimentacion', 'retroalimentacion_estructurada', 'explicacion', 'habilidad_evaluada',
             'explicacion_opciones_incorrectas', 'estrategias_resolucion', 'errores_comunes'
         ]
     
     def get_imagen_url(self, obj):
-        """Obtener URL de imagen de forma segura (evita 500 si el archivo no existe)."""
-        try:
-            if obj.imagen and getattr(obj.imagen, 'name', None):
-                from django.core.files.storage import default_storage
-                if default_storage.exists(obj.imagen.name):
-                    request = self.context.get('request')
-                    if request:
-                        return request.build_absolute_uri(obj.imagen.url)
-                    return obj.imagen.url
-        except Exception:
-            return None
-        return None
+        """URL de la imagen según sus metadatos guardados (sin consultar el storage)"""
+        return url_imagen_pregunta(obj, self.context.get('request'))
+    
+    def get_imagen_srcset(self, obj):
+        """``srcset`` por formato (avif, webp) de las variantes de la imagen"""
+        return srcset_imagen_pregunta(obj, self.context.get('request'))
 
 
 class RespuestaUsuarioSerializer(serializers.ModelSerializer):
@@ -324,6 +328,30 @@ class LogroUsuarioSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'fecha_obtenido']
 
 
+class ImportacionPreguntasSerializer(serializers.ModelSerializer):
+    """Serializer para el estado de una importación de preguntas"""
+    terminada = serializers.BooleanField(read_only=True)
+    
+    class Meta:
+        model = ImportacionPreguntas
+        fields = [
+            'id', 'nombre_archivo', 'formato', 'estado', 'terminada',
+            'total', 'procesadas', 'exitosas', 'errores', 'mensaje_error',
+            'fecha_creacion', 'fecha_inicio', 'fecha_fin'
+        ]
+        read_only_fields = fields
+
+
+class DetalleImportacionSerializer(serializers.ModelSerializer):
+    """Serializer para el resultado de una fila importada"""
+    id_pregunta = serializers.IntegerField(source='pregunta_id', read_only=True)
+    
+    class Meta:
+        model = DetalleImportacion
+        fields = ['fila', 'estado', 'id_pregunta', 'mensaje']
+        read_only_fields = fields
+
+
 # Serializers para listas y detalles
 class MateriaDetailSerializer(MateriaSerializer):
     """Serializer detallado para Materia con competencias"""
@@ -1,7 +1,35 @@
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
-from .models import Sesion, RespuestaUsuario, LogroUsuario, Insignia
+from .models import Sesion, RespuestaUsuario, LogroUsuario, Pregunta, Materia, Competencia, EventoGamificacion
+from .catalogo import invalidar_catalogo
+from .gamificacion import PUNTOS_RESPUESTA_CORRECTA, registrar_evento
+from .imagenes import calcular_metadatos_con_variantes, guardar_metadatos_imagen, metadatos_vigentes
+
+
+@receiver(post_save, sender=Pregunta)
+def actualizar_metadatos_imagen(sender, instance, **kwargs):
+    """Recalcula los metadatos y las variantes de la imagen cuando el archivo cambia"""
+    nombre = getattr(instance.imagen, 'name', None) or ''
+    if not metadatos_vigentes(nombre, instance.imagen_metadatos):
+        guardar_metadatos_imagen(instance, calcular_metadatos_con_variantes(instance.imagen))
+
+
+@receiver(post_save, sender=Pregunta)
+@receiver(post_delete, sender=Pregunta)
+@receiver(post_save, sender=Competencia)
+@receiver(post_delete, sender=Competencia)
+@receiver(post_save, sender=Materia)
+@receiver(post_delete, sender=Materia)
+def invalidar_conteos_catalogo(sender, instance, **kwargs):
+    """
+    Descarta los conteos de preguntas cacheados. Se invalida de nuevo al
+    confirmar la transacción: lo que otro proceso haya recalculado entre
+    tanto con datos previos queda descartado.
+    """
+    invalidar_catalogo()
+    transaction.on_commit(invalidar_catalogo)
 
 
 @receiver(post_save, sender=Sesion)
@@ -13,93 +41,28 @@ def actualizar_racha_usuario(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=RespuestaUsuario)
 def actualizar_puntos_usuario(sender, instance, created, **kwargs):
-    """Actualiza los puntos del usuario cuando responde correctamente"""
+    """Registra los puntos de una respuesta correcta"""
     if created and instance.es_correcta:
-        # Dar puntos por respuesta correcta
-        puntos_por_respuesta = 10
-        instance.sesion.usuario.puntos_totales += puntos_por_respuesta
-        instance.sesion.usuario.save()
+        registrar_evento(
+            instance.sesion.usuario_id,
+            EventoGamificacion.RESPUESTA_CORRECTA,
+            puntos=PUNTOS_RESPUESTA_CORRECTA
+        )
 
 
 @receiver(post_save, sender=LogroUsuario)
 def evaluar_nuevas_insignias(sender, instance, created, **kwargs):
-    """Evalúa si el usuario merece nuevas insignias después de obtener una"""
+    """Registra el logro para evaluar si el usuario merece nuevas insignias"""
     if created:
-        usuario = instance.usuario
-        
-        # Obtener todas las insignias que el usuario no tiene
-        insignias_disponibles = Insignia.objects.exclude(
-            logros_usuarios__usuario=usuario
-        )
-        
-        for insignia in insignias_disponibles:
-            if insignia.evaluar_criterio(usuario):
-                LogroUsuario.objects.create(
-                    usuario=usuario,
-                    insignia=insignia,
-                    contexto={'obtenida_por': 'evaluacion_automatica'}
-                )
+        registrar_evento(instance.usuario_id, EventoGamificacion.LOGRO_OBTENIDO)
 
 
 @receiver(post_save, sender=Sesion)
 def evaluar_insignias_por_sesion(sender, instance, created, **kwargs):
-    """Evalúa insignias basadas en el rendimiento de la sesión"""
+    """Registra la sesión completada para evaluar las insignias de sesión"""
     if instance.completada:
-        usuario = instance.usuario
-        
-        # Insignia por completar primera sesión
-        if Sesion.objects.filter(usuario=usuario, completada=True).count() == 1:
-            insignia_primer_sesion, _ = Insignia.objects.get_or_create(
-                nombre='Primera Sesión',
-                defaults={
-                    'descripcion': 'Completaste tu primera sesión de práctica',
-                    'icono': 'star',
-                    'color': '#10b981',
-                    'criterio': {'tipo': 'primera_sesion'},
-                    'puntos': 50
-                }
-            )
-            
-            LogroUsuario.objects.get_or_create(
-                usuario=usuario,
-                insignia=insignia_primer_sesion,
-                defaults={'contexto': {'obtenida_por': 'primera_sesion'}}
-            )
-        
-        # Insignia por puntaje alto (más de 80%)
-        if instance.puntaje_final and instance.puntaje_final >= 80:
-            insignia_alto_rendimiento, _ = Insignia.objects.get_or_create(
-                nombre='Alto Rendimiento',
-                defaults={
-                    'descripcion': 'Obtuviste un puntaje de 80% o más',
-                    'icono': 'trophy',
-                    'color': '#f59e0b',
-                    'criterio': {'tipo': 'puntaje_alto', 'minimo': 80},
-                    'puntos': 100
-                }
-            )
-            
-            LogroUsuario.objects.get_or_create(
-                usuario=usuario,
-                insignia=insignia_alto_rendimiento,
-                defaults={'contexto': {'obtenida_por': 'puntaje_alto', 'puntaje': instance.puntaje_final}}
-            )
-        
-        # Insignia por racha de práctica
-        if usuario.racha_actual >= 7:
-            insignia_racha_semana, _ = Insignia.objects.get_or_create(
-                nombre='Racha Semanal',
-                defaults={
-                    'descripcion': 'Practicaste 7 días seguidos',
-                    'icono': 'fire',
-                    'color': '#ef4444',
-                    'criterio': {'tipo': 'racha', 'dias': 7},
-                    'puntos': 200
-                }
-            )
-            
-            LogroUsuario.objects.get_or_create(
-                usuario=usuario,
-                insignia=insignia_racha_semana,
-                defaults={'contexto': {'obtenida_por': 'racha_semana', 'racha': usuario.racha_actual}}
-            ) 
\ No newline at end of file
+        registrar_evento(
+            instance.usuario_id,
+            EventoGamificacion.SESION_COMPLETADA,
+            puntaje_final=instance.puntaje_final
+        )
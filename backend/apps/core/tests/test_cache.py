@@ -0,0 +1,105 @@
+"""
+Tests para las utilidades de cache compartidas
+"""
+import shutil
+import tempfile
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache as cache_django
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import SimpleTestCase, override_settings
+
+from apps.core import cache
+
+
+class VersionesCacheTest(SimpleTestCase):
+    """Tests para version, invalidar y clave_versionada"""
+
+    def setUp(self):
+        cache_django.clear()
+
+    def test_version_inicial_e_invalidacion(self):
+        self.assertEqual(cache.version('pruebas:espacio'), 1)
+        self.assertEqual(cache.clave_versionada('pruebas:espacio', 7, 'x'), 'pruebas:espacio:v1:7:x')
+
+        cache.invalidar('pruebas:espacio', 'pruebas:espacio')
+
+        self.assertEqual(cache.version('pruebas:espacio'), 2)
+        self.assertEqual(cache.version('pruebas:otro'), 1)
+
+    def test_invalidar_espacio_sin_version(self):
+        cache.invalidar('pruebas:nuevo')
+        self.assertEqual(cache.version('pruebas:nuevo'), 2)
+
+
+class ObtenerOCalcularTest(SimpleTestCase):
+    """Tests para la protección contra estampidas"""
+
+    def setUp(self):
+        cache_django.clear()
+
+    def test_calcula_una_vez(self):
+        calcular = Mock(return_value={'total': 3})
+
+        for _ in range(3):
+            self.assertEqual(cache.obtener_o_calcular('pruebas:valor', calcular, 60), {'total': 3})
+
+        calcular.assert_called_once()
+        self.assertIsNone(cache_django.get('pruebas:valor:candado'))
+
+    def test_valor_none_se_cachea(self):
+        calcular = Mock(return_value=None)
+        cache.obtener_o_calcular('pruebas:nulo', calcular, 60)
+        cache.obtener_o_calcular('pruebas:nulo', calcular, 60)
+        calcular.assert_called_once()
+
+    def test_espera_al_proceso_que_calcula(self):
+        # Otro proceso tiene el candado y publica el valor mientras esperamos
+        cache_django.add('pruebas:lento:candado', 1)
+        calcular = Mock(return_value='propio')
+
+        def publicar(_segundos):
+            cache_django.set('pruebas:lento', 'ajeno')
+
+        with patch('apps.core.cache.time.sleep', side_effect=publicar):
+            valor = cache.obtener_o_calcular('pruebas:lento', calcular, 60)
+
+        self.assertEqual(valor, 'ajeno')
+        calcular.assert_not_called()
+
+    @patch('apps.core.cache.ESPERA_CANDADO', 0.01)
+    def test_calcula_si_la_espera_vence(self):
+        cache_django.add('pruebas:colgado:candado', 1)
+
+        valor = cache.obtener_o_calcular('pruebas:colgado', lambda: 'propio', 60)
+
+        self.assertEqual(valor, 'propio')
+        self.assertIsNone(cache_django.get('pruebas:colgado'))
+
+    def test_error_libera_candado(self):
+        with self.assertRaises(ZeroDivisionError):
+            cache.obtener_o_calcular('pruebas:error', lambda: 1 / 0, 60)
+        self.assertIsNone(cache_django.get('pruebas:error:candado'))
+
+
+class CacheEntreProcesosTest(SimpleTestCase):
+    """Con un backend compartido, otro proceso ve versiones y valores"""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+
+    def test_backend_de_archivos(self):
+        config = {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': self.directorio,
+            'KEY_PREFIX': 'simulador',
+        }
+        with override_settings(CACHES={'default': config}):
+            cache.invalidar('pruebas:compartido')
+            cache.obtener_o_calcular('pruebas:compartido:dato', lambda: [1, 2], 60)
+
+        # Una instancia nueva simula otro worker apuntando al mismo directorio
+        otro_worker = FileBasedCache(self.directorio, {'KEY_PREFIX': 'simulador'})
+        self.assertEqual(otro_worker.get('pruebas:compartido:version'), 2)
+        self.assertEqual(otro_worker.get('pruebas:compartido:dato'), [1, 2])
@@ -0,0 +1,88 @@
+"""
+Tests para los conteos de preguntas del catálogo
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core.cache import clave_versionada
+from apps.core.catalogo import ESPACIO_CATALOGO, anotar_conteos, conteos_catalogo, conteos_de
+from apps.core.models import Materia
+from apps.core.serializers import MateriaSerializer
+from .factories import CompetenciaFactory, EstudianteFactory, MateriaFactory, PreguntaFactory
+
+
+class ConteosCatalogoTest(TestCase):
+    """Los conteos anotados y los cacheados deben coincidir"""
+
+    def setUp(self):
+        cache.clear()
+        self.materia = MateriaFactory()
+        self.competencia = CompetenciaFactory(materia=self.materia)
+        PreguntaFactory(materia=self.materia, competencia=self.competencia, dificultad='facil')
+        PreguntaFactory(materia=self.materia, competencia=self.competencia, dificultad='dificil')
+        PreguntaFactory(materia=self.materia, competencia=None, dificultad='facil', activa=False)
+
+    def test_conteos_anotados(self):
+        materia = anotar_conteos(Materia.objects.filter(pk=self.materia.pk)).get()
+        self.assertEqual(conteos_de(materia), {
+            'total': 3,
+            'activas': 2,
+            'por_dificultad': {'facil': 1, 'media': 0, 'dificil': 1},
+        })
+        self.assertEqual(conteos_de(self.competencia)['total'], 2)
+
+    def test_catalogo_cacheado_sin_consultas(self):
+        esperado = conteos_de(anotar_conteos(Materia.objects.filter(pk=self.materia.pk)).get())
+        conteos_catalogo()
+        materia = Materia.objects.get(pk=self.materia.pk)
+        with CaptureQueriesContext(connection) as consultas:
+            data = MateriaSerializer(materia).data
+        self.assertEqual(len(consultas), 0)
+        self.assertEqual(data['preguntas_count'], esperado['total'])
+        self.assertEqual(data['preguntas_por_dificultad'], esperado['por_dificultad'])
+
+    def test_escribir_preguntas_invalida_el_catalogo(self):
+        self.assertEqual(conteos_catalogo()['materias'][self.materia.pk]['total'], 3)
+        PreguntaFactory(materia=self.materia, competencia=None)
+        self.assertEqual(conteos_catalogo()['materias'][self.materia.pk]['total'], 4)
+        self.materia.preguntas.first().delete()
+        self.assertEqual(conteos_catalogo()['materias'][self.materia.pk]['total'], 3)
+
+    def test_confirmar_descarta_lo_recalculado_antes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            PreguntaFactory(materia=self.materia, competencia=None)
+            # Otro proceso recalcula con datos previos a la confirmación
+            cache.set(clave_versionada(ESPACIO_CATALOGO, 'conteos'), {'materias': {}, 'competencias': {}})
+        self.assertEqual(conteos_catalogo()['materias'][self.materia.pk]['total'], 4)
+
+
+class CatalogoViewsTest(APITestCase):
+    """Los endpoints del catálogo no consultan una vez por fila"""
+
+    def setUp(self):
+        self.client.force_authenticate(user=EstudianteFactory())
+
+    def _consultas_listado(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(consultas)
+
+    def test_listados_con_consultas_constantes(self):
+        for url in ('/api/core/materias/', '/api/core/competencias/'):
+            PreguntaFactory()
+            pocas = self._consultas_listado(url)
+            for _ in range(4):
+                PreguntaFactory()
+            self.assertEqual(self._consultas_listado(url), pocas, url)
+
+    def test_detalle_materia_con_competencias(self):
+        competencia = CompetenciaFactory()
+        PreguntaFactory.create_batch(2, materia=competencia.materia, competencia=competencia)
+        response = self.client.get(f'/api/core/materias/{competencia.materia_id}/')
+        self.assertEqual(response.data['preguntas_count'], 2)
+        self.assertEqual(response.data['competencias'][0]['preguntas_activas'], 2)
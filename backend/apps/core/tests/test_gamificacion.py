@@ -0,0 +1,91 @@
+"""
+Tests para el procesamiento de los eventos de gamificación
+"""
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.core import gamificacion
+from apps.core.gamificacion import procesar_eventos, programar_procesamiento
+from apps.core.models import EventoGamificacion, Insignia, LogroUsuario
+from .factories import (
+    EstudianteFactory, PreguntaFactory, RespuestaUsuarioFactory, SesionCompletadaFactory, SesionFactory
+)
+
+
+@override_settings(GAMIFICACION_EN_SEGUNDO_PLANO=True)
+class EventosGamificacionTest(TestCase):
+    """Las señales solo registran eventos; el procesador los aplica por lote"""
+
+    def responder_bien(self, sesion, cantidad):
+        for _ in range(cantidad):
+            RespuestaUsuarioFactory(
+                sesion=sesion,
+                pregunta=PreguntaFactory(respuesta_correcta='A', competencia=None),
+                respuesta_seleccionada='A'
+            )
+
+    def test_puntos_se_aplican_al_procesar(self):
+        usuario = EstudianteFactory(puntos_totales=5)
+        self.responder_bien(SesionFactory(usuario=usuario), 3)
+
+        usuario.refresh_from_db()
+        self.assertEqual(usuario.puntos_totales, 5)
+        self.assertEqual(EventoGamificacion.objects.count(), 3)
+
+        self.assertEqual(procesar_eventos(), 3)
+        usuario.refresh_from_db()
+        self.assertEqual(usuario.puntos_totales, 35)
+        self.assertFalse(EventoGamificacion.objects.exists())
+
+    def test_puntos_agrupados_por_delta(self):
+        usuarios = EstudianteFactory.create_batch(2, puntos_totales=0)
+        for usuario in usuarios:
+            self.responder_bien(SesionFactory(usuario=usuario), 4)
+
+        with CaptureQueriesContext(connection) as consultas:
+            procesar_eventos()
+        actualizaciones = [q for q in consultas if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(actualizaciones), 1)
+        for usuario in usuarios:
+            usuario.refresh_from_db()
+            self.assertEqual(usuario.puntos_totales, 40)
+
+    def test_insignias_de_sesion_en_lote(self):
+        usuarios = EstudianteFactory.create_batch(3)
+        for usuario in usuarios:
+            SesionCompletadaFactory(usuario=usuario, puntaje_final=90)
+            SesionCompletadaFactory(usuario=usuario, puntaje_final=40)
+        self.assertFalse(LogroUsuario.objects.exists())
+
+        procesar_eventos(tamano_lote=4)
+        for usuario in usuarios:
+            self.assertEqual(
+                set(usuario.logros.values_list('insignia__nombre', flat=True)),
+                {'Primera Sesión', 'Alto Rendimiento'}
+            )
+        self.assertEqual(Insignia.objects.filter(nombre='Primera Sesión').count(), 1)
+
+        # Reprocesar otra sesión no duplica logros
+        SesionCompletadaFactory(usuario=usuarios[0], puntaje_final=95)
+        procesar_eventos()
+        self.assertEqual(usuarios[0].logros.count(), 2)
+
+    def test_cascada_de_insignias(self):
+        usuario = EstudianteFactory()
+        insignia = Insignia.objects.create(nombre='Siempre', descripcion='', icono='star', criterio={})
+        with patch.object(Insignia, 'evaluar_criterio', return_value=True):
+            SesionCompletadaFactory(usuario=usuario, puntaje_final=10)
+            procesar_eventos()
+        self.assertTrue(usuario.logros.filter(insignia=insignia).exists())
+
+    def test_programar_agrupa_llamadas(self):
+        with patch.object(gamificacion, '_obtener_ejecutor') as ejecutor:
+            try:
+                programar_procesamiento()
+                programar_procesamiento()
+            finally:
+                gamificacion._programado = False
+        self.assertEqual(ejecutor.return_value.submit.call_count, 1)
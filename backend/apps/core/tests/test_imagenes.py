@@ -0,0 +1,154 @@
+"""
+Tests para los metadatos de imágenes de preguntas
+"""
+import io
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from apps.core.imagenes import obtener_metadatos_imagen
+from apps.core.models import Pregunta
+from apps.core.serializers import PreguntaSerializer, PreguntaSimulacionSerializer
+from .factories import PreguntaFactory
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+def imagen_png(nombre='grafico.png', ancho=40, alto=30):
+    """Genera un PNG en memoria listo para asignar a ``Pregunta.imagen``"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (ancho, alto), color='white').save(buffer, format='PNG')
+    return SimpleUploadedFile(nombre, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class MetadatosImagenTest(TestCase):
+    """Tests para el cálculo y uso de Pregunta.imagen_metadatos"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_TEMPORAL, ignore_errors=True)
+
+    def test_subir_imagen_calcula_metadatos(self):
+        pregunta = PreguntaFactory(imagen=imagen_png())
+
+        pregunta.refresh_from_db()
+        metadatos = pregunta.imagen_metadatos
+        self.assertEqual(metadatos['nombre'], pregunta.imagen.name)
+        self.assertTrue(metadatos['existe'])
+        self.assertEqual((metadatos['ancho'], metadatos['alto']), (40, 30))
+        self.assertEqual(metadatos['bytes'], pregunta.imagen.size)
+        self.assertEqual(metadatos['url'], pregunta.imagen.url)
+
+    def test_pregunta_sin_imagen_no_guarda_metadatos(self):
+        pregunta = PreguntaFactory()
+        pregunta.refresh_from_db()
+        self.assertEqual(pregunta.imagen_metadatos, {})
+
+    def test_serializar_no_consulta_el_storage(self):
+        PreguntaFactory.create_batch(3, imagen=imagen_png())
+        preguntas = Pregunta.objects.select_related('materia', 'competencia')
+
+        with patch.object(FileSystemStorage, 'exists') as exists:
+            data = PreguntaSerializer(preguntas, many=True).data
+            PreguntaSimulacionSerializer(preguntas, many=True).data
+
+        exists.assert_not_called()
+        self.assertTrue(all(p['imagen_url'].startswith('/media/') for p in data))
+
+    def test_cambiar_imagen_recalcula_metadatos(self):
+        pregunta = PreguntaFactory(imagen=imagen_png())
+        pregunta.imagen.save('nueva.png', imagen_png('nueva.png', 80, 60), save=True)
+
+        pregunta.refresh_from_db()
+        self.assertEqual(pregunta.imagen_metadatos['nombre'], pregunta.imagen.name)
+        self.assertEqual(pregunta.imagen_metadatos['ancho'], 80)
+
+        pregunta.imagen = None
+        pregunta.save()
+        pregunta.refresh_from_db()
+        self.assertFalse(pregunta.imagen_metadatos['existe'])
+        self.assertIsNone(PreguntaSerializer(pregunta).data['imagen_url'])
+
+    def test_archivo_faltante_no_tiene_url(self):
+        pregunta = PreguntaFactory()
+        Pregunta.objects.filter(pk=pregunta.pk).update(imagen='preguntas/no_existe.png')
+        pregunta.refresh_from_db()
+
+        self.assertIsNone(PreguntaSerializer(pregunta).data['imagen_url'])
+        self.assertFalse(pregunta.imagen_metadatos['existe'])
+
+    def test_pregunta_antigua_calcula_metadatos_una_vez(self):
+        pregunta = PreguntaFactory(imagen=imagen_png())
+        Pregunta.objects.filter(pk=pregunta.pk).update(imagen_metadatos={})
+        pregunta.refresh_from_db()
+
+        self.assertTrue(obtener_metadatos_imagen(pregunta)['existe'])
+        pregunta.refresh_from_db()
+        with patch.object(FileSystemStorage, 'exists') as exists:
+            obtener_metadatos_imagen(pregunta)
+        exists.assert_not_called()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class VariantesImagenTest(TestCase):
+    """Tests para las variantes responsivas de las imágenes"""
+
+    def test_subir_imagen_genera_variantes_por_ancho(self):
+        pregunta = PreguntaFactory(imagen=imagen_png(ancho=700, alto=350))
+
+        pregunta.refresh_from_db()
+        variantes = pregunta.imagen_metadatos['variantes']
+        self.assertIn('webp', variantes)
+        self.assertEqual([v['ancho'] for v in variantes['webp']], [160, 320, 640, 700])
+        self.assertEqual(variantes['webp'][1]['alto'], 160)
+        for variante in variantes['webp']:
+            self.assertTrue(pregunta.imagen.storage.exists(variante['nombre']))
+            self.assertTrue(variante['nombre'].endswith(f"_{variante['ancho']}w.webp"))
+
+    def test_serializers_exponen_srcset(self):
+        pregunta = PreguntaFactory(imagen=imagen_png(ancho=200, alto=100))
+        pregunta.refresh_from_db()
+
+        srcset = PreguntaSimulacionSerializer(pregunta).data['imagen_srcset']
+
+        urls = [v['url'] for v in pregunta.imagen_metadatos['variantes']['webp']]
+        self.assertEqual(srcset['webp'], f'{urls[0]} 160w, {urls[1]} 200w')
+        self.assertEqual(PreguntaSerializer(PreguntaFactory()).data['imagen_srcset'], {})
+
+    def test_comando_genera_variantes_faltantes(self):
+        con_variantes = PreguntaFactory(imagen=imagen_png())
+        antigua = PreguntaFactory(imagen=imagen_png())
+        metadatos = dict(antigua.imagen_metadatos)
+        del metadatos['variantes']
+        Pregunta.objects.filter(pk=antigua.pk).update(imagen_metadatos=metadatos)
+
+        with patch('apps.core.imagenes.generar_variantes_archivo', return_value={'webp': []}) as generar:
+            call_command('generar_variantes_imagenes', stdout=io.StringIO())
+
+        generar.assert_called_once()
+        antigua.refresh_from_db()
+        self.assertEqual(antigua.imagen_metadatos['variantes'], {'webp': []})
+        con_variantes.refresh_from_db()
+        self.assertNotEqual(con_variantes.imagen_metadatos['variantes'], {'webp': []})
+
+    def test_comando_incluye_metadatos_calculados_al_leer(self):
+        antigua = PreguntaFactory(imagen=imagen_png())
+        Pregunta.objects.filter(pk=antigua.pk).update(imagen_metadatos={})
+        antigua.refresh_from_db()
+        obtener_metadatos_imagen(antigua)
+        self.assertEqual(antigua.imagen_metadatos['variantes'], {})
+
+        with patch('apps.core.imagenes.generar_variantes_archivo', return_value={'webp': []}) as generar:
+            call_command('generar_variantes_imagenes', stdout=io.StringIO())
+
+        generar.assert_called_once()
+        antigua.refresh_from_db()
+        self.assertEqual(antigua.imagen_metadatos['variantes'], {'webp': []})
@@ -0,0 +1,339 @@
+"""
+Tests para la importación masiva de preguntas
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache as cache_django
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core import cache
+from apps.core.importacion import importar_preguntas
+from apps.core.ingesta_imagenes import DIRECTORIO_IMPORTADAS
+from apps.core.models import Competencia, ImportacionPreguntas, Materia, Pregunta
+from apps.core.trabajos import _ejecutar_en_hilo, ejecutar_importacion, encolar_importacion
+from .factories import DocenteFactory, EstudianteFactory, MateriaFactory
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+def fila(**extra):
+    datos = {
+        'materia': 'matematicas',
+        'enunciado': '¿Cuánto es 2+2?',
+        'opciones': {'A': '3', 'B': '4', 'C': '5', 'D': '6'},
+        'respuesta_correcta': 'b',
+        'retroalimentacion': 'Suma directa',
+    }
+    datos.update(extra)
+    return datos
+
+
+class ImportarPreguntasTest(TestCase):
+    """Tests para importar_preguntas"""
+
+    def setUp(self):
+        cache_django.clear()
+        self.materia = MateriaFactory(nombre='matematicas')
+
+    def test_reporte_por_fila_en_orden(self):
+        datos = [
+            fila(competencia='aritmetica'),
+            fila(opciones={'A': '1', 'B': '2'}),
+            {'materia': 'matematicas'},
+            fila(materia='Inglés', opciones={'A': 'cat', 'B': 'dog', 'C': 'cow'}, respuesta_correcta='C'),
+            fila(respuesta_correcta='Z'),
+        ]
+
+        resultado = importar_preguntas(datos)
+
+        self.assertEqual((resultado['exitosas'], resultado['errores']), (2, 3))
+        self.assertEqual(
+            [(d['fila'], d['estado']) for d in resultado['detalles']],
+            [(1, 'exitosa'), (2, 'error'), (3, 'error'), (4, 'exitosa'), (5, 'error')]
+        )
+        self.assertIn('se requieren las opciones', resultado['detalles'][1]['mensaje'])
+        self.assertIn('Campos requeridos faltantes', resultado['detalles'][2]['mensaje'])
+
+        pregunta = Pregunta.objects.get(pk=resultado['detalles'][0]['id_pregunta'])
+        self.assertEqual(pregunta.respuesta_correcta, 'B')
+        self.assertEqual(pregunta.competencia.materia, self.materia)
+        self.assertTrue(Materia.objects.filter(nombre='Inglés', nombre_display='Inglés').exists())
+
+    def test_filas_invalidas_no_crean_materias(self):
+        importar_preguntas([fila(materia='fisica', enunciado='')])
+        self.assertFalse(Materia.objects.filter(nombre='fisica').exists())
+
+    def test_competencias_se_resuelven_una_vez(self):
+        datos = [fila(competencia='aritmetica') for _ in range(5)]
+
+        importar_preguntas(datos)
+
+        self.assertEqual(Competencia.objects.filter(nombre='aritmetica').count(), 1)
+        self.assertEqual(Pregunta.objects.filter(competencia__nombre='aritmetica').count(), 5)
+
+    def test_consultas_por_lote_y_no_por_fila(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = importar_preguntas([fila(competencia='aritmetica') for _ in range(200)])
+        self.assertEqual(resultado['exitosas'], 200)
+        self.assertLess(len(consultas), 20)
+
+        with CaptureQueriesContext(connection) as consultas:
+            importar_preguntas([fila() for _ in range(25)], tamano_lote=10)
+        inserts = [q for q in consultas.captured_queries if q['sql'].startswith('INSERT INTO "preguntas"')]
+        self.assertEqual(len(inserts), 3)
+
+    def test_imagen_faltante_es_advertencia(self):
+        resultado = importar_preguntas([fila(imagen_archivo='no_existe.png')])
+
+        self.assertEqual(resultado['exitosas'], 1)
+        self.assertEqual([d['estado'] for d in resultado['detalles']], ['advertencia', 'exitosa'])
+
+    def test_invalida_pool_de_muestreo(self):
+        version = cache.version('simulacion:pool_preguntas')
+        with self.captureOnCommitCallbacks(execute=True):
+            importar_preguntas([fila()])
+        self.assertEqual(cache.version('simulacion:pool_preguntas'), version + 1)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class ImagenesImportacionTest(TestCase):
+    """Tests para la ingesta de imagen_archivo"""
+
+    def setUp(self):
+        MateriaFactory(nombre='ciencias')
+        self.directorio = os.path.join(MEDIA_TEMPORAL, 'temp_images')
+        os.makedirs(self.directorio, exist_ok=True)
+        self.addCleanup(shutil.rmtree, MEDIA_TEMPORAL, ignore_errors=True)
+
+    def escribir(self, nombre, contenido=None, ancho=40, alto=30):
+        if contenido is None:
+            buffer = io.BytesIO()
+            Image.new('RGB', (ancho, alto), color='white').save(buffer, format='PNG')
+            contenido = buffer.getvalue()
+        with open(os.path.join(self.directorio, nombre), 'wb') as archivo:
+            archivo.write(contenido)
+
+    def test_imagenes_identicas_se_guardan_una_vez(self):
+        self.escribir('a.png')
+        self.escribir('copia_de_a.png')
+
+        resultado = importar_preguntas([
+            fila(materia='ciencias', imagen_archivo='a.png'),
+            fila(materia='ciencias', imagen_archivo='copia_de_a.png'),
+        ])
+
+        self.assertEqual(resultado['exitosas'], 2)
+        nombres = set(Pregunta.objects.values_list('imagen', flat=True))
+        self.assertEqual(len(nombres), 1)
+        pregunta = Pregunta.objects.first()
+        self.assertTrue(pregunta.imagen.name.startswith(DIRECTORIO_IMPORTADAS))
+        self.assertEqual(pregunta.imagen_metadatos['nombre'], pregunta.imagen.name)
+        self.assertEqual((pregunta.imagen_metadatos['ancho'], pregunta.imagen_metadatos['alto']), (40, 30))
+        self.assertEqual([v['ancho'] for v in pregunta.imagen_metadatos['variantes']['webp']], [40])
+
+    def test_imagen_invalida_o_grande_es_error(self):
+        self.escribir('texto.png', b'no es una imagen')
+        self.escribir('grande.png', ancho=400, alto=400)
+
+        with patch('apps.core.ingesta_imagenes.TAMANO_MAXIMO_IMAGEN', 100):
+            resultado = importar_preguntas([
+                fila(materia='ciencias', imagen_archivo='texto.png'),
+                fila(materia='ciencias', imagen_archivo='grande.png'),
+                fila(materia='ciencias', imagen_archivo='../grande.png'),
+            ])
+
+        self.assertEqual((resultado['exitosas'], resultado['errores']), (0, 3))
+        self.assertIn('no es una imagen válida', resultado['detalles'][0]['mensaje'])
+        self.assertIn('muy grande', resultado['detalles'][1]['mensaje'])
+        self.assertIn('sin rutas', resultado['detalles'][2]['mensaje'])
+        self.assertFalse(Pregunta.objects.exists())
+
+    @patch('apps.core.ingesta_imagenes.LADO_MAXIMO', 50)
+    def test_imagen_con_lado_mayor_se_reduce(self):
+        self.escribir('mapa.png', ancho=200, alto=100)
+
+        importar_preguntas([fila(materia='ciencias', imagen_archivo='mapa.png')])
+
+        pregunta = Pregunta.objects.get()
+        self.assertEqual((pregunta.imagen.width, pregunta.imagen.height), (50, 25))
+        self.assertEqual(pregunta.imagen_metadatos['bytes'], pregunta.imagen.size)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL, IMPORTACIONES_EN_SEGUNDO_PLANO=False)
+class CargaMasivaViewTest(APITestCase):
+    """Tests para el endpoint carga_masiva y el seguimiento de importaciones"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_TEMPORAL, ignore_errors=True)
+
+    def archivo(self, datos, nombre='preguntas.json'):
+        return SimpleUploadedFile(nombre, json.dumps(datos).encode('utf-8'), content_type='application/json')
+
+    def cargar(self, archivo):
+        return self.client.post('/api/core/preguntas/carga_masiva/', {'archivo': archivo}, format='multipart')
+
+    def test_carga_masiva_docente(self):
+        self.client.force_authenticate(user=DocenteFactory())
+
+        response = self.cargar(self.archivo([fila(), fila(enunciado='')]))
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['estado'], ImportacionPreguntas.COMPLETADA)
+        self.assertEqual(
+            (response.data['total'], response.data['procesadas'], response.data['exitosas'], response.data['errores']),
+            (2, 2, 1, 1)
+        )
+
+        url = f"/api/core/preguntas/importaciones/{response.data['id']}/"
+        estado = self.client.get(url)
+        self.assertEqual(estado.status_code, status.HTTP_200_OK)
+        self.assertTrue(estado.data['terminada'])
+
+        detalles = self.client.get(url + 'detalles/')
+        self.assertEqual(detalles.data['count'], 2)
+        self.assertEqual([d['estado'] for d in detalles.data['results']], ['exitosa', 'error'])
+        self.assertTrue(Pregunta.objects.filter(pk=detalles.data['results'][0]['id_pregunta']).exists())
+
+    def test_detalles_paginados_y_filtrados(self):
+        self.client.force_authenticate(user=DocenteFactory())
+        datos = [fila(enunciado=f'Pregunta {i}') for i in range(5)] + [fila(enunciado='')]
+        importacion_id = self.cargar(self.archivo(datos)).data['id']
+        url = f'/api/core/preguntas/importaciones/{importacion_id}/detalles/'
+
+        response = self.client.get(url, {'page_size': 2, 'page': 2})
+        self.assertEqual(response.data['count'], 6)
+        self.assertEqual([d['fila'] for d in response.data['results']], [3, 4])
+
+        response = self.client.get(url, {'estado': 'error'})
+        self.assertEqual([d['fila'] for d in response.data['results']], [6])
+
+    def test_carga_masiva_ndjson(self):
+        self.client.force_authenticate(user=DocenteFactory())
+        contenido = '\n'.join(json.dumps(fila(enunciado=f'Pregunta {i}')) for i in range(3))
+
+        response = self.cargar(SimpleUploadedFile('preguntas.ndjson', contenido.encode('utf-8')))
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['formato'], 'ndjson')
+        self.assertEqual(response.data['exitosas'], 3)
+
+    def test_json_invalido_no_guarda_nada(self):
+        self.client.force_authenticate(user=DocenteFactory())
+        contenido = json.dumps([fila() for _ in range(600)])[:-3]
+
+        response = self.cargar(SimpleUploadedFile('preguntas.json', contenido.encode('utf-8')))
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['estado'], ImportacionPreguntas.FALLIDA)
+        self.assertIn('JSON válido', response.data['mensaje_error'])
+        self.assertFalse(Pregunta.objects.exists())
+
+    def test_json_vacio_o_no_lista(self):
+        self.client.force_authenticate(user=DocenteFactory())
+        for contenido, mensaje in ((b'[]', 'vacío'), (b'{"materia": "x"}', 'lista de preguntas')):
+            response = self.cargar(SimpleUploadedFile('preguntas.json', contenido))
+            self.assertEqual(response.data['estado'], ImportacionPreguntas.FALLIDA)
+            self.assertIn(mensaje, response.data['mensaje_error'])
+
+    def test_extension_no_soportada(self):
+        self.client.force_authenticate(user=DocenteFactory())
+        response = self.cargar(SimpleUploadedFile('preguntas.csv', b'materia,enunciado'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ImportacionPreguntas.objects.exists())
+
+    def test_importacion_ajena_no_visible(self):
+        self.client.force_authenticate(user=DocenteFactory())
+        importacion_id = self.cargar(self.archivo([fila()])).data['id']
+        url = f'/api/core/preguntas/importaciones/{importacion_id}/'
+
+        self.client.force_authenticate(user=DocenteFactory())
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url + 'detalles/').status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=DocenteFactory(is_staff=True))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_carga_masiva_estudiante_prohibida(self):
+        self.client.force_authenticate(user=EstudianteFactory())
+        response = self.cargar(self.archivo([fila()]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class TrabajosImportacionTest(TestCase):
+    """Tests para la ejecución de importaciones fuera de la petición"""
+
+    def setUp(self):
+        self.usuario = DocenteFactory()
+
+    def crear_importacion(self, datos):
+        return ImportacionPreguntas.objects.create(
+            usuario=self.usuario,
+            archivo=SimpleUploadedFile('preguntas.json', json.dumps(datos).encode('utf-8')),
+            nombre_archivo='preguntas.json'
+        )
+
+    @override_settings(IMPORTACIONES_EN_SEGUNDO_PLANO=True)
+    def test_segundo_plano_encola_al_confirmar(self):
+        importacion = self.crear_importacion([fila()])
+
+        with patch('apps.core.trabajos._obtener_ejecutor') as ejecutor:
+            with self.captureOnCommitCallbacks() as callbacks:
+                encolar_importacion(importacion)
+            ejecutor.assert_not_called()
+            callbacks[0]()
+
+        ejecutor.return_value.submit.assert_called_once_with(_ejecutar_en_hilo, importacion.pk)
+        importacion.refresh_from_db()
+        self.assertEqual(importacion.estado, ImportacionPreguntas.PENDIENTE)
+
+    def test_progreso_por_lote(self):
+        importacion = self.crear_importacion([fila(enunciado=f'Pregunta {i}') for i in range(5)])
+        avances = []
+        registrar = lambda importador: avances.append(
+            ImportacionPreguntas.objects.values_list('procesadas', flat=True).get(pk=importacion.pk)
+        )
+
+        with patch('apps.core.trabajos.registrar_progreso_importacion', side_effect=registrar):
+            ejecutar_importacion(importacion.pk, tamano_lote=2)
+
+        self.assertEqual(avances, [2, 4, 5])
+        self.assertEqual(importacion.detalles.count(), 5)
+
+    def test_no_se_procesa_dos_veces(self):
+        importacion = self.crear_importacion([fila()])
+
+        self.assertTrue(ejecutar_importacion(importacion.pk))
+        self.assertFalse(ejecutar_importacion(importacion.pk))
+        self.assertEqual(Pregunta.objects.count(), 1)
+
+    def test_comando_cierra_interrumpidas_y_procesa_pendientes(self):
+        interrumpida = self.crear_importacion([fila()])
+        ImportacionPreguntas.objects.filter(pk=interrumpida.pk).update(
+            estado=ImportacionPreguntas.PROCESANDO, fecha_inicio=timezone.now() - timedelta(hours=2)
+        )
+        pendiente = self.crear_importacion([fila()])
+
+        call_command('procesar_importaciones', stdout=io.StringIO())
+
+        interrumpida.refresh_from_db()
+        pendiente.refresh_from_db()
+        self.assertEqual(interrumpida.estado, ImportacionPreguntas.FALLIDA)
+        self.assertEqual(pendiente.estado, ImportacionPreguntas.COMPLETADA)
+        self.assertEqual(pendiente.exitosas, 1)
@@ -0,0 +1,69 @@
+"""
+Tests para la lectura incremental de JSON
+"""
+import json
+
+from django.test import SimpleTestCase
+
+from apps.core.json_incremental import ErrorFormatoJSON, iterar_arreglo_json, iterar_ndjson
+
+
+def fragmentar(texto, tamano=7):
+    datos = texto.encode('utf-8')
+    return [datos[i:i + tamano] for i in range(0, len(datos), tamano)]
+
+
+class IterarArregloJSONTest(SimpleTestCase):
+    """Tests para iterar_arreglo_json"""
+
+    def test_elementos_partidos_entre_fragmentos(self):
+        preguntas = [
+            {'enunciado': f'¿Qué es {i}? "comillas" [corchetes], {{llaves}}', 'opciones': {'A': 'ñ'}}
+            for i in range(20)
+        ]
+        texto = json.dumps(preguntas, ensure_ascii=False, indent=2)
+
+        for tamano in (1, 3, 64, 100000):
+            self.assertEqual(list(iterar_arreglo_json(fragmentar(texto, tamano))), preguntas)
+
+    def test_numeros_al_final_del_fragmento(self):
+        self.assertEqual(list(iterar_arreglo_json([b'[12', b'34, 5', b'6]'])), [1234, 56])
+
+    def test_arreglo_vacio(self):
+        self.assertEqual(list(iterar_arreglo_json([b' [ ] '])), [])
+
+    def test_entrega_elementos_antes_de_terminar(self):
+        def fragmentos():
+            yield b'[{"a": 1}, {"a": 2},'
+            raise AssertionError('no debe leer más para entregar los primeros elementos')
+
+        elementos = iterar_arreglo_json(fragmentos())
+        self.assertEqual(next(elementos), {'a': 1})
+        self.assertEqual(next(elementos), {'a': 2})
+
+    def test_no_es_lista(self):
+        with self.assertRaises(ErrorFormatoJSON):
+            list(iterar_arreglo_json([b'{"a": 1}']))
+
+    def test_json_invalido(self):
+        for texto in (b'[{"a": 1}, {"a": }]', b'[{"a": 1} {"b": 2}]', b'[{"a": 1}', b'[1] x'):
+            with self.assertRaises(json.JSONDecodeError):
+                list(iterar_arreglo_json(fragmentar(texto.decode(), 4)))
+
+    def test_tamano_maximo(self):
+        with self.assertRaises(ErrorFormatoJSON):
+            list(iterar_arreglo_json([b'[{"a": "', b'x' * 100, b'x' * 100], tamano_maximo=50))
+
+
+class IterarNDJSONTest(SimpleTestCase):
+    """Tests para iterar_ndjson"""
+
+    def test_lineas_partidas_y_vacias(self):
+        texto = '{"a": 1}\n\n{"b": "ñ"}\r\n{"c": 3}'
+        self.assertEqual(
+            list(iterar_ndjson(fragmentar(texto, 3))), [{'a': 1}, {'b': 'ñ'}, {'c': 3}]
+        )
+
+    def test_linea_invalida(self):
+        with self.assertRaisesMessage(json.JSONDecodeError, 'Línea 2'):
+            list(iterar_ndjson([b'{"a": 1}\n{"b": \n']))
@@ -0,0 +1,102 @@
+"""
+Tests para los constructores de solo lectura de preguntas
+"""
+import io
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from apps.core.lectura import (
+    comparar_serializacion, preguntas_gestion, preguntas_retroalimentacion, preguntas_simulacion
+)
+from apps.core.models import Pregunta
+from apps.core.serializers import (
+    PreguntaRetroalimentacionSerializer, PreguntaSerializer, PreguntaSimulacionSerializer
+)
+from .factories import DocenteFactory, EstudianteFactory, MateriaFactory, PreguntaFactory
+from .test_imagenes import imagen_png
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL)
+class ConstructoresPreguntasTest(TestCase):
+    """La salida debe ser idéntica a la de los serializers"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_TEMPORAL, ignore_errors=True)
+
+    def setUp(self):
+        self.preguntas = [
+            PreguntaFactory(imagen=imagen_png(ancho=400, alto=200)),
+            PreguntaFactory(competencia=None),
+            PreguntaFactory(),
+        ]
+        self.ids = [p.id for p in reversed(self.preguntas)]
+        self.request = APIRequestFactory().get('/')
+
+    def test_salida_identica_a_los_serializers(self):
+        casos = (
+            (preguntas_gestion, PreguntaSerializer),
+            (preguntas_simulacion, PreguntaSimulacionSerializer),
+            (preguntas_retroalimentacion, PreguntaRetroalimentacionSerializer),
+        )
+        instancias = [Pregunta.objects.get(pk=pk) for pk in self.ids]
+        for constructor, serializer_class in casos:
+            esperado = serializer_class(instancias, many=True, context={'request': self.request}).data
+            esperado = [list(p.items()) for p in esperado]
+            for obtenido in (
+                constructor.desde_ids(self.ids, self.request),
+                constructor.desde_instancias(instancias, self.request),
+            ):
+                self.assertEqual([list(p.items()) for p in obtenido], esperado, serializer_class.__name__)
+
+    def test_una_consulta_sin_importar_la_cantidad(self):
+        with self.assertNumQueries(1):
+            preguntas_gestion.desde_ids(self.ids)
+
+    def test_comparar_serializacion(self):
+        resultado = comparar_serializacion(preguntas_gestion, PreguntaSerializer, self.ids, repeticiones=1)
+        self.assertTrue(resultado['identico'])
+        self.assertEqual(resultado['preguntas'], 3)
+        self.assertEqual(resultado['rapido_consultas'], 1)
+
+        salida = io.StringIO()
+        call_command('benchmark_serializacion', repeticiones=1, stdout=salida)
+        self.assertIn('Salida idéntica', salida.getvalue())
+
+
+class ListadoPreguntasTest(APITestCase):
+    """Tests para el listado de preguntas con los constructores"""
+
+    def setUp(self):
+        self.materia = MateriaFactory()
+
+    def test_listado_consultas_constantes(self):
+        self.client.force_authenticate(user=DocenteFactory())
+        conteos = []
+        for cantidad in (2, 15):
+            PreguntaFactory.create_batch(cantidad, materia=self.materia)
+            with CaptureQueriesContext(connection) as consultas:
+                response = self.client.get('/api/core/preguntas/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            conteos.append(len(consultas))
+        self.assertEqual(conteos[0], conteos[1])
+        self.assertIn('respuesta_correcta', response.data['results'][0])
+        self.assertIn('retroalimentacion', response.data['results'][0])
+
+    def test_estudiante_recibe_campos_de_simulacion(self):
+        PreguntaFactory(materia=self.materia)
+        self.client.force_authenticate(user=EstudianteFactory())
+
+        response = self.client.get('/api/core/preguntas/')
+
+        self.assertEqual(list(response.data['results'][0]), PreguntaSimulacionSerializer.Meta.fields)
@@ -1,7 +1,7 @@
 """
 Tests para las señales (signals) del sistema de gamificación
 """
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from datetime import timedelta
 from unittest.mock import patch, MagicMock
@@ -57,6 +57,7 @@ class ActualizarRachaSignalTest(TestCase):
         self.assertEqual(usuario.racha_actual, racha_inicial)
 
 
+@override_settings(GAMIFICACION_EN_SEGUNDO_PLANO=False)
 class ActualizarPuntosSignalTest(TestCase):
     """Tests para la señal de actualización de puntos"""
     
@@ -73,6 +74,8 @@ class ActualizarPuntosSignalTest(TestCase):
             es_correcta=True
         )
         
+        # Los puntos de la respuesta creada ya se aplicaron con F() en la base
+        usuario.refresh_from_db()
         puntos_iniciales = usuario.puntos_totales
         
         # Simular la señal
@@ -130,6 +133,7 @@ class ActualizarPuntosSignalTest(TestCase):
         self.assertEqual(usuario.puntos_totales, puntos_iniciales)
 
 
+@override_settings(GAMIFICACION_EN_SEGUNDO_PLANO=False)
 class EvaluarInsigniasSignalTest(TestCase):
     """Tests para las señales de evaluación de insignias"""
     
@@ -354,6 +358,7 @@ class VerificarLogrosTest(TestCase):
         self.assertFalse(resultado)
 
 
+@override_settings(GAMIFICACION_EN_SEGUNDO_PLANO=False)
 class SignalIntegrationTest(TestCase):
     """Tests de integración de señales"""
     
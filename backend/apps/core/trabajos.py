@@ -0,0 +1,141 @@
+"""
+Ejecución en segundo plano de las importaciones de preguntas.
+
+``carga_masiva`` guarda el archivo en un ``ImportacionPreguntas`` y lo encola
+aquí. Los trabajos corren en un ``ThreadPoolExecutor`` del propio proceso
+(``IMPORTACIONES_HILOS`` hilos), sin broker externo. Si el proceso se
+reinicia con trabajos a medias, ``procesar_importaciones`` retoma los
+pendientes y marca como fallidos los que quedaron procesando.
+
+El archivo se recorre dos veces: primero solo se decodifica, para rechazarlo
+sin guardar nada si el JSON es inválido, y luego se importa por lotes. Cada
+lote se confirma por separado, así que los contadores y ``detalles`` que
+consulta el cliente avanzan mientras el trabajo corre.
+"""
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .importacion import TAMANO_LOTE, ImportadorPreguntas, registrar_progreso_importacion
+from .json_incremental import ErrorFormatoJSON, iterar_arreglo_json, iterar_ndjson
+from .models import DetalleImportacion, ImportacionPreguntas
+
+logger = logging.getLogger(__name__)
+
+_ejecutor = None
+_candado_ejecutor = threading.Lock()
+
+
+def _obtener_ejecutor():
+    global _ejecutor
+    with _candado_ejecutor:
+        if _ejecutor is None:
+            _ejecutor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'IMPORTACIONES_HILOS', 1),
+                thread_name_prefix='importacion'
+            )
+        return _ejecutor
+
+
+def formato_archivo(nombre):
+    """Formato de importación según la extensión, o None si no se admite"""
+    if nombre.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if nombre.endswith('.json'):
+        return 'json'
+    return None
+
+
+def _iterar_filas(importacion):
+    iterar = iterar_ndjson if importacion.formato == 'ndjson' else iterar_arreglo_json
+    with importacion.archivo.open('rb') as archivo:
+        yield from iterar(archivo.chunks())
+
+
+def _contar_filas(importacion):
+    """Decodifica el archivo completo sin tocar la base de datos"""
+    total = sum(1 for _ in _iterar_filas(importacion))
+    if total == 0:
+        raise ErrorFormatoJSON('El archivo JSON está vacío')
+    return total
+
+
+def _guardar_progreso(importacion):
+    def al_progresar(importador):
+        DetalleImportacion.objects.bulk_create([
+            DetalleImportacion(
+                importacion=importacion,
+                fila=detalle['fila'],
+                estado=detalle['estado'],
+                mensaje=detalle['mensaje'],
+                pregunta_id=detalle.get('id_pregunta'),
+            )
+            for detalle in importador.detalles
+        ])
+        importador.detalles.clear()
+        ImportacionPreguntas.objects.filter(pk=importacion.pk).update(**importador.progreso)
+        registrar_progreso_importacion(importador)
+    return al_progresar
+
+
+def _finalizar(importacion_id, estado, **campos):
+    ImportacionPreguntas.objects.filter(pk=importacion_id).update(
+        estado=estado, fecha_fin=timezone.now(), **campos
+    )
+
+
+def ejecutar_importacion(importacion_id, tamano_lote=TAMANO_LOTE):
+    """
+    Procesa una importación pendiente. Retorna False si otro proceso ya la
+    tomó o no existe.
+    """
+    tomada = ImportacionPreguntas.objects.filter(
+        pk=importacion_id, estado=ImportacionPreguntas.PENDIENTE
+    ).update(estado=ImportacionPreguntas.PROCESANDO, fecha_inicio=timezone.now())
+    if not tomada:
+        return False
+    importacion = ImportacionPreguntas.objects.get(pk=importacion_id)
+
+    try:
+        total = _contar_filas(importacion)
+        ImportacionPreguntas.objects.filter(pk=importacion_id).update(total=total)
+        importador = ImportadorPreguntas(tamano_lote, al_progresar=_guardar_progreso(importacion))
+        importador.agregar(_iterar_filas(importacion))
+        importador.finalizar()
+    except ErrorFormatoJSON as e:
+        _finalizar(importacion_id, ImportacionPreguntas.FALLIDA, mensaje_error=str(e))
+    except json.JSONDecodeError as e:
+        _finalizar(
+            importacion_id, ImportacionPreguntas.FALLIDA,
+            mensaje_error=f'El archivo no contiene un JSON válido: {str(e)}'
+        )
+    except Exception as e:
+        logger.exception('Error en la importación de preguntas %s', importacion_id)
+        _finalizar(importacion_id, ImportacionPreguntas.FALLIDA, mensaje_error=f'Error interno: {str(e)}')
+    else:
+        _finalizar(importacion_id, ImportacionPreguntas.COMPLETADA)
+    return True
+
+
+def _ejecutar_en_hilo(importacion_id):
+    close_old_connections()
+    try:
+        ejecutar_importacion(importacion_id)
+    finally:
+        connection.close()
+
+
+def encolar_importacion(importacion):
+    """
+    Encola la importación al confirmar la transacción actual. Con
+    ``IMPORTACIONES_EN_SEGUNDO_PLANO`` en False se ejecuta en línea.
+    """
+    if not getattr(settings, 'IMPORTACIONES_EN_SEGUNDO_PLANO', True):
+        ejecutar_importacion(importacion.pk)
+        return
+    transaction.on_commit(lambda: _obtener_ejecutor().submit(_ejecutar_en_hilo, importacion.pk))
@@ -0,0 +1,102 @@
+"""
+Variantes responsivas de las imágenes de las preguntas.
+
+Al subir o importar una imagen se generan copias en formatos modernos (AVIF
+si el Pillow instalado lo soporta, y WebP) para cada ancho de
+``ANCHOS_VARIANTES`` menor que el original, más una al ancho original. Se
+guardan junto al archivo original (``<nombre>_<ancho>w.<formato>``) y su
+descripción queda en ``imagen_metadatos['variantes']``::
+
+    {"webp": [{"ancho": 320, "alto": 240, "bytes": 9120, "nombre": "...", "url": "..."}, ...]}
+
+Los serializers la exponen como un mapa formato -> ``srcset``.
+"""
+import io
+import logging
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+ANCHOS_VARIANTES = (160, 320, 640, 1024)
+# En orden de preferencia para <picture>
+FORMATOS_VARIANTES = ('avif', 'webp')
+CALIDAD = {
+    'avif': 55,
+    'webp': 80,
+}
+
+
+def formatos_soportados():
+    """Formatos de ``FORMATOS_VARIANTES`` que el Pillow instalado puede escribir"""
+    Image.init()
+    return [formato for formato in FORMATOS_VARIANTES if formato.upper() in Image.SAVE]
+
+
+def anchos_para(ancho_original):
+    return [ancho for ancho in ANCHOS_VARIANTES if ancho < ancho_original] + [ancho_original]
+
+
+def nombre_variante(nombre, ancho, formato):
+    return f'{os.path.splitext(nombre)[0]}_{ancho}w.{formato}'
+
+
+def generar_variantes(contenido, nombre, storage, reemplazar=False):
+    """
+    Genera y guarda en ``storage`` las variantes de la imagen ``contenido``
+    (bytes) cuyo archivo original es ``nombre``. Las variantes que ya existen
+    se reutilizan salvo con ``reemplazar``. Retorna el diccionario de
+    ``imagen_metadatos['variantes']``; vacío si la imagen es animada o no se
+    pudo procesar.
+    """
+    formatos = formatos_soportados()
+    try:
+        with Image.open(io.BytesIO(contenido)) as imagen:
+            if getattr(imagen, 'is_animated', False):
+                return {}
+            imagen.load()
+            if imagen.mode not in ('RGB', 'RGBA', 'L'):
+                imagen = imagen.convert('RGBA' if 'transparency' in imagen.info or 'A' in imagen.mode else 'RGB')
+
+            variantes = {formato: [] for formato in formatos}
+            ancho_original, alto_original = imagen.size
+            for ancho in anchos_para(ancho_original):
+                alto = max(1, round(alto_original * ancho / ancho_original))
+                reducida = imagen if ancho == ancho_original else imagen.resize(
+                    (ancho, alto), Image.Resampling.LANCZOS
+                )
+                for formato in formatos:
+                    destino = nombre_variante(nombre, ancho, formato)
+                    if reemplazar and storage.exists(destino):
+                        storage.delete(destino)
+                    if storage.exists(destino):
+                        tamano = storage.size(destino)
+                    else:
+                        buffer = io.BytesIO()
+                        reducida.save(buffer, format=formato.upper(), quality=CALIDAD[formato])
+                        tamano = buffer.tell()
+                        destino = storage.save(destino, ContentFile(buffer.getvalue()))
+                    variantes[formato].append({
+                        'ancho': ancho,
+                        'alto': alto,
+                        'bytes': tamano,
+                        'nombre': destino,
+                        'url': storage.url(destino),
+                    })
+    except Exception as e:
+        logger.warning(f"No se pudieron generar variantes de {nombre}: {e}")
+        return {}
+    return variantes
+
+
+def generar_variantes_archivo(imagen, reemplazar=False):
+    """``generar_variantes`` para un ``ImageFieldFile`` ya guardado"""
+    try:
+        with imagen.storage.open(imagen.name, 'rb') as archivo:
+            contenido = archivo.read()
+    except Exception as e:
+        logger.warning(f"No se pudo leer la imagen {imagen.name}: {e}")
+        return {}
+    return generar_variantes(contenido, imagen.name, imagen.storage, reemplazar)
@@ -1,21 +1,21 @@
-from django.shortcuts import render
+from django.shortcuts import render, get_object_or_404
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Count, Avg, Prefetch
 from django.utils import timezone
 from datetime import timedelta
 import random
 import json
-from django.db import transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.http import JsonResponse
 
 from .models import (
     Materia, Competencia, Pregunta, Sesion, RespuestaUsuario,
-    Clase, Asignacion, Insignia, LogroUsuario
+    Clase, Asignacion, Insignia, LogroUsuario, ImportacionPreguntas
 )
 from .serializers import (
     MateriaSerializer, MateriaDetailSerializer,
@@ -24,8 +24,18 @@ from .serializers import (
     SesionSerializer, SesionCreateSerializer, SesionDetailSerializer,
     RespuestaUsuarioSerializer, RespuestaUsuarioCreateSerializer,
     ClaseSerializer, ClaseDetailSerializer,
-    AsignacionSerializer, InsigniaSerializer, LogroUsuarioSerializer
+    AsignacionSerializer, InsigniaSerializer, LogroUsuarioSerializer,
+    ImportacionPreguntasSerializer, DetalleImportacionSerializer
 )
+from .catalogo import anotar_conteos
+from .lectura import preguntas_gestion, preguntas_simulacion
+from .trabajos import encolar_importacion, formato_archivo
+
+
+class PaginacionDetallesImportacion(PageNumberPagination):
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
 
 
 class MateriaViewSet(viewsets.ModelViewSet):
@@ -44,6 +54,15 @@ class MateriaViewSet(viewsets.ModelViewSet):
             return MateriaDetailSerializer
         return MateriaSerializer
     
+    def get_queryset(self):
+        queryset = anotar_conteos(super().get_queryset())
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(Prefetch(
+                'competencias',
+                queryset=anotar_conteos(Competencia.objects.select_related('materia'))
+            ))
+        return queryset
+    
     @action(detail=True, methods=['get'])
     def estadisticas(self, request, pk=None):
         """Obtener estadísticas de una materia"""
@@ -88,7 +107,7 @@ class CompetenciaViewSet(viewsets.ModelViewSet):
         return CompetenciaSerializer
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = anotar_conteos(super().get_queryset().select_related('materia'))
         materia_id = self.request.query_params.get('materia', None)
         if materia_id:
             queryset = queryset.filter(materia_id=materia_id)
@@ -156,6 +175,22 @@ class PreguntaViewSet(viewsets.ModelViewSet):
         # Para estudiantes, usar PreguntaSimulacionSerializer (sin campos sensibles)
         return PreguntaSimulacionSerializer
     
+    def list(self, request, *args, **kwargs):
+        """
+        Listado con los constructores de ``lectura`` (una proyección
+        ``values()`` por página) en lugar del serializer
+        """
+        if self.get_serializer_class() is PreguntaSerializer:
+            constructor = preguntas_gestion
+        else:
+            constructor = preguntas_simulacion
+        filas = constructor.valores(self.filter_queryset(self.get_queryset()))
+        
+        page = self.paginate_queryset(filas)
+        if page is not None:
+            return self.get_paginated_response(constructor.construir(page, request))
+        return Response(constructor.construir(filas, request))
+    
     @action(detail=False, methods=['get'])
     def para_simulacion(self, request):
         """Obtener preguntas para una simulación"""
@@ -172,12 +207,11 @@ class PreguntaViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(dificultad=dificultad)
         
         # Seleccionar preguntas aleatorias
-        preguntas = list(queryset)
-        if len(preguntas) > cantidad:
-            preguntas = random.sample(preguntas, cantidad)
+        ids = list(queryset.values_list('id', flat=True))
+        if len(ids) > cantidad:
+            ids = random.sample(ids, cantidad)
         
-        serializer = PreguntaSimulacionSerializer(preguntas, many=True)
-        return Response(serializer.data)
+        return Response(preguntas_simulacion.desde_ids(ids))
     
     def create(self, request, *args, **kwargs):
         """Crear nueva pregunta con validación de permisos"""
@@ -304,7 +338,7 @@ class PreguntaViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
     def carga_masiva(self, request):
-        """Cargar preguntas de forma masiva desde un archivo JSON"""
+        """Cargar preguntas de forma masiva desde un archivo JSON o NDJSON"""
         # Verificar permisos: solo docentes y administradores
         if not (request.user.rol in ['docente', 'admin'] or request.user.is_staff):
             return Response(
@@ -312,271 +346,62 @@ class PreguntaViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        try:
-            # Debug: Imprimir información del request
-            print(f"Request FILES: {request.FILES}")
-            print(f"Request Content-Type: {request.content_type}")
-            print(f"Request Headers: {dict(request.headers)}")
-            # request.data no está disponible en WSGIRequest, usar request.POST si es necesario
-            if hasattr(request, 'data'):
-                print(f"Request DATA: {request.data}")
-            else:
-                print("Request DATA: No disponible en WSGIRequest")
-            
-            # Obtener el archivo JSON del request
-            archivo = request.FILES.get('archivo')
-            if not archivo:
-                print("No se encontró archivo en request.FILES")
-                return Response(
-                    {'error': 'No se proporcionó ningún archivo'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Validar que sea un archivo JSON
-            if not archivo.name.endswith('.json'):
-                return Response(
-                    {'error': 'El archivo debe tener extensión .json'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Leer y parsear el JSON
-            print(f"Archivo recibido: {archivo.name}, tamaño: {archivo.size}")
-            contenido = archivo.read().decode('utf-8')
-            print(f"Contenido leído (primeros 500 chars): {contenido[:500]}")
-            datos = json.loads(contenido)
-            print(f"Datos parseados: {len(datos)} preguntas")
-            
-            # Validar estructura básica
-            if not isinstance(datos, list):
-                return Response(
-                    {'error': 'El JSON debe contener una lista de preguntas'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Validar que no esté vacío
-            if len(datos) == 0:
-                return Response(
-                    {'error': 'El archivo JSON está vacío'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Procesar las preguntas
-            resultados = self._procesar_preguntas(datos)
-            
-            return Response({
-                'mensaje': f'Carga masiva completada',
-                'total_procesadas': len(datos),
-                'exitosas': resultados['exitosas'],
-                'errores': resultados['errores'],
-                'detalles': resultados['detalles']
-            })
-            
-        except json.JSONDecodeError as e:
+        archivo = request.FILES.get('archivo')
+        if not archivo:
             return Response(
-                {'error': f'El archivo no contiene un JSON válido: {str(e)}'}, 
+                {'error': 'No se proporcionó ningún archivo'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
-        except Exception as e:
+        
+        # JSON (arreglo de preguntas) o NDJSON (una pregunta por línea)
+        formato = formato_archivo(archivo.name)
+        if not formato:
             return Response(
-                {'error': f'Error interno: {str(e)}'}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {'error': 'El archivo debe tener extensión .json, .ndjson o .jsonl'}, 
+                status=status.HTTP_400_BAD_REQUEST
             )
+        
+        # El archivo se procesa en segundo plano; el cliente consulta el avance
+        # en importaciones/<id>/ y el reporte por fila en importaciones/<id>/detalles/
+        importacion = ImportacionPreguntas.objects.create(
+            usuario=request.user,
+            archivo=archivo,
+            nombre_archivo=archivo.name,
+            formato=formato
+        )
+        encolar_importacion(importacion)
+        importacion.refresh_from_db()
+        
+        return Response(
+            ImportacionPreguntasSerializer(importacion).data,
+            status=status.HTTP_202_ACCEPTED
+        )
+    
+    def _obtener_importacion(self, request, importacion_id):
+        """Importación visible para el usuario: la propia, o cualquiera si es admin"""
+        importaciones = ImportacionPreguntas.objects.all()
+        if not (request.user.rol == 'admin' or request.user.is_staff):
+            importaciones = importaciones.filter(usuario=request.user)
+        return get_object_or_404(importaciones, pk=importacion_id)
+    
+    @action(detail=False, methods=['get'], url_path=r'importaciones/(?P<importacion_id>\d+)')
+    def importacion(self, request, importacion_id=None):
+        """Estado y contadores de una importación de preguntas"""
+        importacion = self._obtener_importacion(request, importacion_id)
+        return Response(ImportacionPreguntasSerializer(importacion).data)
     
-    def _procesar_preguntas(self, datos):
-        """Procesar y validar las preguntas para carga masiva"""
-        exitosas = 0
-        errores = 0
-        detalles = []
-        
-        # Importar aquí para evitar problemas de importación circular
-        import os
-        from django.core.files import File
-        from django.conf import settings
-        
-        for i, pregunta_data in enumerate(datos):
-            try:
-                with transaction.atomic():
-                    # Validar campos requeridos
-                    campos_requeridos = [
-                        'materia', 'enunciado', 'opciones', 
-                        'respuesta_correcta', 'retroalimentacion'
-                    ]
-                    
-                    campos_faltantes = []
-                    for campo in campos_requeridos:
-                        if campo not in pregunta_data:
-                            campos_faltantes.append(campo)
-                    
-                    if campos_faltantes:
-                        raise ValueError(f'Campos requeridos faltantes: {", ".join(campos_faltantes)}')
-                    
-                    # Obtener o crear materia
-                    materia_nombre = pregunta_data['materia']
-                    if not materia_nombre or not materia_nombre.strip():
-                        raise ValueError('El nombre de la materia no puede estar vacío')
-                    
-                    try:
-                        materia = Materia.objects.get(nombre=materia_nombre)
-                    except Materia.DoesNotExist:
-                        # Crear materia si no existe
-                        materia = Materia.objects.create(
-                            nombre=materia_nombre,
-                            nombre_display=materia_nombre
-                        )
-                    
-                    # Obtener competencia si se especifica
-                    competencia = None
-                    if 'competencia' in pregunta_data:
-                        try:
-                            competencia = Competencia.objects.get(
-                                nombre=pregunta_data['competencia']
-                            )
-                        except Competencia.DoesNotExist:
-                            # Crear competencia si no existe
-                            competencia = Competencia.objects.create(
-                                nombre=pregunta_data['competencia'],
-                                descripcion=f"Competencia: {pregunta_data['competencia']}",
-                                materia=materia
-                            )
-                    
-                    # Validar opciones según materia
-                    opciones = pregunta_data['opciones']
-                    if not isinstance(opciones, dict):
-                        raise ValueError('Las opciones deben ser un diccionario')
-                    
-                    # Validar que las opciones no estén vacías
-                    if not opciones:
-                        raise ValueError('Las opciones no pueden estar vacías')
-                    
-                    # Validar opciones según materia
-                    if materia_nombre.lower() == 'inglés':
-                        # Inglés: mínimo 3 opciones (A, B, C), opcional D y más
-                        opciones_requeridas = ['A', 'B', 'C']
-                        # Para Inglés, permitir opciones adicionales más allá de D
-                        opciones_adicionales = ['D', 'E', 'F', 'G', 'H', 'I', 'J']
-                    else:
-                        # Otras materias: 4 opciones (A, B, C, D)
-                        opciones_requeridas = ['A', 'B', 'C', 'D']
-                        opciones_adicionales = []
-                    
-                    # Validar opciones requeridas
-                    opciones_faltantes = [opt for opt in opciones_requeridas if opt not in opciones]
-                    if opciones_faltantes:
-                        raise ValueError(f'Para {materia_nombre} se requieren las opciones: {", ".join(opciones_requeridas)}')
-                    
-                    # Validar que no haya opciones no permitidas
-                    opciones_permitidas = opciones_requeridas + opciones_adicionales
-                    opciones_invalidas = [opt for opt in opciones.keys() if opt not in opciones_permitidas]
-                    if opciones_invalidas:
-                        raise ValueError(f'Para {materia_nombre} solo se permiten las opciones: {", ".join(opciones_permitidas)}')
-                    
-                    respuesta_correcta = pregunta_data['respuesta_correcta'].upper()
-                    if respuesta_correcta not in opciones:
-                        raise ValueError(f'La respuesta correcta "{respuesta_correcta}" no está en las opciones')
-                    
-                    # Validar contenido de las opciones (texto o texto+imagen)
-                    for letra, opcion in opciones.items():
-                        if isinstance(opcion, dict):
-                            # Formato: {"texto": "...", "imagen": "url"}
-                            if 'texto' not in opcion:
-                                raise ValueError(f'La opción {letra} debe tener campo "texto"')
-                            if not opcion['texto'] or not opcion['texto'].strip():
-                                raise ValueError(f'La opción {letra} no puede estar vacía')
-                        elif isinstance(opcion, str):
-                            # Formato simple: "texto"
-                            if not opcion or not opcion.strip():
-                                raise ValueError(f'La opción {letra} no puede estar vacía')
-                        else:
-                            raise ValueError(f'Formato inválido para opción {letra}')
-                    
-                    # Procesamiento de imagen si existe
-                    imagen_procesada = None
-                    if 'imagen_archivo' in pregunta_data and pregunta_data['imagen_archivo']:
-                        imagen_filename = pregunta_data['imagen_archivo']
-                        
-                        # Buscar archivo en directorio de imágenes temporales
-                        temp_images_dir = os.path.join(settings.MEDIA_ROOT, 'temp_images')
-                        imagen_path = os.path.join(temp_images_dir, imagen_filename)
-                        
-                        if os.path.exists(imagen_path):
-                            try:
-                                with open(imagen_path, 'rb') as img_file:
-                                    imagen_procesada = File(img_file, name=imagen_filename)
-                                    # Validar formato de imagen
-                                    allowed_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
-                                    file_extension = os.path.splitext(imagen_filename)[1].lower()
-                                    
-                                    if file_extension not in allowed_extensions:
-                                        raise ValueError(f'Formato de imagen no soportado: {file_extension}')
-                                    
-                                    # Validar tamaño (máximo 5MB)
-                                    if img_file.tell() > 5 * 1024 * 1024:
-                                        raise ValueError('La imagen es muy grande (máximo 5MB)')
-                                        
-                            except Exception as e:
-                                raise ValueError(f'Error al procesar imagen "{imagen_filename}": {str(e)}')
-                        else:
-                            # Solo advertir, no fallar la carga
-                            detalles.append({
-                                'fila': i + 1,
-                                'estado': 'advertencia',
-                                'mensaje': f'Imagen no encontrada: {imagen_filename}. Pregunta creada sin imagen.'
-                            })
-                    
-                    # Validar enunciado y retroalimentación
-                    enunciado = pregunta_data['enunciado']
-                    retroalimentacion = pregunta_data['retroalimentacion']
-                    
-                    if not enunciado or not enunciado.strip():
-                        raise ValueError('El enunciado no puede estar vacío')
-                    
-                    if not retroalimentacion or not retroalimentacion.strip():
-                        raise ValueError('La retroalimentación no puede estar vacía')
-                    
-                    # Crear la pregunta
-                    pregunta = Pregunta.objects.create(
-                        materia=materia,
-                        competencia=competencia,
-                        contexto=pregunta_data.get('contexto', ''),
-                        enunciado=enunciado,
-                        opciones=opciones,
-                        respuesta_correcta=respuesta_correcta,
-                        retroalimentacion=retroalimentacion,
-                        explicacion=pregunta_data.get('explicacion', ''),
-                        habilidad_evaluada=pregunta_data.get('habilidad_evaluada', ''),
-                        explicacion_opciones_incorrectas=pregunta_data.get('explicacion_opciones_incorrectas', {}),
-                        estrategias_resolucion=pregunta_data.get('estrategias_resolucion', ''),
-                        errores_comunes=pregunta_data.get('errores_comunes', ''),
-                        dificultad=pregunta_data.get('dificultad', 'media'),
-                        tiempo_estimado=pregunta_data.get('tiempo_estimado', 60),
-                        tags=pregunta_data.get('tags', [])
-                    )
-                    
-                    # Asignar imagen después de crear la pregunta
-                    if imagen_procesada:
-                        pregunta.imagen.save(imagen_filename, imagen_procesada, save=True)
-                    
-                    exitosas += 1
-                    detalles.append({
-                        'fila': i + 1,
-                        'estado': 'exitosa',
-                        'id_pregunta': pregunta.id,
-                        'mensaje': 'Pregunta creada correctamente'
-                    })
-                    
-            except Exception as e:
-                errores += 1
-                detalles.append({
-                    'fila': i + 1,
-                    'estado': 'error',
-                    'mensaje': str(e)
-                })
-        
-        return {
-            'exitosas': exitosas,
-            'errores': errores,
-            'detalles': detalles
-        }
+    @action(detail=False, methods=['get'], url_path=r'importaciones/(?P<importacion_id>\d+)/detalles')
+    def detalles_importacion(self, request, importacion_id=None):
+        """Resultado por fila de una importación, paginado (filtro opcional ?estado=)"""
+        importacion = self._obtener_importacion(request, importacion_id)
+        detalles = importacion.detalles.all()
+        estado = request.query_params.get('estado')
+        if estado:
+            detalles = detalles.filter(estado=estado)
+        
+        paginador = PaginacionDetallesImportacion()
+        pagina = paginador.paginate_queryset(detalles, request, view=self)
+        return paginador.get_paginated_response(DetalleImportacionSerializer(pagina, many=True).data)
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def plantilla_carga(self, request):
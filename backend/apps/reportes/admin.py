@@ -1,3 +1,13 @@
 from django.contrib import admin
+from .models import ResumenEstudianteMateria
 
-# Register your models here.
+
+@admin.register(ResumenEstudianteMateria)
+class ResumenEstudianteMateriaAdmin(admin.ModelAdmin):
+    list_display = (
+        'estudiante', 'materia', 'sesiones_completadas', 'mejor_puntuacion',
+        'preguntas_correctas', 'total_preguntas', 'ultima_actividad'
+    )
+    list_filter = ('materia',)
+    search_fields = ('estudiante__username',)
+    list_select_related = ('estudiante', 'materia')
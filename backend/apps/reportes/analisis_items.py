@@ -0,0 +1,146 @@
+"""
+Análisis de ítems para los reportes del docente.
+
+Una sola consulta con agregados condicionales produce, por pregunta, los
+acumulados necesarios para la distribución de respuestas, el índice de
+dificultad (p), la discriminación punto-biserial y el tiempo promedio. Los
+acumulados son sumas, así que se guardan en el cache por docente y materia y
+se actualizan sumando solo las sesiones completadas desde la última marca.
+
+Se analizan sesiones completadas porque la discriminación compara cada
+respuesta con el puntaje final de la sesión (``correctas / total_preguntas``).
+"""
+import math
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, F, FloatField, Q, Sum
+from django.db.models.functions import Cast, NullIf
+from django.utils import timezone
+
+from apps.simulacion.models import PreguntaSesion, SesionSimulacion
+from .roster import obtener_roster, subconsulta_estudiantes
+
+OPCIONES = tuple('ABCDEFGHIJ')
+CLAVE_ANALISIS = 'reportes:analisis_items:{}:{}:{}'
+TIEMPO_ANALISIS = 60 * 60
+# Las sesiones completadas en los últimos segundos pueden no estar confirmadas
+# todavía; se dejan para la siguiente actualización
+MARGEN_CONSOLIDACION = timedelta(seconds=5)
+
+CAMPOS_SUMABLES = (
+    'n', 'correctas', 'suma_x', 'suma_x2', 'suma_x_correctas', 'suma_tiempo', 'n_tiempo'
+) + tuple(f'op_{opcion}' for opcion in OPCIONES)
+
+
+def _acumular(sesiones, materia_id=None):
+    """Acumulados por pregunta para las respuestas de ``sesiones``"""
+    puntaje = Cast(F('sesion__correctas'), FloatField()) / Cast(
+        NullIf(F('sesion__total_preguntas'), 0), FloatField()
+    )
+    respuestas = PreguntaSesion.objects.filter(
+        sesion__in=sesiones,
+        respuesta_estudiante__isnull=False
+    )
+    if materia_id:
+        respuestas = respuestas.filter(pregunta__materia_id=materia_id)
+
+    filas = respuestas.values('pregunta_id', 'pregunta__enunciado').annotate(
+        n=Count('id'),
+        correctas=Count('id', filter=Q(es_correcta=True)),
+        suma_x=Sum(puntaje),
+        suma_x2=Sum(puntaje * puntaje),
+        suma_x_correctas=Sum(puntaje, filter=Q(es_correcta=True)),
+        suma_tiempo=Sum('tiempo_respuesta'),
+        n_tiempo=Count('tiempo_respuesta'),
+        **{
+            f'op_{opcion}': Count('id', filter=Q(respuesta_estudiante=opcion))
+            for opcion in OPCIONES
+        }
+    ).order_by()
+
+    acumulados = {}
+    for fila in filas:
+        acumulado = {campo: fila[campo] or 0 for campo in CAMPOS_SUMABLES}
+        acumulado['enunciado'] = fila['pregunta__enunciado'] or ''
+        acumulados[fila['pregunta_id']] = acumulado
+    return acumulados
+
+
+def _combinar(base, nuevos):
+    for pregunta_id, acumulado in nuevos.items():
+        actual = base.get(pregunta_id)
+        if actual is None:
+            base[pregunta_id] = acumulado
+            continue
+        for campo in CAMPOS_SUMABLES:
+            actual[campo] += acumulado[campo]
+    return base
+
+
+def calcular_indicadores(pregunta_id, acumulado):
+    """Indicadores de una pregunta a partir de sus acumulados"""
+    n = acumulado['n']
+    correctas = acumulado['correctas']
+    p = correctas / n if n else 0
+
+    # Discriminación punto-biserial: (M1 - M0) / s * sqrt(p * q)
+    discriminacion = None
+    if n and 0 < correctas < n:
+        media = acumulado['suma_x'] / n
+        varianza = acumulado['suma_x2'] / n - media * media
+        if varianza > 1e-12:
+            media_correctas = acumulado['suma_x_correctas'] / correctas
+            media_incorrectas = (acumulado['suma_x'] - acumulado['suma_x_correctas']) / (n - correctas)
+            discriminacion = round(
+                (media_correctas - media_incorrectas) / math.sqrt(varianza) * math.sqrt(p * (1 - p)), 3
+            )
+
+    distribucion = {
+        opcion: acumulado[f'op_{opcion}'] for opcion in OPCIONES if acumulado[f'op_{opcion}']
+    }
+    opcion_mas_elegida = max(sorted(distribucion), key=distribucion.get) if distribucion else None
+
+    return {
+        'pregunta_id': pregunta_id,
+        'enunciado_resumen': acumulado['enunciado'][:120],
+        'porcentaje_acierto': round(p * 100, 1),
+        'total_respuestas': n,
+        'opcion_mas_elegida': opcion_mas_elegida,
+        'distribucion': distribucion,
+        'indice_dificultad': round(p, 3),
+        'discriminacion': discriminacion,
+        'tiempo_promedio': round(acumulado['suma_tiempo'] / acumulado['n_tiempo'], 2) if acumulado['n_tiempo'] else 0,
+    }
+
+
+def analizar_preguntas(docente_id, materia_id=None):
+    """
+    Lista de indicadores por pregunta (ordenada por ``pregunta_id``) para las
+    sesiones completadas de los estudiantes del docente.
+    """
+    roster = obtener_roster(docente_id)
+    clave = CLAVE_ANALISIS.format(docente_id, materia_id or 'todas', roster.version)
+    marca = timezone.now() - MARGEN_CONSOLIDACION
+
+    completadas = SesionSimulacion.objects.filter(
+        estudiante_id__in=subconsulta_estudiantes(docente_id),
+        completada=True
+    )
+    entrada = cache.get(clave)
+    if entrada is None:
+        acumulados = _acumular(
+            completadas.filter(Q(fecha_fin__lte=marca) | Q(fecha_fin__isnull=True)),
+            materia_id
+        )
+    else:
+        acumulados = _combinar(entrada['acumulados'], _acumular(
+            completadas.filter(fecha_fin__gt=entrada['marca'], fecha_fin__lte=marca),
+            materia_id
+        ))
+    cache.set(clave, {'marca': marca, 'acumulados': acumulados}, TIEMPO_ANALISIS)
+
+    return [
+        calcular_indicadores(pregunta_id, acumulados[pregunta_id])
+        for pregunta_id in sorted(acumulados)
+    ]
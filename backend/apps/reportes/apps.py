@@ -5,3 +5,7 @@ class ReportesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.reportes'
     verbose_name = 'Reportes'
+
+    def ready(self):
+        """Se ejecuta cuando la aplicación está lista"""
+        import apps.reportes.signals  # noqa
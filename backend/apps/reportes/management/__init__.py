@@ -0,0 +1 @@
+# Management commands for reportes app
\ No newline at end of file
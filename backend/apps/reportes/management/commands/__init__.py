@@ -0,0 +1 @@
+# Commands for reportes app
\ No newline at end of file
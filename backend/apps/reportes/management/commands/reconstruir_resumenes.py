@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+import logging
+
+from apps.reportes.resumenes import reconstruir_resumenes
+
+logger = logging.getLogger('simulacion.maintenance')
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los resúmenes por estudiante y materia desde las sesiones completadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--estudiante',
+            type=int,
+            action='append',
+            dest='estudiantes',
+            help='ID de estudiante a reconstruir (se puede repetir; por defecto todos)'
+        )
+
+    def handle(self, *args, **options):
+        estudiantes = options['estudiantes']
+
+        creados = reconstruir_resumenes(estudiantes)
+
+        logger.info(f'Resúmenes de estudiante reconstruidos: {creados} filas')
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Resúmenes reconstruidos: {creados} filas')
+        )
@@ -0,0 +1,136 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:03
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+import django.db.models.deletion
+
+
+def poblar_resumenes(apps, schema_editor):
+    """Crea los resúmenes a partir de las sesiones completadas existentes"""
+    SesionSimulacion = apps.get_model("simulacion", "SesionSimulacion")
+    ResumenEstudianteMateria = apps.get_model("reportes", "ResumenEstudianteMateria")
+
+    filas = (
+        SesionSimulacion.objects.filter(completada=True)
+        .values("estudiante_id", "materia_id")
+        .annotate(
+            n_sesiones=Count("id"),
+            n_suma=Sum("puntuacion"),
+            n_mejor=Max("puntuacion"),
+            n_total=Sum("total_preguntas"),
+            n_respondidas=Sum("respondidas"),
+            n_correctas=Sum("correctas"),
+            n_tiempo=Sum("tiempo_total"),
+            n_ultima=Max("fecha_fin"),
+        )
+        .order_by()
+    )
+    ResumenEstudianteMateria.objects.bulk_create(
+        [
+            ResumenEstudianteMateria(
+                estudiante_id=fila["estudiante_id"],
+                materia_id=fila["materia_id"],
+                sesiones_completadas=fila["n_sesiones"],
+                suma_puntuacion=fila["n_suma"] or 0,
+                mejor_puntuacion=fila["n_mejor"] or 0,
+                total_preguntas=fila["n_total"] or 0,
+                preguntas_respondidas=fila["n_respondidas"] or 0,
+                preguntas_correctas=fila["n_correctas"] or 0,
+                tiempo_total=fila["n_tiempo"] or 0,
+                ultima_actividad=fila["n_ultima"],
+            )
+            for fila in filas
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("core", "0007_pregunta_imagen_metadatos"),
+        ("simulacion", "0005_sesion_correctas_tiempo_total"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumenEstudianteMateria",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sesiones_completadas",
+                    models.IntegerField(default=0, verbose_name="Sesiones Completadas"),
+                ),
+                (
+                    "suma_puntuacion",
+                    models.IntegerField(default=0, verbose_name="Suma de Puntuaciones"),
+                ),
+                (
+                    "mejor_puntuacion",
+                    models.IntegerField(default=0, verbose_name="Mejor Puntuación"),
+                ),
+                (
+                    "total_preguntas",
+                    models.IntegerField(default=0, verbose_name="Total de Preguntas"),
+                ),
+                (
+                    "preguntas_respondidas",
+                    models.IntegerField(
+                        default=0, verbose_name="Preguntas Respondidas"
+                    ),
+                ),
+                (
+                    "preguntas_correctas",
+                    models.IntegerField(default=0, verbose_name="Preguntas Correctas"),
+                ),
+                (
+                    "tiempo_total",
+                    models.IntegerField(
+                        default=0, verbose_name="Tiempo Total (segundos)"
+                    ),
+                ),
+                (
+                    "ultima_actividad",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Última Actividad"
+                    ),
+                ),
+                (
+                    "estudiante",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumenes_materia",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Estudiante",
+                    ),
+                ),
+                (
+                    "materia",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumenes_estudiante",
+                        to="core.materia",
+                        verbose_name="Materia",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumen de Estudiante por Materia",
+                "verbose_name_plural": "Resúmenes de Estudiante por Materia",
+                "db_table": "resumenes_estudiante_materia",
+                "unique_together": {("estudiante", "materia")},
+            },
+        ),
+        migrations.RunPython(poblar_resumenes, migrations.RunPython.noop),
+    ]
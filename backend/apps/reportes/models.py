@@ -1,4 +1,83 @@
+from django.conf import settings
 from django.db import models
 
-# Los reportes utilizarán principalmente los modelos existentes
-# No necesitamos modelos adicionales para esta implementación básica
\ No newline at end of file
+from apps.core.models import Materia
+
+
+class ResumenEstudianteMateria(models.Model):
+    """
+    Acumulado de las sesiones completadas de un estudiante en una materia.
+
+    Se actualiza cada vez que una sesión se completa (señal
+    ``sesion_completada``) para que los reportes del estudiante lean una fila
+    por materia en lugar de recorrer todo su historial. Se puede reconstruir
+    con ``python manage.py reconstruir_resumenes``.
+    """
+    estudiante = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='resumenes_materia',
+        verbose_name='Estudiante'
+    )
+    materia = models.ForeignKey(
+        Materia,
+        on_delete=models.CASCADE,
+        related_name='resumenes_estudiante',
+        verbose_name='Materia'
+    )
+    sesiones_completadas = models.IntegerField(
+        default=0,
+        verbose_name='Sesiones Completadas'
+    )
+    suma_puntuacion = models.IntegerField(
+        default=0,
+        verbose_name='Suma de Puntuaciones'
+    )
+    mejor_puntuacion = models.IntegerField(
+        default=0,
+        verbose_name='Mejor Puntuación'
+    )
+    total_preguntas = models.IntegerField(
+        default=0,
+        verbose_name='Total de Preguntas'
+    )
+    preguntas_respondidas = models.IntegerField(
+        default=0,
+        verbose_name='Preguntas Respondidas'
+    )
+    preguntas_correctas = models.IntegerField(
+        default=0,
+        verbose_name='Preguntas Correctas'
+    )
+    tiempo_total = models.IntegerField(
+        default=0,
+        verbose_name='Tiempo Total (segundos)'
+    )
+    ultima_actividad = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Última Actividad'
+    )
+
+    class Meta:
+        verbose_name = 'Resumen de Estudiante por Materia'
+        verbose_name_plural = 'Resúmenes de Estudiante por Materia'
+        db_table = 'resumenes_estudiante_materia'
+        unique_together = ['estudiante', 'materia']
+
+    def __str__(self):
+        return f"{self.estudiante_id} - {self.materia_id}: {self.sesiones_completadas} sesiones"
+
+    @property
+    def promedio_puntuacion(self):
+        """Promedio de puntuación de las sesiones completadas"""
+        if not self.sesiones_completadas:
+            return 0
+        return self.suma_puntuacion / self.sesiones_completadas
+
+    @property
+    def porcentaje_acierto(self):
+        """Porcentaje de preguntas correctas sobre el total de preguntas"""
+        if not self.total_preguntas:
+            return 0
+        return round(self.preguntas_correctas / self.total_preguntas * 100, 1)
@@ -0,0 +1,85 @@
+"""
+Progreso del estudiante por día, semana o mes.
+
+Toda la ventana se calcula con una sola consulta agrupada sobre las sesiones
+completadas (usando su contador ``tiempo_total``) y los periodos sin
+actividad se completan en memoria.
+"""
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.db.models import Avg, Count, DateField, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from apps.simulacion.models import SesionSimulacion
+
+# Los días se cuentan en hora de Colombia sin importar la zona activa
+ZONA_HORARIA = ZoneInfo('America/Bogota')
+
+VENTANAS_DIAS = (7, 30, 90, 365)
+GRANULARIDADES = ('dia', 'semana', 'mes')
+
+
+def _truncar(granularidad):
+    """Expresión que lleva ``fecha_inicio`` al inicio de su periodo"""
+    if granularidad == 'semana':
+        return TruncWeek('fecha_inicio', output_field=DateField(), tzinfo=ZONA_HORARIA)
+    if granularidad == 'mes':
+        return TruncMonth('fecha_inicio', output_field=DateField(), tzinfo=ZONA_HORARIA)
+    return TruncDate('fecha_inicio', tzinfo=ZONA_HORARIA)
+
+
+def _inicio_periodo(fecha, granularidad):
+    if granularidad == 'semana':
+        return fecha - timedelta(days=fecha.weekday())
+    if granularidad == 'mes':
+        return fecha.replace(day=1)
+    return fecha
+
+
+def _siguiente_periodo(fecha, granularidad):
+    if granularidad == 'semana':
+        return fecha + timedelta(days=7)
+    if granularidad == 'mes':
+        return (fecha.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return fecha + timedelta(days=1)
+
+
+def calcular_progreso_periodico(estudiante, dias=30, granularidad='dia', hoy=None):
+    """
+    Lista de ``{fecha, simulaciones, promedio_puntaje, tiempo_estudio}`` desde
+    ``hoy - dias`` hasta ``hoy`` (inclusive), un elemento por periodo.
+
+    ``fecha`` es el primer día del periodo (lunes para semanas) y
+    ``tiempo_estudio`` está en minutos.
+    """
+    hoy = hoy or timezone.localdate(timezone=ZONA_HORARIA)
+    fecha_inicio = hoy - timedelta(days=dias)
+    desde = datetime.combine(fecha_inicio, time.min, tzinfo=ZONA_HORARIA)
+
+    filas = SesionSimulacion.objects.filter(
+        estudiante=estudiante,
+        completada=True,
+        fecha_inicio__gte=desde
+    ).annotate(
+        periodo=_truncar(granularidad)
+    ).values('periodo').annotate(
+        simulaciones=Count('id'),
+        promedio=Avg('puntuacion'),
+        tiempo=Sum('tiempo_total')
+    ).order_by('periodo')
+    por_periodo = {fila['periodo']: fila for fila in filas}
+
+    progreso = []
+    periodo = _inicio_periodo(fecha_inicio, granularidad)
+    while periodo <= hoy:
+        fila = por_periodo.get(periodo)
+        progreso.append({
+            'fecha': periodo,
+            'simulaciones': fila['simulaciones'] if fila else 0,
+            'promedio_puntaje': round(fila['promedio'] or 0, 1) if fila else 0,
+            'tiempo_estudio': round((fila['tiempo'] or 0) / 60) if fila else 0  # Convertir a minutos
+        })
+        periodo = _siguiente_periodo(periodo, granularidad)
+    return progreso
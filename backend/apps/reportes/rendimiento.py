@@ -0,0 +1,76 @@
+"""
+Rendimiento por estudiante para los reportes del docente.
+
+Agrupa las sesiones de los estudiantes del docente en una sola consulta,
+unida al usuario para el nombre, y suma los contadores que cada sesión ya
+mantiene (``total_preguntas``, ``correctas``, ``tiempo_total``). El
+porcentaje de acierto y el tiempo promedio se calculan en SQL para poder
+ordenar y paginar en la base de datos.
+"""
+from django.db.models import Count, F, FloatField, Max, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from apps.simulacion.models import SesionSimulacion
+from .roster import subconsulta_estudiantes
+
+# Criterios de orden aceptados en ``?orden=``; con prefijo '-' es descendente
+ORDENES = {
+    'acierto': 'porcentaje_acierto',
+    'actividad': 'ultima_actividad',
+    'tiempo': 'tiempo_promedio_pregunta',
+    'simulaciones': 'simulaciones',
+}
+ORDEN_DEFECTO = '-acierto'
+
+
+def campo_orden(orden):
+    """Campo de la consulta para ``orden``, o ``None`` si no es válido"""
+    descendente = orden.startswith('-')
+    campo = ORDENES.get(orden.lstrip('-'))
+    if campo is None:
+        return None
+    return f'-{campo}' if descendente else campo
+
+
+def rendimiento_estudiantes(docente_id, orden=ORDEN_DEFECTO):
+    """
+    Queryset de diccionarios, uno por estudiante con sesiones, ordenado según
+    ``orden``. Las métricas consideran solo sesiones completadas.
+    """
+    completada = Q(completada=True)
+    return SesionSimulacion.objects.filter(
+        estudiante_id__in=subconsulta_estudiantes(docente_id)
+    ).values(
+        'estudiante_id',
+        'estudiante__username',
+        'estudiante__first_name',
+        'estudiante__last_name',
+    ).annotate(
+        simulaciones=Count('id', filter=completada),
+        total=Sum('total_preguntas', filter=completada),
+        correctas=Sum('correctas', filter=completada),
+        tiempo=Sum('tiempo_total', filter=completada),
+        ultima_actividad=Max('fecha_inicio'),
+    ).annotate(
+        porcentaje_acierto=Coalesce(
+            Cast(F('correctas'), FloatField()) * 100 / NullIf(F('total'), 0),
+            Value(0.0)
+        ),
+        tiempo_promedio_pregunta=Coalesce(
+            Cast(F('tiempo'), FloatField()) / NullIf(F('total'), 0),
+            Value(0.0)
+        ),
+    ).order_by(campo_orden(orden), 'estudiante_id')
+
+
+def item_estudiante(fila):
+    """Fila de ``rendimiento_estudiantes`` en el formato del reporte"""
+    nombre = f"{fila['estudiante__first_name']} {fila['estudiante__last_name']}".strip()
+    return {
+        'estudiante_id': fila['estudiante_id'],
+        'nombre': nombre or fila['estudiante__username'],
+        'simulaciones': fila['simulaciones'],
+        'porcentaje_acierto': round(fila['porcentaje_acierto'], 1),
+        'tiempo_promedio_pregunta': round(fila['tiempo_promedio_pregunta'], 2),
+        'ultima_actividad': fila['ultima_actividad'],
+    }
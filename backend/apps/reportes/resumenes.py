@@ -0,0 +1,80 @@
+"""
+Mantenimiento del acumulado ``ResumenEstudianteMateria``.
+
+``acumular_sesion`` suma una sesión recién completada a la fila de su
+estudiante y materia; ``reconstruir_resumenes`` recalcula las filas desde los
+contadores de ``SesionSimulacion`` con una sola agregación.
+"""
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+
+from apps.simulacion.models import SesionSimulacion
+from .models import ResumenEstudianteMateria
+
+
+def acumular_sesion(sesion):
+    """Suma una sesión completada al resumen de su estudiante y materia"""
+    with transaction.atomic():
+        resumen, _ = ResumenEstudianteMateria.objects.select_for_update().get_or_create(
+            estudiante_id=sesion.estudiante_id,
+            materia_id=sesion.materia_id
+        )
+        resumen.sesiones_completadas += 1
+        resumen.suma_puntuacion += sesion.puntuacion
+        resumen.mejor_puntuacion = max(resumen.mejor_puntuacion, sesion.puntuacion)
+        resumen.total_preguntas += sesion.total_preguntas
+        resumen.preguntas_respondidas += sesion.respondidas
+        resumen.preguntas_correctas += sesion.correctas
+        resumen.tiempo_total += sesion.tiempo_total
+        if sesion.fecha_fin and (
+            resumen.ultima_actividad is None or sesion.fecha_fin > resumen.ultima_actividad
+        ):
+            resumen.ultima_actividad = sesion.fecha_fin
+        resumen.save()
+    return resumen
+
+
+def reconstruir_resumenes(estudiante_ids=None):
+    """
+    Recalcula los resúmenes a partir de las sesiones completadas.
+
+    Si se indican ``estudiante_ids`` solo se reconstruyen los de esos
+    estudiantes. Retorna la cantidad de filas creadas.
+    """
+    sesiones = SesionSimulacion.objects.filter(completada=True)
+    resumenes = ResumenEstudianteMateria.objects.all()
+    if estudiante_ids is not None:
+        sesiones = sesiones.filter(estudiante_id__in=estudiante_ids)
+        resumenes = resumenes.filter(estudiante_id__in=estudiante_ids)
+
+    filas = sesiones.values('estudiante_id', 'materia_id').annotate(
+        n_sesiones=Count('id'),
+        n_suma=Sum('puntuacion'),
+        n_mejor=Max('puntuacion'),
+        n_total=Sum('total_preguntas'),
+        n_respondidas=Sum('respondidas'),
+        n_correctas=Sum('correctas'),
+        n_tiempo=Sum('tiempo_total'),
+        n_ultima=Max('fecha_fin'),
+    ).order_by()
+
+    nuevos = [
+        ResumenEstudianteMateria(
+            estudiante_id=fila['estudiante_id'],
+            materia_id=fila['materia_id'],
+            sesiones_completadas=fila['n_sesiones'],
+            suma_puntuacion=fila['n_suma'] or 0,
+            mejor_puntuacion=fila['n_mejor'] or 0,
+            total_preguntas=fila['n_total'] or 0,
+            preguntas_respondidas=fila['n_respondidas'] or 0,
+            preguntas_correctas=fila['n_correctas'] or 0,
+            tiempo_total=fila['n_tiempo'] or 0,
+            ultima_actividad=fila['n_ultima'],
+        )
+        for fila in filas
+    ]
+
+    with transaction.atomic():
+        resumenes.delete()
+        ResumenEstudianteMateria.objects.bulk_create(nuevos, batch_size=500)
+    return len(nuevos)
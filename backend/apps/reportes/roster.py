@@ -0,0 +1,48 @@
+"""
+Estudiantes de las clases activas de cada docente.
+
+Los reportes del docente filtran con ``subconsulta_estudiantes``, que se
+resuelve en SQL como subconsulta sobre la tabla de inscripciones, en lugar de
+armar una lista de IDs en Python y enviarla como un ``IN (...)`` enorme.
+
+``obtener_roster`` guarda en el cache los IDs y un número de versión por
+docente para quien necesite los IDs en memoria o quiera cachear resultados
+que dependen de ellos. Las señales de ``Clase`` incrementan la versión.
+"""
+from collections import namedtuple
+
+from apps.core import cache
+from apps.core.models import Clase
+
+ESPACIO_ROSTER = 'reportes:roster:{}'
+TIEMPO_ROSTER = 60 * 60
+
+Roster = namedtuple('Roster', ['version', 'estudiantes'])
+
+Inscripcion = Clase.estudiantes.through
+
+
+def subconsulta_estudiantes(docente_id):
+    """Queryset de IDs de estudiantes del docente, para usar en ``__in``"""
+    return Inscripcion.objects.filter(
+        clase__docente_id=docente_id,
+        clase__activa=True
+    ).values('usuario_id')
+
+
+def obtener_roster(docente_id):
+    """Retorna ``Roster(version, estudiantes)`` del docente desde el cache"""
+    espacio = ESPACIO_ROSTER.format(docente_id)
+    version = cache.version(espacio)
+    return cache.obtener_o_calcular(
+        f'{espacio}:v{version}',
+        lambda: Roster(version, frozenset(
+            subconsulta_estudiantes(docente_id).values_list('usuario_id', flat=True)
+        )),
+        TIEMPO_ROSTER
+    )
+
+
+def invalidar_roster(*docente_ids):
+    """Descarta el roster cacheado de los docentes indicados"""
+    cache.invalidar(*[ESPACIO_ROSTER.format(docente_id) for docente_id in docente_ids])
@@ -36,13 +36,11 @@ class HistorialSesionSerializer(serializers.ModelSerializer):
         ]
     
     def get_duracion_minutos(self, obj):
-        # Calcular duración basada en las respuestas de las preguntas
-        preguntas_sesion = obj.preguntas_sesion.all()
-        tiempo_total_segundos = sum(p.tiempo_respuesta or 0 for p in preguntas_sesion)
-        return round(tiempo_total_segundos / 60, 1)
+        # Duración basada en el tiempo acumulado de las respuestas de la sesión
+        return round(obj.tiempo_total / 60, 1)
 
 class ProgresoDiarioSerializer(serializers.Serializer):
-    """Serializer para progreso diario (últimos 30 días)"""
+    """Serializer para progreso por periodo (día, semana o mes)"""
     fecha = serializers.DateField()
     simulaciones = serializers.IntegerField()
     promedio_puntaje = serializers.FloatField()
@@ -75,6 +73,10 @@ class DocentePreguntaItemSerializer(serializers.Serializer):
     porcentaje_acierto = serializers.FloatField()
     total_respuestas = serializers.IntegerField()
     opcion_mas_elegida = serializers.CharField(allow_null=True)
+    distribucion = serializers.DictField(child=serializers.IntegerField())
+    indice_dificultad = serializers.FloatField()
+    discriminacion = serializers.FloatField(allow_null=True)
+    tiempo_promedio = serializers.FloatField()
 
 
 class DocenteEstudianteSerializer(serializers.Serializer):
@@ -82,4 +84,5 @@ class DocenteEstudianteSerializer(serializers.Serializer):
     nombre = serializers.CharField()
     simulaciones = serializers.IntegerField()
     porcentaje_acierto = serializers.FloatField()
-    tiempo_promedio_pregunta = serializers.FloatField()
\ No newline at end of file
+    tiempo_promedio_pregunta = serializers.FloatField()
+    ultima_actividad = serializers.DateTimeField(allow_null=True)
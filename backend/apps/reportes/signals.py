@@ -0,0 +1,48 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.core.models import Clase
+from apps.simulacion.signals import sesion_completada
+from .resumenes import acumular_sesion
+from .roster import invalidar_roster
+
+
+@receiver(sesion_completada)
+def actualizar_resumen_estudiante(sender, sesion, **kwargs):
+    """Suma la sesión completada al resumen del estudiante en la materia"""
+    acumular_sesion(sesion)
+
+
+@receiver(m2m_changed, sender=Clase.estudiantes.through)
+def invalidar_roster_por_inscripcion(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalida el roster del docente cuando cambian los estudiantes de una clase"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidar_roster(instance.docente_id)
+        return
+
+    # Cambio desde el estudiante (usuario.clases_inscritas): afecta a los docentes de esas clases
+    if action in ('post_add', 'post_remove'):
+        invalidar_roster(*Clase.objects.filter(pk__in=pk_set).values_list('docente_id', flat=True))
+    elif action == 'pre_clear':
+        invalidar_roster(*instance.clases_inscritas.values_list('docente_id', flat=True))
+
+
+@receiver(pre_save, sender=Clase)
+def recordar_docente_anterior(sender, instance, **kwargs):
+    """Guarda el docente previo para invalidar también su roster si la clase cambia de dueño"""
+    instance._docente_anterior_id = None
+    if instance.pk:
+        instance._docente_anterior_id = Clase.objects.filter(pk=instance.pk).values_list(
+            'docente_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Clase)
+@receiver(post_delete, sender=Clase)
+def invalidar_roster_por_clase(sender, instance, **kwargs):
+    """Invalida el roster cuando una clase se crea, se activa/desactiva o se elimina"""
+    docentes = [instance.docente_id]
+    if getattr(instance, '_docente_anterior_id', None):
+        docentes.append(instance._docente_anterior_id)
+    invalidar_roster(*docentes)
@@ -0,0 +1,121 @@
+"""
+Tests para el análisis de ítems del docente
+
+Cubre:
+- Distribución, dificultad y discriminación en una sola consulta
+- Acumulados cacheados y actualizados con las sesiones nuevas
+- Endpoint ``preguntas`` del docente
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core.models import Clase, Materia, Pregunta
+from apps.reportes.analisis_items import _combinar, analizar_preguntas
+from apps.reportes.roster import obtener_roster
+from apps.simulacion.services import crear_sesion, registrar_respuesta
+
+Usuario = get_user_model()
+
+
+@patch('apps.reportes.analisis_items.MARGEN_CONSOLIDACION', timedelta(0))
+class AnalisisItemsTestCase(APITestCase):
+    """Tests para analizar_preguntas"""
+
+    def setUp(self):
+        cache.clear()
+        self.docente = Usuario.objects.create_user(
+            username='docente_items', email='docente_items@test.com',
+            password='testpass123', rol='docente'
+        )
+        self.materia = Materia.objects.create(nombre='matematicas', nombre_display='Matemáticas')
+        self.preguntas = [
+            Pregunta.objects.create(
+                enunciado=f'Pregunta {i}', opciones={'A': '1', 'B': '2', 'C': '3', 'D': '4'},
+                respuesta_correcta='A', retroalimentacion='Revisar', materia=self.materia
+            )
+            for i in range(3)
+        ]
+        self.clase = Clase.objects.create(nombre='11C', docente=self.docente)
+        self.numero = 0
+
+    def responder(self, respuestas, inscribir=True, estudiante=None):
+        """Sesión respondiendo ``respuestas`` en orden, por defecto de un estudiante nuevo"""
+        if estudiante is None:
+            self.numero += 1
+            estudiante = Usuario.objects.create_user(
+                username=f'est_items{self.numero}', email=f'est_items{self.numero}@test.com',
+                password='testpass123', rol='estudiante'
+            )
+            if inscribir:
+                self.clase.estudiantes.add(estudiante)
+        sesion, _ = crear_sesion(estudiante, self.materia, self.preguntas)
+        for respuesta in respuestas:
+            registrar_respuesta(sesion, respuesta, 10)
+        return sesion
+
+    def test_indicadores_por_pregunta(self):
+        for respuestas in ('AAA', 'AAB', 'ABB', 'BBC'):
+            self.responder(respuestas)
+        self.responder('BB')  # sesión incompleta
+        self.responder('CCC', inscribir=False)
+
+        items = {item['pregunta_id']: item for item in analizar_preguntas(self.docente.id)}
+
+        primera = items[self.preguntas[0].id]
+        self.assertEqual(primera['total_respuestas'], 4)
+        self.assertEqual(primera['distribucion'], {'A': 3, 'B': 1})
+        self.assertEqual(primera['indice_dificultad'], 0.75)
+        self.assertEqual(primera['porcentaje_acierto'], 75.0)
+        self.assertGreater(primera['discriminacion'], 0)
+        self.assertEqual(primera['tiempo_promedio'], 10)
+
+        tercera = items[self.preguntas[2].id]
+        self.assertEqual(tercera['distribucion'], {'A': 1, 'B': 2, 'C': 1})
+        self.assertEqual(tercera['opcion_mas_elegida'], 'B')
+
+    def test_discriminacion_indefinida_sin_varianza(self):
+        self.responder('AAA')
+        self.responder('AAA')
+
+        items = analizar_preguntas(self.docente.id)
+
+        self.assertTrue(all(item['discriminacion'] is None for item in items))
+
+    def test_consultas_constantes_e_incrementales(self):
+        sesion = self.responder('AAA')
+        obtener_roster(self.docente.id)
+        with self.assertNumQueries(1):
+            analizar_preguntas(self.docente.id)
+
+        # Solo se agregan las respuestas de la sesión nueva
+        self.responder('BBB', estudiante=sesion.estudiante)
+        with self.assertNumQueries(1), patch('apps.reportes.analisis_items._combinar', wraps=_combinar) as combinar:
+            items = analizar_preguntas(self.docente.id)
+
+        combinar.assert_called_once()
+        self.assertTrue(all(item['total_respuestas'] == 2 for item in items))
+        self.assertEqual(items[0]['distribucion'], {'A': 1, 'B': 1})
+
+    def test_filtro_por_materia(self):
+        self.responder('AAA')
+        otra = Materia.objects.create(nombre='lectura', nombre_display='Lectura Crítica')
+
+        self.assertEqual(len(analizar_preguntas(self.docente.id, self.materia.id)), 3)
+        self.assertEqual(analizar_preguntas(self.docente.id, otra.id), [])
+
+    def test_endpoint_preguntas(self):
+        for respuestas in ('AAA', 'ABC'):
+            self.responder(respuestas)
+        self.client.force_authenticate(user=self.docente)
+
+        response = self.client.get('/api/reportes/docente/preguntas/', {'limit': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(response.data[1]['distribucion'], {'A': 1, 'B': 1})
+        self.assertIn('discriminacion', response.data[0])
@@ -0,0 +1,83 @@
+"""
+Tests para el progreso por periodo del estudiante
+
+Cubre:
+- Agrupación por día en hora de Colombia
+- Periodos sin actividad completados en memoria
+- Granularidad semanal y mensual
+- Endpoint progreso_diario con una sola consulta
+"""
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from rest_framework import status
+
+from apps.reportes.progreso import calcular_progreso_periodico
+from apps.simulacion.models import SesionSimulacion
+from .test_resumenes import ReportesBaseTestCase
+
+BOGOTA = ZoneInfo('America/Bogota')
+
+
+class ProgresoPeriodicoTestCase(ReportesBaseTestCase):
+    """Tests para calcular_progreso_periodico y el endpoint progreso_diario"""
+
+    def completar_en(self, momento, respuestas='AB', tiempo=60):
+        sesion = self.completar_sesion(self.matematicas, respuestas, tiempo)
+        SesionSimulacion.objects.filter(pk=sesion.pk).update(fecha_inicio=momento)
+        return sesion
+
+    def test_agrupa_por_dia_en_hora_de_colombia(self):
+        # 23:30 en Bogotá ya es el día siguiente en UTC
+        self.completar_en(datetime(2026, 3, 10, 23, 30, tzinfo=BOGOTA), 'AA')
+        self.completar_en(datetime(2026, 3, 10, 8, 0, tzinfo=BOGOTA), 'AB')
+
+        progreso = calcular_progreso_periodico(self.estudiante, 7, hoy=date(2026, 3, 12))
+
+        self.assertEqual(len(progreso), 8)
+        por_fecha = {p['fecha']: p for p in progreso}
+        self.assertEqual(por_fecha[date(2026, 3, 10)]['simulaciones'], 2)
+        self.assertEqual(por_fecha[date(2026, 3, 10)]['promedio_puntaje'], 1.5)
+        self.assertEqual(por_fecha[date(2026, 3, 10)]['tiempo_estudio'], 4)
+        self.assertEqual(por_fecha[date(2026, 3, 11)]['simulaciones'], 0)
+
+    def test_granularidad_semanal_y_mensual(self):
+        self.completar_en(datetime(2026, 1, 5, 10, 0, tzinfo=BOGOTA))
+        self.completar_en(datetime(2026, 1, 8, 10, 0, tzinfo=BOGOTA))
+        self.completar_en(datetime(2026, 2, 20, 10, 0, tzinfo=BOGOTA))
+
+        semanas = calcular_progreso_periodico(self.estudiante, 90, 'semana', hoy=date(2026, 3, 1))
+        self.assertTrue(all(p['fecha'].weekday() == 0 for p in semanas))
+        self.assertEqual({p['fecha']: p['simulaciones'] for p in semanas}[date(2026, 1, 5)], 2)
+
+        meses = calcular_progreso_periodico(self.estudiante, 90, 'mes', hoy=date(2026, 3, 1))
+        self.assertEqual(
+            [(p['fecha'], p['simulaciones']) for p in meses],
+            [(date(2025, 12, 1), 0), (date(2026, 1, 1), 2), (date(2026, 2, 1), 1), (date(2026, 3, 1), 0)]
+        )
+
+    def test_endpoint_una_sola_consulta(self):
+        self.client.force_authenticate(user=self.estudiante)
+        self.completar_sesion(self.matematicas, 'AA')
+        self.completar_sesion(self.lectura, 'AB')
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/reportes/progreso_diario/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 31)
+        self.assertEqual(response.data[-1]['simulaciones'], 2)
+
+    def test_endpoint_valida_parametros(self):
+        self.client.force_authenticate(user=self.estudiante)
+        self.assertEqual(
+            self.client.get('/api/reportes/progreso_diario/', {'dias': 45}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.client.get('/api/reportes/progreso_diario/', {'granularidad': 'anio'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        response = self.client.get('/api/reportes/progreso_diario/', {'dias': 365, 'granularidad': 'mes'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(len(response.data), (13, 14))
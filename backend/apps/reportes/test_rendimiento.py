@@ -0,0 +1,103 @@
+"""
+Tests para el rendimiento por estudiante del docente
+
+Cubre:
+- Agregación agrupada con consultas constantes
+- Orden por acierto, actividad o tiempo
+- Paginación opcional
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core.models import Clase, Materia, Pregunta
+from apps.simulacion.services import crear_sesion, registrar_respuesta
+
+Usuario = get_user_model()
+URL = '/api/reportes/docente/estudiantes/'
+
+
+class RendimientoEstudiantesTestCase(APITestCase):
+    """Tests para el endpoint estudiantes del docente"""
+
+    def setUp(self):
+        cache.clear()
+        self.docente = Usuario.objects.create_user(
+            username='docente_rend', email='docente_rend@test.com',
+            password='testpass123', rol='docente'
+        )
+        self.materia = Materia.objects.create(nombre='matematicas', nombre_display='Matemáticas')
+        self.preguntas = [
+            Pregunta.objects.create(
+                enunciado=f'Pregunta {i}', opciones={'A': '1', 'B': '2', 'C': '3', 'D': '4'},
+                respuesta_correcta='A', retroalimentacion='Revisar', materia=self.materia
+            )
+            for i in range(4)
+        ]
+        self.clase = Clase.objects.create(nombre='11D', docente=self.docente)
+        # (respuestas, tiempo por pregunta)
+        self.estudiantes = [
+            self.crear_estudiante(i, respuestas, tiempo)
+            for i, (respuestas, tiempo) in enumerate([('AAAA', 30), ('ABBB', 10), ('AABB', 20)])
+        ]
+        self.client.force_authenticate(user=self.docente)
+
+    def crear_estudiante(self, i, respuestas, tiempo):
+        estudiante = Usuario.objects.create_user(
+            username=f'est_rend{i}', email=f'est_rend{i}@test.com', password='testpass123',
+            rol='estudiante', first_name=f'Nombre{i}', last_name='Apellido'
+        )
+        self.clase.estudiantes.add(estudiante)
+        sesion, _ = crear_sesion(estudiante, self.materia, self.preguntas)
+        for respuesta in respuestas:
+            registrar_respuesta(sesion, respuesta, tiempo)
+        return estudiante
+
+    def test_metricas_por_estudiante(self):
+        # Una sesión incompleta cuenta como actividad pero no en las métricas
+        crear_sesion(self.estudiantes[0], self.materia, self.preguntas)
+
+        response = self.client.get(URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        item = next(e for e in response.data if e['estudiante_id'] == self.estudiantes[0].id)
+        self.assertEqual(item['nombre'], 'Nombre0 Apellido')
+        self.assertEqual(item['simulaciones'], 1)
+        self.assertEqual(item['porcentaje_acierto'], 100.0)
+        self.assertEqual(item['tiempo_promedio_pregunta'], 30.0)
+        self.assertIsNotNone(item['ultima_actividad'])
+
+    def test_consultas_constantes(self):
+        with self.assertNumQueries(1):
+            self.client.get(URL)
+
+        for i in range(3, 8):
+            self.crear_estudiante(i, 'AB', 5)
+        with self.assertNumQueries(1):
+            response = self.client.get(URL)
+        self.assertEqual(len(response.data), 8)
+
+    def test_orden(self):
+        ids = lambda response: [e['estudiante_id'] for e in response.data]
+        e0, e1, e2 = (e.id for e in self.estudiantes)
+
+        self.assertEqual(ids(self.client.get(URL)), [e0, e2, e1])
+        self.assertEqual(ids(self.client.get(URL, {'orden': 'acierto'})), [e1, e2, e0])
+        self.assertEqual(ids(self.client.get(URL, {'orden': 'tiempo'})), [e1, e2, e0])
+        self.assertEqual(ids(self.client.get(URL, {'orden': '-actividad'})), [e2, e1, e0])
+
+    def test_orden_invalido(self):
+        response = self.client.get(URL, {'orden': 'nombre'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+
+    def test_paginacion_opcional(self):
+        response = self.client.get(URL, {'page_size': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+
+        response = self.client.get(URL, {'page_size': 2, 'page': 2})
+        self.assertEqual(len(response.data['results']), 1)
@@ -0,0 +1,193 @@
+"""
+Tests para los reportes del estudiante
+
+Cubre:
+- Actualización incremental de ResumenEstudianteMateria al completar sesiones
+- Reconstrucción del resumen desde las sesiones
+- Endpoints de reportes leyendo del resumen con consultas constantes
+"""
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core.models import Materia, Pregunta
+from apps.reportes.models import ResumenEstudianteMateria
+from apps.reportes.utils import calcular_puntaje_icfes
+from apps.simulacion.models import SesionSimulacion
+from apps.simulacion.services import crear_sesion, registrar_respuesta, registrar_respuestas_lote
+
+Usuario = get_user_model()
+
+
+class ReportesBaseTestCase(APITestCase):
+    """Datos comunes para los tests de reportes"""
+
+    def setUp(self):
+        cache.clear()
+        self.estudiante = Usuario.objects.create_user(
+            username='estudiante_reportes',
+            email='estudiante_reportes@test.com',
+            password='testpass123',
+            rol='estudiante'
+        )
+        self.matematicas = Materia.objects.create(nombre='matematicas', nombre_display='Matemáticas')
+        self.lectura = Materia.objects.create(nombre='lectura', nombre_display='Lectura Crítica')
+        self.preguntas = {
+            materia.id: [
+                Pregunta.objects.create(
+                    enunciado=f'Pregunta {i}',
+                    opciones={'A': '1', 'B': '2', 'C': '3', 'D': '4'},
+                    respuesta_correcta='A',
+                    retroalimentacion='Revisar',
+                    materia=materia
+                )
+                for i in range(5)
+            ]
+            for materia in (self.matematicas, self.lectura)
+        }
+
+    def completar_sesion(self, materia, respuestas, tiempo=10):
+        """Crea y responde una sesión completa; ``respuestas`` es una cadena como 'AABBA'"""
+        sesion, _ = crear_sesion(self.estudiante, materia, self.preguntas[materia.id][:len(respuestas)])
+        for respuesta in respuestas:
+            registrar_respuesta(sesion, respuesta, tiempo)
+        return sesion
+
+
+class ResumenEstudianteMateriaTestCase(ReportesBaseTestCase):
+    """Tests para el mantenimiento del resumen"""
+
+    def test_sesion_completada_actualiza_resumen(self):
+        self.completar_sesion(self.matematicas, 'AAAB')
+        self.completar_sesion(self.matematicas, 'ABBB', tiempo=20)
+
+        resumen = ResumenEstudianteMateria.objects.get(
+            estudiante=self.estudiante, materia=self.matematicas
+        )
+        self.assertEqual(resumen.sesiones_completadas, 2)
+        self.assertEqual(resumen.suma_puntuacion, 4)
+        self.assertEqual(resumen.mejor_puntuacion, 3)
+        self.assertEqual(resumen.preguntas_correctas, 4)
+        self.assertEqual(resumen.total_preguntas, 8)
+        self.assertEqual(resumen.tiempo_total, 120)
+        self.assertIsNotNone(resumen.ultima_actividad)
+
+    def test_sesion_incompleta_no_se_acumula(self):
+        sesion, _ = crear_sesion(self.estudiante, self.matematicas, self.preguntas[self.matematicas.id])
+        registrar_respuesta(sesion, 'A', 10)
+        self.assertFalse(ResumenEstudianteMateria.objects.exists())
+
+    def test_lote_y_finalizar_actualizan_resumen(self):
+        sesion, _ = crear_sesion(self.estudiante, self.lectura, self.preguntas[self.lectura.id][:2])
+        registrar_respuestas_lote(sesion, [
+            {'orden': 1, 'respuesta': 'A', 'tiempo_respuesta': 5},
+            {'orden': 2, 'respuesta': 'A', 'tiempo_respuesta': 5},
+        ])
+        sesion, _ = crear_sesion(self.estudiante, self.matematicas, self.preguntas[self.matematicas.id][:3])
+        registrar_respuesta(sesion, 'A', 5)
+        sesion.finalizar()
+        sesion.finalizar()
+
+        resumenes = {
+            r.materia_id: r for r in ResumenEstudianteMateria.objects.filter(estudiante=self.estudiante)
+        }
+        self.assertEqual(resumenes[self.lectura.id].suma_puntuacion, 2)
+        self.assertEqual(resumenes[self.matematicas.id].sesiones_completadas, 1)
+        self.assertEqual(resumenes[self.matematicas.id].preguntas_respondidas, 1)
+        self.assertEqual(resumenes[self.matematicas.id].total_preguntas, 3)
+
+    def test_finalizar_concurrente_acumula_una_vez(self):
+        sesion, _ = crear_sesion(self.estudiante, self.matematicas, self.preguntas[self.matematicas.id][:3])
+        registrar_respuesta(sesion, 'A', 5)
+        # Dos peticiones que cargaron la sesión antes de que alguna la finalizara
+        primera = SesionSimulacion.objects.get(pk=sesion.pk)
+        segunda = SesionSimulacion.objects.get(pk=sesion.pk)
+        primera.finalizar()
+        segunda.finalizar()
+
+        resumen = ResumenEstudianteMateria.objects.get(estudiante=self.estudiante, materia=self.matematicas)
+        self.assertEqual(resumen.sesiones_completadas, 1)
+        self.assertEqual(resumen.preguntas_respondidas, 1)
+        self.assertTrue(segunda.completada)
+        self.assertEqual(segunda.fecha_fin, primera.fecha_fin)
+
+    def test_reconstruir_resumenes(self):
+        self.completar_sesion(self.matematicas, 'AAB')
+        self.completar_sesion(self.lectura, 'A')
+        esperado = list(ResumenEstudianteMateria.objects.order_by('materia_id').values(
+            'materia_id', 'sesiones_completadas', 'suma_puntuacion', 'mejor_puntuacion',
+            'total_preguntas', 'preguntas_respondidas', 'preguntas_correctas', 'tiempo_total'
+        ))
+        ResumenEstudianteMateria.objects.update(sesiones_completadas=99)
+
+        call_command('reconstruir_resumenes', stdout=io.StringIO())
+
+        self.assertEqual(list(ResumenEstudianteMateria.objects.order_by('materia_id').values(
+            'materia_id', 'sesiones_completadas', 'suma_puntuacion', 'mejor_puntuacion',
+            'total_preguntas', 'preguntas_respondidas', 'preguntas_correctas', 'tiempo_total'
+        )), esperado)
+
+
+class ReportesEstudianteTestCase(ReportesBaseTestCase):
+    """Tests para los endpoints de reportes del estudiante"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.estudiante)
+
+    def test_estadisticas_generales(self):
+        self.completar_sesion(self.matematicas, 'AAAB')
+        self.completar_sesion(self.lectura, 'AB', tiempo=30)
+        crear_sesion(self.estudiante, self.matematicas, self.preguntas[self.matematicas.id][:2])
+
+        response = self.client.get('/api/reportes/estadisticas_generales/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_simulaciones'], 3)
+        self.assertEqual(response.data['simulaciones_completadas'], 2)
+        self.assertEqual(response.data['promedio_puntaje'], 2.0)
+        self.assertEqual(response.data['mejor_puntaje'], 3)
+        self.assertEqual(response.data['tiempo_total_estudio'], 2)
+
+    def test_estadisticas_por_materia_y_ranking(self):
+        self.completar_sesion(self.matematicas, 'ABBB')
+        self.completar_sesion(self.lectura, 'AAAA')
+
+        response = self.client.get('/api/reportes/estadisticas_por_materia/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        por_materia = {m['materia_id']: m for m in response.data}
+        self.assertEqual(por_materia[self.matematicas.id]['porcentaje_acierto'], 25.0)
+        self.assertEqual(por_materia[self.lectura.id]['preguntas_correctas'], 4)
+
+        response = self.client.get('/api/reportes/ranking_materias/')
+        self.assertEqual([m['materia_id'] for m in response.data], [self.lectura.id, self.matematicas.id])
+
+    def test_consultas_constantes_con_historial(self):
+        self.completar_sesion(self.matematicas, 'AB')
+        with self.assertNumQueries(1):
+            self.client.get('/api/reportes/estadisticas_por_materia/')
+        with self.assertNumQueries(2):
+            self.client.get('/api/reportes/estadisticas_generales/')
+
+        for _ in range(5):
+            self.completar_sesion(self.matematicas, 'AAB')
+            self.completar_sesion(self.lectura, 'AB')
+        with self.assertNumQueries(1):
+            self.client.get('/api/reportes/estadisticas_por_materia/')
+        with self.assertNumQueries(2):
+            self.client.get('/api/reportes/estadisticas_generales/')
+
+    def test_puntaje_icfes_desde_resumen(self):
+        self.completar_sesion(self.matematicas, 'AAAA')
+        self.completar_sesion(self.matematicas, 'AABB')
+
+        resultado = calcular_puntaje_icfes(self.estudiante)
+
+        self.assertEqual(resultado['puntajes_materias'], {'M': 3.0})
+        self.assertEqual(resultado['detalles_materias']['M']['simulaciones'], 2)
+        self.assertEqual(resultado['detalles_materias']['M']['mejor_puntaje'], 4)
+        self.assertIn('Lectura Crítica', resultado['materias_faltantes'])
@@ -0,0 +1,124 @@
+"""
+Tests para el roster de estudiantes por docente
+
+Cubre:
+- Subconsulta SQL en lugar de listas de IDs en los reportes del docente
+- Roster cacheado e invalidado con los cambios de Clase
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core.models import Clase, Materia, Pregunta
+from apps.reportes.roster import obtener_roster, subconsulta_estudiantes
+from apps.simulacion.services import crear_sesion, registrar_respuesta
+
+Usuario = get_user_model()
+
+
+def crear_estudiantes(cantidad, prefijo='est'):
+    return [
+        Usuario.objects.create_user(
+            username=f'{prefijo}{i}', email=f'{prefijo}{i}@test.com',
+            password='testpass123', rol='estudiante'
+        )
+        for i in range(cantidad)
+    ]
+
+
+class RosterDocenteTestCase(TestCase):
+    """Tests para obtener_roster y su invalidación"""
+
+    def setUp(self):
+        cache.clear()
+        self.docente = Usuario.objects.create_user(
+            username='docente_roster', email='docente_roster@test.com',
+            password='testpass123', rol='docente'
+        )
+        self.estudiantes = crear_estudiantes(4)
+        self.clase = Clase.objects.create(nombre='11A', docente=self.docente)
+        self.clase.estudiantes.add(*self.estudiantes[:2])
+
+    def test_subconsulta_no_materializa_ids(self):
+        consulta = Usuario.objects.filter(id__in=subconsulta_estudiantes(self.docente.id))
+        with CaptureQueriesContext(connection) as consultas:
+            ids = set(consulta.values_list('id', flat=True))
+
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(ids, {e.id for e in self.estudiantes[:2]})
+
+    def test_roster_cacheado(self):
+        obtener_roster(self.docente.id)
+        with self.assertNumQueries(0):
+            roster = obtener_roster(self.docente.id)
+        self.assertEqual(roster.estudiantes, {e.id for e in self.estudiantes[:2]})
+
+    def test_invalidacion_al_inscribir_y_retirar(self):
+        version = obtener_roster(self.docente.id).version
+
+        self.clase.estudiantes.add(self.estudiantes[2])
+        roster = obtener_roster(self.docente.id)
+        self.assertIn(self.estudiantes[2].id, roster.estudiantes)
+        self.assertNotEqual(roster.version, version)
+
+        self.estudiantes[0].clases_inscritas.remove(self.clase)
+        self.assertNotIn(self.estudiantes[0].id, obtener_roster(self.docente.id).estudiantes)
+
+        self.estudiantes[3].clases_inscritas.add(self.clase)
+        self.assertIn(self.estudiantes[3].id, obtener_roster(self.docente.id).estudiantes)
+
+        self.clase.estudiantes.clear()
+        self.assertEqual(obtener_roster(self.docente.id).estudiantes, frozenset())
+
+    def test_invalidacion_al_desactivar_clase(self):
+        obtener_roster(self.docente.id)
+        self.clase.activa = False
+        self.clase.save()
+        self.assertEqual(obtener_roster(self.docente.id).estudiantes, frozenset())
+
+
+class ReportesDocenteRosterTestCase(APITestCase):
+    """Los reportes del docente solo consideran a sus estudiantes"""
+
+    def setUp(self):
+        cache.clear()
+        self.docente = Usuario.objects.create_user(
+            username='docente_reportes', email='docente_reportes@test.com',
+            password='testpass123', rol='docente'
+        )
+        self.materia = Materia.objects.create(nombre='matematicas', nombre_display='Matemáticas')
+        self.preguntas = [
+            Pregunta.objects.create(
+                enunciado=f'Pregunta {i}', opciones={'A': '1', 'B': '2', 'C': '3', 'D': '4'},
+                respuesta_correcta='A', retroalimentacion='Revisar', materia=self.materia
+            )
+            for i in range(3)
+        ]
+        self.propios = crear_estudiantes(3, 'propio')
+        self.ajeno = crear_estudiantes(1, 'ajeno')[0]
+        clase = Clase.objects.create(nombre='11B', docente=self.docente)
+        clase.estudiantes.add(*self.propios)
+        for estudiante in self.propios + [self.ajeno]:
+            sesion, _ = crear_sesion(estudiante, self.materia, self.preguntas)
+            for _ in self.preguntas:
+                registrar_respuesta(sesion, 'A', 10)
+        self.client.force_authenticate(user=self.docente)
+
+    def test_resumen_filtra_por_roster(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/api/reportes/docente/resumen/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['simulaciones_completadas'], 3)
+        # El filtro por estudiantes se resuelve como subconsulta, no como lista literal
+        self.assertTrue(any('IN (SELECT' in q['sql'] for q in consultas.captured_queries))
+
+    def test_estudiantes_excluye_ajenos(self):
+        response = self.client.get('/api/reportes/docente/estudiantes/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({e['estudiante_id'] for e in response.data}, {e.id for e in self.propios})
@@ -2,9 +2,7 @@
 Utilidades para el cálculo de puntajes ICFES
 """
 from typing import Dict, List, Optional
-from apps.core.models import Materia
-from apps.simulacion.models import SesionSimulacion
-from django.db import models
+from .models import ResumenEstudianteMateria
 
 
 def calcular_puntaje_icfes(estudiante) -> Dict:
@@ -40,41 +38,34 @@ def calcular_puntaje_icfes(estudiante) -> Dict:
         'I': 1    # Inglés
     }
     
-    # Obtener todas las sesiones completadas del estudiante
-    sesiones_completadas = SesionSimulacion.objects.filter(
+    # Acumulado de sesiones completadas por materia (una fila por materia)
+    resumenes = ResumenEstudianteMateria.objects.filter(
         estudiante=estudiante,
-        completada=True
-    ).select_related('materia')
+        materia__activa=True,
+        sesiones_completadas__gt=0
+    ).select_related('materia').order_by('materia_id')
     
     # Calcular puntajes promedio por materia
     puntajes_materias = {}
     detalles_materias = {}
     
-    for materia in Materia.objects.filter(activa=True):
-        sesiones_materia = sesiones_completadas.filter(materia=materia)
+    for resumen in resumenes:
+        materia = resumen.materia
         
-        if sesiones_materia.exists():
-            # Calcular promedio de puntuación para esta materia
-            promedio = sesiones_materia.aggregate(
-                promedio=models.Avg('puntuacion')
-            )['promedio'] or 0
-            
-            # Redondear a 1 decimal
-            puntaje_materia = round(promedio, 1)
-            
-            # Obtener código ICFES para esta materia
-            codigo_icfes = materias_icfes.get(materia.nombre_display, materia.nombre_display)
-            
-            puntajes_materias[codigo_icfes] = puntaje_materia
-            detalles_materias[codigo_icfes] = {
-                'materia_nombre': materia.nombre_display,
-                'puntaje': puntaje_materia,
-                'ponderacion': ponderaciones.get(codigo_icfes, 0),
-                'simulaciones': sesiones_materia.count(),
-                'mejor_puntaje': sesiones_materia.aggregate(
-                    mejor=models.Max('puntuacion')
-                )['mejor'] or 0
-            }
+        # Promedio de puntuación redondeado a 1 decimal
+        puntaje_materia = round(resumen.promedio_puntuacion, 1)
+        
+        # Obtener código ICFES para esta materia
+        codigo_icfes = materias_icfes.get(materia.nombre_display, materia.nombre_display)
+        
+        puntajes_materias[codigo_icfes] = puntaje_materia
+        detalles_materias[codigo_icfes] = {
+            'materia_nombre': materia.nombre_display,
+            'puntaje': puntaje_materia,
+            'ponderacion': ponderaciones.get(codigo_icfes, 0),
+            'simulaciones': resumen.sesiones_completadas,
+            'mejor_puntaje': resumen.mejor_puntuacion
+        }
     
     # Calcular puntaje global ICFES
     suma_ponderada = 0
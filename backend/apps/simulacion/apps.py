@@ -5,3 +5,7 @@ class SimulacionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.simulacion'
     verbose_name = 'Simulación'
+
+    def ready(self):
+        """Se ejecuta cuando la aplicación está lista"""
+        import apps.simulacion.signals  # noqa
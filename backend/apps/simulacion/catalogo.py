@@ -0,0 +1,93 @@
+"""
+Materias disponibles para iniciar una simulación.
+
+Se arma con una consulta de materias (con los conteos anotados) y una de
+plantillas (``Prefetch``), sin consultas por materia. El catálogo de los
+estudiantes es el mismo para todos, así que se guarda en el cache y las
+señales de ``PlantillaSimulacion``, ``Pregunta`` y ``Materia`` lo invalidan;
+el de cada docente depende de sus plantillas y se calcula en cada llamada.
+"""
+from django.db.models import Count, Prefetch, Q
+
+from apps.core import cache
+from apps.core.models import Materia
+from .models import PlantillaSimulacion
+
+ESPACIO_MATERIAS = 'simulacion:materias_disponibles'
+TIEMPO_MATERIAS = 10 * 60
+# Preguntas activas desde las que un docente ve una materia sin plantillas propias
+MINIMO_PREGUNTAS_DOCENTE = 5
+
+
+def _calcular(docente=None):
+    plantillas = PlantillaSimulacion.objects.filter(activa=True).only(
+        'id', 'materia_id', 'titulo', 'descripcion', 'cantidad_preguntas'
+    ).order_by('-fecha_creacion', '-id')
+    if docente is not None:
+        plantillas = plantillas.filter(docente=docente)
+
+    # Ambos conteos cruzan dos relaciones, por eso van con distinct
+    materias = Materia.objects.filter(activa=True).annotate(
+        preguntas_disponibles=Count('preguntas', filter=Q(preguntas__activa=True), distinct=True),
+        plantillas_disponibles=Count(
+            'plantillas_simulacion',
+            filter=Q(plantillas_simulacion__activa=True),
+            distinct=True
+        )
+    )
+    if docente is not None:
+        # Materias donde tiene plantillas o suficientes preguntas
+        materias = materias.annotate(
+            plantillas_docente=Count(
+                'plantillas_simulacion',
+                filter=Q(plantillas_simulacion__activa=True, plantillas_simulacion__docente=docente),
+                distinct=True
+            )
+        ).filter(
+            Q(preguntas_disponibles__gte=MINIMO_PREGUNTAS_DOCENTE) | Q(plantillas_docente__gt=0)
+        )
+    else:
+        # Estudiantes: solo materias con plantillas activas
+        materias = materias.filter(plantillas_disponibles__gt=0)
+
+    materias = materias.order_by('id').prefetch_related(
+        Prefetch('plantillas_simulacion', queryset=plantillas, to_attr='plantillas_visibles')
+    )
+    return [
+        {
+            'id': materia.id,
+            'nombre': materia.nombre,
+            'nombre_display': materia.nombre_display,
+            'color': materia.color,
+            'icono': materia.icono,
+            'descripcion': materia.descripcion,
+            'preguntas_disponibles': materia.preguntas_disponibles,
+            'plantillas_disponibles': materia.plantillas_disponibles,
+            'plantillas': [
+                {
+                    'id': plantilla.id,
+                    'titulo': plantilla.titulo,
+                    'descripcion': plantilla.descripcion,
+                    'cantidad_preguntas': plantilla.cantidad_preguntas,
+                }
+                for plantilla in materia.plantillas_visibles
+            ],
+        }
+        for materia in materias
+    ]
+
+
+def materias_disponibles(usuario):
+    """Materias con sus plantillas visibles para ``usuario`` según su rol"""
+    if usuario.rol == 'docente':
+        return _calcular(docente=usuario)
+    return cache.obtener_o_calcular(
+        cache.clave_versionada(ESPACIO_MATERIAS, 'estudiantes'),
+        _calcular,
+        TIEMPO_MATERIAS
+    )
+
+
+def invalidar_materias_disponibles():
+    """Descarta el catálogo cacheado de los estudiantes"""
+    cache.invalidar(ESPACIO_MATERIAS)
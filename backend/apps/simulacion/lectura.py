@@ -0,0 +1,157 @@
+"""
+Constructores de respuestas de solo lectura para sesiones de simulación.
+
+Leen con proyecciones ``values()`` en lugar de instanciar modelos, de modo
+que el número de consultas es fijo sin importar cuántas preguntas tenga la
+sesión.
+"""
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.core.imagenes import metadatos_desde_valores, srcset_desde_metadatos, url_desde_metadatos
+from .models import PreguntaSesion, SesionSimulacion, calcular_progreso
+
+# Campos de retroalimentación de la pregunta; en modo compacto se omiten y el
+# cliente los pide por pregunta con ``retroalimentacion?orden=N``
+CAMPOS_RETROALIMENTACION = (
+    'respuesta_correcta',
+    'explicacion',
+    'estrategias_resolucion',
+    'retroalimentacion',
+    'retroalimentacion_estructurada',
+    'explicacion_opciones_incorrectas',
+)
+
+CAMPOS_PREGUNTA = (
+    'enunciado',
+    'contexto',
+    'opciones',
+    'dificultad',
+    'tiempo_estimado',
+    'tags',
+)
+
+
+def construir_reanudacion(sesion, request=None, compacto=False):
+    """
+    Construye la respuesta de ``cargar_sesion`` con una sola consulta de
+    preguntas.
+
+    ``sesion`` debe traer ``materia`` y ``plantilla`` cargadas
+    (``select_related``).
+    """
+    campos_pregunta = CAMPOS_PREGUNTA if compacto else CAMPOS_PREGUNTA + CAMPOS_RETROALIMENTACION
+    filas = PreguntaSesion.objects.filter(sesion_id=sesion.pk).order_by('orden').values(
+        'orden', 'respuesta_estudiante', 'es_correcta', 'tiempo_respuesta',
+        'pregunta_id', 'pregunta__materia_id', 'pregunta__competencia_id',
+        'pregunta__imagen', 'pregunta__imagen_metadatos',
+        *[f'pregunta__{campo}' for campo in campos_pregunta]
+    )
+
+    preguntas_data = []
+    respuestas_data = []
+    siguiente_pregunta_index = None
+
+    for i, fila in enumerate(filas):
+        pregunta_data = {'id': fila['pregunta_id']}
+        pregunta_data.update({campo: fila[f'pregunta__{campo}'] for campo in campos_pregunta})
+        metadatos = metadatos_desde_valores(
+            fila['pregunta_id'], fila['pregunta__imagen'], fila['pregunta__imagen_metadatos']
+        )
+        pregunta_data.update({
+            'imagen_url': url_desde_metadatos(metadatos, request),
+            'imagen_srcset': srcset_desde_metadatos(metadatos, request),
+            'materia': fila['pregunta__materia_id'],
+            'competencia': fila['pregunta__competencia_id'],
+            'orden': fila['orden'],
+        })
+        preguntas_data.append(pregunta_data)
+
+        # Si ya fue respondida, agregar a respuestas
+        if fila['respuesta_estudiante']:
+            respuestas_data.append({
+                'pregunta': fila['pregunta_id'],
+                'respuesta': fila['respuesta_estudiante'],
+                'es_correcta': fila['es_correcta'],
+                'tiempo_respuesta': fila['tiempo_respuesta'] or 0,
+                'orden': fila['orden']
+            })
+        elif siguiente_pregunta_index is None:
+            # Esta es la primera pregunta sin responder
+            siguiente_pregunta_index = i
+
+    # Si no encontramos pregunta sin responder, ir al final
+    if siguiente_pregunta_index is None:
+        siguiente_pregunta_index = len(preguntas_data) - 1
+
+    materia = sesion.materia
+    plantilla = sesion.plantilla
+    return {
+        'id': sesion.id,
+        'materia': {
+            'id': materia.id,
+            'nombre': materia.nombre,
+            'nombre_display': materia.nombre_display,
+            'color': materia.color
+        },
+        'plantilla': {
+            'id': plantilla.id,
+            'titulo': plantilla.titulo,
+            'descripcion': plantilla.descripcion
+        } if plantilla else None,
+        'fecha_inicio': sesion.fecha_inicio,
+        'completada': sesion.completada,
+        'puntuacion': sesion.puntuacion,
+        'progreso': calcular_progreso(len(respuestas_data), len(preguntas_data)),
+        'preguntas_sesion': preguntas_data,
+        'respuestas_existentes': respuestas_data,
+        'siguiente_pregunta_index': siguiente_pregunta_index,
+        'puede_continuar': True,
+        'compacto': compacto,
+    }
+
+
+def obtener_retroalimentacion(sesion, orden):
+    """Retroalimentación de la pregunta ``orden`` de la sesión, o ``None`` si no existe"""
+    fila = PreguntaSesion.objects.filter(sesion_id=sesion.pk, orden=orden).values(
+        'orden', 'pregunta_id', *[f'pregunta__{campo}' for campo in CAMPOS_RETROALIMENTACION]
+    ).first()
+    if fila is None:
+        return None
+
+    data = {'orden': fila['orden'], 'pregunta': fila['pregunta_id']}
+    data.update({campo: fila[f'pregunta__{campo}'] for campo in CAMPOS_RETROALIMENTACION})
+    return data
+
+
+def sesiones_activas(estudiante, materia_id=None):
+    """
+    Sesiones sin completar del estudiante (o solo la de ``materia_id``) con
+    su progreso, en una consulta. El progreso sale de los contadores de la
+    sesión.
+    """
+    sesiones = SesionSimulacion.objects.filter(estudiante=estudiante, completada=False)
+    if materia_id is not None:
+        sesiones = sesiones.filter(materia_id=materia_id)
+    return [
+        {
+            'id': fila['id'],
+            'materia': fila['materia__nombre'],
+            'materia_display': fila['materia__nombre_display'],
+            'materia_id': fila['materia_id'],
+            'fecha_inicio': fila['fecha_inicio'],
+            'progreso': calcular_progreso(fila['respondidas'], fila['total_preguntas']),
+        }
+        for fila in sesiones.values(
+            'id', 'materia_id', 'materia__nombre', 'materia__nombre_display',
+            'fecha_inicio', 'respondidas', 'total_preguntas'
+        )
+    ]
+
+
+def etag_sesiones(sesiones):
+    """ETag de una lista de ``sesiones_activas``; cambia si cambia cualquier dato"""
+    contenido = json.dumps(sesiones, cls=DjangoJSONEncoder, sort_keys=True)
+    return '"{}"'.format(hashlib.sha1(contenido.encode()).hexdigest())
@@ -56,7 +56,7 @@ class Command(BaseCommand):
         if self.verbosity >= 2:
             self.stdout.write('\n📋 Detalle de sesiones a eliminar:')
             for session in stale_sessions[:10]:  # Mostrar máximo 10
-                progreso = session.get_progreso()
+                progreso = session.progreso
                 self.stdout.write(f'   - ID: {session.id} | Usuario: {session.estudiante.username} | '
                                 f'Materia: {session.materia.nombre_display} | '
                                 f'Progreso: {progreso["respondidas"]}/{progreso["total"]} | '
@@ -82,7 +82,7 @@ class Command(BaseCommand):
         session_stats = {}
         for session in stale_sessions:
             materia = session.materia.nombre_display
-            progreso = session.get_progreso()
+            progreso = session.progreso
             
             if materia not in session_stats:
                 session_stats[materia] = {
@@ -181,7 +181,7 @@ class Command(BaseCommand):
         for session in recent_sessions:
             status_icon = '🟢' if not session.completada else '✅'
             time_str = session.fecha_inicio.strftime('%H:%M')
-            progreso = session.get_progreso()
+            progreso = session.progreso
             
             self.stdout.write(f'   {status_icon} {time_str} | {session.estudiante.username} | '
                             f'{session.materia.nombre_display} | '
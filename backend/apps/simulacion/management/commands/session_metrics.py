@@ -1,11 +1,7 @@
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from django.db.models import Count, Avg, Sum, Q
-from datetime import timedelta
 import json
 
-from apps.simulacion.models import SesionSimulacion
-from apps.core.models import Materia
+from apps.simulacion.metricas import calcular_metricas
 
 class Command(BaseCommand):
     help = 'Genera métricas y estadísticas de sesiones de simulación'
@@ -34,10 +30,8 @@ class Command(BaseCommand):
         format_type = options['format']
         output_file = options['output']
         
-        start_date = timezone.now() - timedelta(days=days)
-        
         # Recopilar métricas
-        metrics = self.generate_metrics(start_date, days)
+        metrics = self.generate_metrics(days)
         
         # Formatear salida
         if format_type == 'json':
@@ -53,111 +47,46 @@ class Command(BaseCommand):
         else:
             self.stdout.write(output)
 
-    def generate_metrics(self, start_date, days):
+    def generate_metrics(self, days):
         """Genera todas las métricas de sesiones"""
-        
-        # Sesiones en el período
-        sesiones_periodo = SesionSimulacion.objects.filter(
-            fecha_inicio__gte=start_date
-        )
-        
-        # Métricas generales
-        total_sesiones = sesiones_periodo.count()
-        sesiones_completadas = sesiones_periodo.filter(completada=True).count()
-        sesiones_activas = sesiones_periodo.filter(completada=False).count()
-        tasa_finalizacion = (sesiones_completadas / total_sesiones * 100) if total_sesiones > 0 else 0
-        
-        # Métricas por materia
-        materias_stats = {}
-        for materia in Materia.objects.all():
-            sesiones_materia = sesiones_periodo.filter(materia=materia)
-            total_materia = sesiones_materia.count()
-            
-            if total_materia > 0:
-                completadas_materia = sesiones_materia.filter(completada=True).count()
-                promedio_puntuacion = sesiones_materia.filter(
-                    completada=True
-                ).aggregate(avg_score=Avg('puntuacion'))['avg_score'] or 0
-                
-                materias_stats[materia.nombre_display] = {
-                    'total_sesiones': total_materia,
-                    'completadas': completadas_materia,
-                    'activas': total_materia - completadas_materia,
-                    'tasa_finalizacion': (completadas_materia / total_materia * 100),
-                    'promedio_puntuacion': round(promedio_puntuacion, 2)
-                }
-        
-        # Patrones de abandono
-        abandono_stats = self.analyze_abandonment_patterns(sesiones_periodo)
-        
-        # Usuarios más activos
-        usuarios_activos = sesiones_periodo.values(
-            'estudiante__username', 'estudiante__first_name', 'estudiante__last_name'
-        ).annotate(
-            total_sesiones=Count('id'),
-            sesiones_completadas=Count('id', filter=Q(completada=True))
-        ).order_by('-total_sesiones')[:10]
-        
-        # Tiempo promedio de sesión
-        sesiones_con_tiempo = sesiones_periodo.filter(
-            completada=True,
-            fecha_fin__isnull=False
-        )
-        
-        tiempo_promedio = None
-        if sesiones_con_tiempo.exists():
-            tiempos = []
-            for sesion in sesiones_con_tiempo:
-                if sesion.duracion:
-                    tiempos.append(sesion.duracion.total_seconds() / 60)  # en minutos
-            
-            if tiempos:
-                tiempo_promedio = sum(tiempos) / len(tiempos)
-        
+        metricas = calcular_metricas(days)
+        generales = metricas['generales']
+        duracion = generales['duracion_minutos']
+        abandono = metricas['abandono']
+
         return {
             'periodo': {
                 'dias': days,
-                'fecha_inicio': start_date.strftime('%Y-%m-%d %H:%M:%S'),
-                'fecha_fin': timezone.now().strftime('%Y-%m-%d %H:%M:%S')
+                'fecha_inicio': metricas['periodo']['fecha_inicio'].strftime('%Y-%m-%d %H:%M:%S'),
+                'fecha_fin': metricas['periodo']['fecha_fin'].strftime('%Y-%m-%d %H:%M:%S')
             },
             'generales': {
-                'total_sesiones': total_sesiones,
-                'sesiones_completadas': sesiones_completadas,
-                'sesiones_activas': sesiones_activas,
-                'tasa_finalizacion': round(tasa_finalizacion, 2),
-                'tiempo_promedio_minutos': round(tiempo_promedio, 2) if tiempo_promedio else None
+                'total_sesiones': generales['total_sesiones'],
+                'sesiones_completadas': generales['sesiones_completadas'],
+                'sesiones_activas': generales['sesiones_activas'],
+                'tasa_finalizacion': round(generales['tasa_finalizacion'], 2),
+                'tiempo_promedio_minutos': round(duracion, 2) if duracion else None
             },
-            'por_materia': materias_stats,
-            'abandono': abandono_stats,
-            'usuarios_activos': list(usuarios_activos),
-            'timestamp': timezone.now().isoformat()
-        }
-
-    def analyze_abandonment_patterns(self, sesiones):
-        """Analiza patrones de abandono de sesiones"""
-        sesiones_abandonadas = sesiones.filter(completada=False)
-        
-        abandono_por_pregunta = {}
-        total_abandonadas = sesiones_abandonadas.count()
-        
-        if total_abandonadas > 0:
-            for sesion in sesiones_abandonadas:
-                progreso = sesion.get_progreso()
-                pregunta_abandono = progreso['respondidas']
-                
-                if pregunta_abandono not in abandono_por_pregunta:
-                    abandono_por_pregunta[pregunta_abandono] = 0
-                abandono_por_pregunta[pregunta_abandono] += 1
-        
-        # Convertir a porcentajes
-        abandono_porcentajes = {}
-        for pregunta, count in abandono_por_pregunta.items():
-            abandono_porcentajes[f'pregunta_{pregunta}'] = round((count / total_abandonadas * 100), 2)
-        
-        return {
-            'total_abandonadas': total_abandonadas,
-            'por_pregunta': abandono_porcentajes,
-            'pregunta_critica': max(abandono_por_pregunta, key=abandono_por_pregunta.get) if abandono_por_pregunta else None
+            'por_materia': {
+                materia['materia']: {
+                    'total_sesiones': materia['total_sesiones'],
+                    'completadas': materia['completadas'],
+                    'activas': materia['activas'],
+                    'tasa_finalizacion': materia['tasa_finalizacion'],
+                    'promedio_puntuacion': round(materia['promedio_puntuacion'], 2)
+                }
+                for materia in metricas['por_materia']
+            },
+            'abandono': {
+                'total_abandonadas': abandono['total_abandonadas'],
+                'por_pregunta': {
+                    pregunta: round(porcentaje, 2)
+                    for pregunta, porcentaje in abandono['por_pregunta'].items()
+                },
+                'pregunta_critica': abandono['pregunta_critica']
+            },
+            'usuarios_activos': metricas['usuarios_activos'],
+            'timestamp': metricas['timestamp'].isoformat()
         }
 
     def format_text(self, metrics):
@@ -205,10 +134,7 @@ class Command(BaseCommand):
         if metrics['usuarios_activos']:
             output.append(f"\n👥 TOP USUARIOS ACTIVOS:")
             for i, usuario in enumerate(metrics['usuarios_activos'][:5], 1):
-                nombre = f"{usuario['estudiante__first_name']} {usuario['estudiante__last_name']}".strip()
-                if not nombre:
-                    nombre = usuario['estudiante__username']
-                output.append(f"   {i}. {nombre}: {usuario['total_sesiones']} sesiones ({usuario['sesiones_completadas']} completadas)")
+                output.append(f"   {i}. {usuario['nombre_completo']}: {usuario['total_sesiones']} sesiones ({usuario['sesiones_completadas']} completadas)")
         
         output.append(f"\n⏰ Generado: {metrics['timestamp']}")
         
@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q, Sum
+import logging
+
+from apps.simulacion.models import SesionSimulacion
+
+logger = logging.getLogger('simulacion.maintenance')
+
+CONTADORES = ('respondidas', 'total_preguntas', 'correctas', 'tiempo_total')
+
+
+class Command(BaseCommand):
+    help = 'Recalcula y verifica los contadores de progreso de las sesiones de simulación'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Solo reportar sesiones con contadores desalineados, sin corregirlas'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Sesiones por lote de actualización (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        verificar = options['verificar']
+        batch_size = options['batch_size']
+
+        # Valores reales calculados a partir de las preguntas de cada sesión
+        sesiones = SesionSimulacion.objects.annotate(
+            real_respondidas=Count(
+                'preguntas_sesion',
+                filter=Q(preguntas_sesion__respuesta_estudiante__isnull=False)
+            ),
+            real_total_preguntas=Count('preguntas_sesion'),
+            real_correctas=Count(
+                'preguntas_sesion',
+                filter=Q(preguntas_sesion__es_correcta=True)
+            ),
+            real_tiempo_total=Sum('preguntas_sesion__tiempo_respuesta'),
+        ).only('id', *CONTADORES).order_by('id')
+
+        revisadas = 0
+        desalineadas = []
+        for sesion in sesiones.iterator(chunk_size=batch_size):
+            revisadas += 1
+            sesion.real_tiempo_total = sesion.real_tiempo_total or 0
+            diferencias = [
+                campo for campo in CONTADORES
+                if getattr(sesion, campo) != getattr(sesion, f'real_{campo}')
+            ]
+            if not diferencias:
+                continue
+
+            if options['verbosity'] >= 2:
+                detalle = ', '.join(
+                    f'{campo}: {getattr(sesion, campo)} -> {getattr(sesion, f"real_{campo}")}'
+                    for campo in diferencias
+                )
+                self.stdout.write(f'   - Sesión {sesion.id}: {detalle}')
+
+            for campo in CONTADORES:
+                setattr(sesion, campo, getattr(sesion, f'real_{campo}'))
+            desalineadas.append(sesion)
+
+        self.stdout.write(f'🔍 Sesiones revisadas: {revisadas}')
+
+        if not desalineadas:
+            self.stdout.write(self.style.SUCCESS('✅ Todos los contadores están al día'))
+            return
+
+        if verificar:
+            self.stdout.write(
+                self.style.WARNING(f'⚠️  Sesiones con contadores desalineados: {len(desalineadas)}')
+            )
+            return
+
+        SesionSimulacion.objects.bulk_update(desalineadas, CONTADORES, batch_size=batch_size)
+        logger.info(f'Contadores de sesión corregidos: {len(desalineadas)} sesiones')
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Contadores corregidos en {len(desalineadas)} sesiones')
+        )
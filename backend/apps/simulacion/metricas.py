@@ -0,0 +1,145 @@
+"""
+Métricas de sesiones de simulación para un período.
+
+Comparten este motor el endpoint ``metricas`` y el comando
+``session_metrics``. Todo se calcula con agregados en la base de datos (un
+``aggregate`` general, un ``values('materia').annotate(...)`` por materia,
+los usuarios más activos y el abandono por pregunta), así que el número de
+consultas no depende de cuántas materias o sesiones haya.
+
+El resultado se guarda en el cache por ``(dias, bucket)``, donde el bucket es
+la ventana de ``TIEMPO_METRICAS`` segundos en curso; un solo proceso lo
+recalcula al vencer.
+"""
+from datetime import timedelta
+
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from apps.core.cache import obtener_o_calcular
+from .models import SesionSimulacion
+
+CLAVE_METRICAS = 'simulacion:metricas:{}:{}'
+TIEMPO_METRICAS = 60
+LIMITE_USUARIOS_ACTIVOS = 10
+
+
+def _porcentaje(parte, total):
+    return parte / total * 100 if total else 0
+
+
+def _minutos(segundos):
+    return segundos / 60 if segundos is not None else None
+
+
+def _generales(sesiones):
+    completada = Q(completada=True)
+    totales = sesiones.aggregate(
+        total_sesiones=Count('id'),
+        sesiones_completadas=Count('id', filter=completada),
+        tiempo_respuesta=Sum('tiempo_total', filter=completada),
+        duracion_promedio=Avg(
+            ExpressionWrapper(F('fecha_fin') - F('fecha_inicio'), output_field=DurationField()),
+            filter=completada & Q(fecha_fin__isnull=False)
+        ),
+    )
+    total = totales['total_sesiones']
+    completadas = totales['sesiones_completadas']
+    duracion = totales['duracion_promedio']
+    return {
+        'total_sesiones': total,
+        'sesiones_completadas': completadas,
+        'sesiones_activas': total - completadas,
+        'tasa_finalizacion': _porcentaje(completadas, total),
+        # Tiempo efectivo respondiendo, por sesión completada
+        'tiempo_respuesta_minutos': _minutos(
+            (totales['tiempo_respuesta'] or 0) / completadas if completadas else None
+        ),
+        # Tiempo de reloj entre inicio y fin, por sesión completada
+        'duracion_minutos': _minutos(duracion.total_seconds() if duracion else None),
+    }
+
+
+def _por_materia(sesiones):
+    filas = sesiones.values('materia_id', 'materia__nombre_display').annotate(
+        total_sesiones=Count('id'),
+        completadas=Count('id', filter=Q(completada=True)),
+        promedio_puntuacion=Avg('puntuacion', filter=Q(completada=True)),
+    ).order_by('materia_id')
+    return [
+        {
+            'materia': fila['materia__nombre_display'],
+            'total_sesiones': fila['total_sesiones'],
+            'completadas': fila['completadas'],
+            'activas': fila['total_sesiones'] - fila['completadas'],
+            'tasa_finalizacion': _porcentaje(fila['completadas'], fila['total_sesiones']),
+            'promedio_puntuacion': fila['promedio_puntuacion'] or 0,
+        }
+        for fila in filas
+    ]
+
+
+def _usuarios_activos(sesiones):
+    filas = sesiones.filter(estudiante__rol='estudiante').values(
+        'estudiante__username', 'estudiante__first_name', 'estudiante__last_name'
+    ).annotate(
+        total_sesiones=Count('id'),
+        sesiones_completadas=Count('id', filter=Q(completada=True))
+    ).order_by('-total_sesiones', 'estudiante__username')[:LIMITE_USUARIOS_ACTIVOS]
+    return [
+        {
+            'username': fila['estudiante__username'],
+            'nombre_completo': (
+                f"{fila['estudiante__first_name']} {fila['estudiante__last_name']}".strip()
+                or fila['estudiante__username']
+            ),
+            'total_sesiones': fila['total_sesiones'],
+            'sesiones_completadas': fila['sesiones_completadas'],
+            'tasa_finalizacion': _porcentaje(fila['sesiones_completadas'], fila['total_sesiones']),
+        }
+        for fila in filas
+    ]
+
+
+def _abandono(sesiones):
+    """Sesiones sin completar agrupadas por la cantidad de preguntas respondidas"""
+    filas = sesiones.filter(completada=False).values('respondidas').annotate(
+        cantidad=Count('id')
+    ).order_by('respondidas')
+    por_pregunta = {fila['respondidas']: fila['cantidad'] for fila in filas}
+    total = sum(por_pregunta.values())
+    return {
+        'total_abandonadas': total,
+        'por_pregunta': {
+            f'pregunta_{pregunta}': _porcentaje(cantidad, total)
+            for pregunta, cantidad in por_pregunta.items()
+        },
+        'pregunta_critica': max(por_pregunta, key=por_pregunta.get) if por_pregunta else None,
+    }
+
+
+def _calcular(dias, ahora):
+    fecha_inicio = ahora - timedelta(days=dias)
+    sesiones = SesionSimulacion.objects.filter(fecha_inicio__gte=fecha_inicio)
+    return {
+        'periodo': {
+            'dias': dias,
+            'fecha_inicio': fecha_inicio,
+            'fecha_fin': ahora,
+        },
+        'generales': _generales(sesiones),
+        'por_materia': _por_materia(sesiones),
+        'usuarios_activos': _usuarios_activos(sesiones),
+        'abandono': _abandono(sesiones),
+        'timestamp': ahora,
+    }
+
+
+def calcular_metricas(dias=7):
+    """
+    Métricas de las sesiones iniciadas en los últimos ``dias``. Los
+    porcentajes y minutos se retornan sin redondear.
+    """
+    ahora = timezone.now()
+    clave = CLAVE_METRICAS.format(dias, int(ahora.timestamp()) // TIEMPO_METRICAS)
+    return obtener_o_calcular(clave, lambda: _calcular(dias, ahora), TIEMPO_METRICAS)
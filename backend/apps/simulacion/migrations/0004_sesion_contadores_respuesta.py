@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:51
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def poblar_contadores(apps, schema_editor):
+    """Calcula respondidas/total_preguntas de las sesiones existentes"""
+    SesionSimulacion = apps.get_model("simulacion", "SesionSimulacion")
+    conteos = SesionSimulacion.objects.annotate(
+        n_total=Count("preguntas_sesion"),
+        n_respondidas=Count(
+            "preguntas_sesion",
+            filter=Q(preguntas_sesion__respuesta_estudiante__isnull=False),
+        ),
+    ).values_list("id", "n_total", "n_respondidas")
+
+    for sesion_id, total, respondidas in conteos.iterator():
+        SesionSimulacion.objects.filter(pk=sesion_id).update(
+            total_preguntas=total, respondidas=respondidas
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("simulacion", "0003_add_unique_session_constraint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sesionsimulacion",
+            name="respondidas",
+            field=models.IntegerField(default=0, verbose_name="Preguntas Respondidas"),
+        ),
+        migrations.AddField(
+            model_name="sesionsimulacion",
+            name="total_preguntas",
+            field=models.IntegerField(default=0, verbose_name="Total de Preguntas"),
+        ),
+        migrations.AddIndex(
+            model_name="preguntasesion",
+            index=models.Index(
+                fields=["sesion", "orden"], name="preg_sesion_sesion_orden_idx"
+            ),
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:12
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def poblar_contadores(apps, schema_editor):
+    """Calcula correctas/tiempo_total de las sesiones existentes"""
+    SesionSimulacion = apps.get_model("simulacion", "SesionSimulacion")
+    conteos = SesionSimulacion.objects.annotate(
+        n_correctas=Count(
+            "preguntas_sesion", filter=Q(preguntas_sesion__es_correcta=True)
+        ),
+        n_tiempo=Sum("preguntas_sesion__tiempo_respuesta"),
+    ).values_list("id", "n_correctas", "n_tiempo")
+
+    for sesion_id, correctas, tiempo in conteos.iterator():
+        SesionSimulacion.objects.filter(pk=sesion_id).update(
+            correctas=correctas, tiempo_total=tiempo or 0
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("simulacion", "0004_sesion_contadores_respuesta"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sesionsimulacion",
+            name="correctas",
+            field=models.IntegerField(default=0, verbose_name="Respuestas Correctas"),
+        ),
+        migrations.AddField(
+            model_name="sesionsimulacion",
+            name="tiempo_total",
+            field=models.IntegerField(
+                default=0, verbose_name="Tiempo Total (segundos)"
+            ),
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+    ]
@@ -58,6 +58,15 @@ class PlantillaSimulacion(models.Model):
     def __str__(self):
         return f"{self.titulo} ({self.materia.nombre_display})"
 
+def calcular_progreso(respondidas, total):
+    """Progreso de una sesión a partir de sus contadores"""
+    return {
+        'respondidas': respondidas,
+        'total': total,
+        'porcentaje': round((respondidas / total) * 100, 1) if total > 0 else 0
+    }
+
+
 class SesionSimulacion(models.Model):
     """Modelo para sesiones de simulación de estudiantes"""
     estudiante = models.ForeignKey(
@@ -102,6 +111,23 @@ class SesionSimulacion(models.Model):
         default=0,
         verbose_name='Puntuación'
     )
+    # Contadores desnormalizados para responder sin recorrer las preguntas de la sesión
+    respondidas = models.IntegerField(
+        default=0,
+        verbose_name='Preguntas Respondidas'
+    )
+    total_preguntas = models.IntegerField(
+        default=0,
+        verbose_name='Total de Preguntas'
+    )
+    correctas = models.IntegerField(
+        default=0,
+        verbose_name='Respuestas Correctas'
+    )
+    tiempo_total = models.IntegerField(
+        default=0,
+        verbose_name='Tiempo Total (segundos)'
+    )
 
     class Meta:
         verbose_name = 'Sesión de Simulación'
@@ -119,8 +145,17 @@ class SesionSimulacion(models.Model):
     def __str__(self):
         return f"Simulación de {self.estudiante.username} - {self.materia.nombre_display}"
     
+    @property
+    def progreso(self):
+        """Progreso leído de los contadores de la sesión, sin consultas"""
+        return calcular_progreso(self.respondidas, self.total_preguntas)
+
     def get_progreso(self):
-        """Retorna el progreso actual de la sesión"""
+        """
+        Retorna el progreso contando las preguntas de la sesión. Para lecturas
+        frecuentes usar ``progreso``; este método es la referencia con la que
+        ``sincronizar_contadores`` verifica los contadores.
+        """
         total_preguntas = self.preguntas_sesion.count()
         preguntas_respondidas = self.preguntas_sesion.filter(
             respuesta_estudiante__isnull=False
@@ -140,10 +175,26 @@ class SesionSimulacion(models.Model):
     
     def finalizar(self):
         """Marca la sesión como completada y establece fecha de fin"""
+        from django.db import transaction
         from django.utils import timezone
-        self.completada = True
-        self.fecha_fin = timezone.now()
-        self.save()
+        from .signals import sesion_completada
+
+        if self.completada:
+            return
+        with transaction.atomic():
+            # UPDATE condicional: de dos peticiones concurrentes solo una marca
+            # la sesión y envía la señal; tampoco pisa contadores de otra petición
+            fecha_fin = timezone.now()
+            marcada = SesionSimulacion.objects.filter(
+                pk=self.pk, completada=False
+            ).update(completada=True, fecha_fin=fecha_fin)
+            if not marcada:
+                self.refresh_from_db(fields=['completada', 'fecha_fin'])
+                return
+            self.completada = True
+            self.fecha_fin = fecha_fin
+            self.refresh_from_db(fields=['respondidas', 'total_preguntas', 'correctas', 'puntuacion', 'tiempo_total'])
+            sesion_completada.send(sender=SesionSimulacion, sesion=self)
     
     @property
     def duracion(self):
@@ -205,6 +256,9 @@ class PreguntaSesion(models.Model):
         db_table = 'preguntas_sesion'
         ordering = ['orden']
         unique_together = ['sesion', 'pregunta']
+        indexes = [
+            models.Index(fields=['sesion', 'orden'], name='preg_sesion_sesion_orden_idx')
+        ]
 
     def __str__(self):
         return f"Pregunta {self.orden} - Sesión {self.sesion.id}"
\ No newline at end of file
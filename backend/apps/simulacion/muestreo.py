@@ -0,0 +1,169 @@
+"""
+Muestreo de preguntas para sesiones de simulación.
+
+Mantiene en memoria del proceso los IDs de las preguntas activas de cada
+materia, agrupados por dificultad y competencia, para elegir preguntas al
+iniciar una sesión sin pedirle a la base de datos un ``ORDER BY RANDOM()``
+sobre todo el banco.
+
+La invalidación usa la versión del espacio ``ESPACIO_POOL`` en el cache
+(``apps.core.cache``): cada escritura de ``Pregunta`` o ``Competencia``
+incrementa la versión y los pools construidos con una versión anterior se
+descartan en el siguiente sorteo.
+"""
+import random
+import threading
+from collections import defaultdict
+
+from apps.core import cache
+from apps.core.models import Competencia, Pregunta
+
+ESPACIO_POOL = 'simulacion:pool_preguntas'
+
+
+class PoolMateria:
+    """IDs de preguntas activas de una materia y sus agrupaciones"""
+
+    def __init__(self, filas, pesos):
+        self.ids = []
+        self.por_dificultad = defaultdict(list)
+        self.por_competencia = defaultdict(list)
+        for pregunta_id, dificultad, competencia_id in filas:
+            self.ids.append(pregunta_id)
+            self.por_dificultad[dificultad].append(pregunta_id)
+            self.por_competencia[competencia_id].append(pregunta_id)
+        # Peso ICFES por competencia (las preguntas sin competencia no tienen peso)
+        self.pesos = pesos
+
+    def __len__(self):
+        return len(self.ids)
+
+    def candidatos(self, dificultad=None, competencia_id=None):
+        """Lista de IDs que cumplen los filtros (sin copiar cuando no hay filtros)"""
+        if dificultad and competencia_id:
+            en_competencia = set(self.por_competencia.get(competencia_id, ()))
+            return [i for i in self.por_dificultad.get(dificultad, ()) if i in en_competencia]
+        if dificultad:
+            return self.por_dificultad.get(dificultad, [])
+        if competencia_id:
+            return self.por_competencia.get(competencia_id, [])
+        return self.ids
+
+
+def repartir_cuotas(cantidad, estratos):
+    """
+    Reparte ``cantidad`` preguntas entre estratos proporcionalmente a su peso.
+
+    ``estratos`` es un dict ``{clave: (peso, disponibles)}``. Usa el método
+    del mayor residuo y redistribuye el sobrante de los estratos que no tienen
+    suficientes preguntas entre los demás.
+    """
+    asignadas = {clave: 0 for clave in estratos}
+    restante = cantidad
+
+    while restante > 0:
+        abiertos = {
+            clave: peso for clave, (peso, disponibles) in estratos.items()
+            if peso > 0 and asignadas[clave] < disponibles
+        }
+        peso_total = sum(abiertos.values())
+        if not abiertos or peso_total <= 0:
+            break
+
+        cuotas = {clave: restante * peso / peso_total for clave, peso in abiertos.items()}
+        enteras = {clave: int(cuota) for clave, cuota in cuotas.items()}
+        sobrante = restante - sum(enteras.values())
+        for clave in sorted(cuotas, key=lambda c: cuotas[c] - enteras[c], reverse=True)[:sobrante]:
+            enteras[clave] += 1
+
+        repartidas = 0
+        for clave, cuota in enteras.items():
+            capacidad = estratos[clave][1] - asignadas[clave]
+            tomadas = min(cuota, capacidad)
+            asignadas[clave] += tomadas
+            repartidas += tomadas
+        if repartidas == 0:
+            break
+        restante -= repartidas
+
+    return asignadas
+
+
+class PoolPreguntas:
+    """Pool en proceso de IDs de preguntas activas por materia"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = {}
+        self._version = None
+
+    def _construir(self, materia_id):
+        filas = Pregunta.objects.filter(
+            materia_id=materia_id,
+            activa=True
+        ).order_by('id').values_list('id', 'dificultad', 'competencia_id')
+        pesos = {
+            competencia_id: float(peso)
+            for competencia_id, peso in Competencia.objects.filter(
+                materia_id=materia_id
+            ).values_list('id', 'peso_icfes')
+        }
+        return PoolMateria(filas, pesos)
+
+    def obtener(self, materia_id):
+        """Retorna el pool de la materia, reconstruyéndolo si fue invalidado"""
+        version = cache.version(ESPACIO_POOL)
+        with self._lock:
+            if version != self._version:
+                self._pools = {}
+                self._version = version
+            pool = self._pools.get(materia_id)
+
+        if pool is None:
+            pool = self._construir(materia_id)
+            with self._lock:
+                if self._version == version:
+                    self._pools[materia_id] = pool
+        return pool
+
+    def invalidar(self):
+        """Descarta los pools de todos los procesos que comparten el cache"""
+        cache.invalidar(ESPACIO_POOL)
+        with self._lock:
+            self._pools = {}
+            self._version = None
+
+    def muestrear(self, materia_id, cantidad, dificultad=None, competencia_id=None):
+        """Elige hasta ``cantidad`` IDs al azar, sin repetición, en O(cantidad)"""
+        candidatos = self.obtener(materia_id).candidatos(dificultad, competencia_id)
+        return random.sample(candidatos, min(cantidad, len(candidatos)))
+
+    def muestrear_estratificado(self, materia_id, cantidad):
+        """
+        Elige hasta ``cantidad`` IDs repartidos por competencia según
+        ``Competencia.peso_icfes``. Si las competencias con peso no alcanzan,
+        completa con preguntas del resto de la materia.
+        """
+        pool = self.obtener(materia_id)
+        estratos = {
+            competencia_id: (pool.pesos.get(competencia_id, 0), len(ids))
+            for competencia_id, ids in pool.por_competencia.items()
+            if competencia_id is not None
+        }
+
+        seleccion = []
+        for competencia_id, cuota in repartir_cuotas(cantidad, estratos).items():
+            if cuota:
+                seleccion.extend(random.sample(pool.por_competencia[competencia_id], cuota))
+
+        faltantes = min(cantidad, len(pool)) - len(seleccion)
+        if faltantes > 0:
+            elegidas = set(seleccion)
+            restantes = [i for i in pool.ids if i not in elegidas]
+            seleccion.extend(random.sample(restantes, faltantes))
+
+        random.shuffle(seleccion)
+        return seleccion
+
+
+pool_preguntas = PoolPreguntas()
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import PlantillaSimulacion, SesionSimulacion, PreguntaSesion
+from apps.core.models import Materia
 from apps.core.serializers import MateriaSerializer, PreguntaSerializer
 
 class PlantillaSimulacionSerializer(serializers.ModelSerializer):
@@ -43,20 +44,47 @@ class SesionSimulacionSerializer(serializers.ModelSerializer):
         read_only_fields = ['estudiante', 'fecha_inicio', 'fecha_fin', 'completada', 'puntuacion']
 
     def get_progreso(self, obj):
-        total_preguntas = obj.preguntas_sesion.count()
-        respondidas = obj.preguntas_sesion.exclude(respuesta_estudiante=None).count()
+        # Se lee de los contadores de la sesión para no contar filas por cada sesión listada
+        total_preguntas = obj.total_preguntas
+        respondidas = obj.respondidas
         return {
             'total': total_preguntas,
             'respondidas': respondidas,
             'porcentaje': (respondidas / total_preguntas * 100) if total_preguntas > 0 else 0
         }
 
+class MateriaResumenSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Materia
+        fields = ['id', 'nombre', 'nombre_display', 'color', 'icono']
+
+class SesionSimulacionResumenSerializer(serializers.ModelSerializer):
+    """Resumen para el historial: sin preguntas y sin consultas por sesión"""
+    materia = MateriaResumenSerializer(read_only=True)
+    plantilla_titulo = serializers.CharField(source='plantilla.titulo', read_only=True, default=None)
+    progreso = serializers.DictField(read_only=True)
+
+    class Meta:
+        model = SesionSimulacion
+        fields = [
+            'id', 'materia', 'plantilla', 'plantilla_titulo', 'fecha_inicio', 'fecha_fin',
+            'completada', 'puntuacion', 'total_preguntas', 'respondidas', 'correctas', 'progreso'
+        ]
+        read_only_fields = fields
+
 class IniciarSesionSerializer(serializers.Serializer):
     materia = serializers.IntegerField()
     plantilla = serializers.IntegerField(required=False, allow_null=True)
     cantidad_preguntas = serializers.IntegerField(required=False, min_value=5, max_value=50)
     forzar_reinicio = serializers.BooleanField(required=False, default=False)
+    estratificar = serializers.BooleanField(required=False, default=False)
 
 class ResponderPreguntaSerializer(serializers.Serializer):
     respuesta = serializers.CharField(max_length=1)
-    tiempo_respuesta = serializers.IntegerField(min_value=0)
\ No newline at end of file
+    tiempo_respuesta = serializers.IntegerField(min_value=0)
+
+class RespuestaLoteSerializer(ResponderPreguntaSerializer):
+    orden = serializers.IntegerField(min_value=1)
+
+class ResponderLoteSerializer(serializers.Serializer):
+    respuestas = RespuestaLoteSerializer(many=True, allow_empty=False, max_length=50)
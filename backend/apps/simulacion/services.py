@@ -0,0 +1,313 @@
+"""
+Servicios de escritura para sesiones de simulación.
+
+Agrupan las operaciones que tocan varias tablas a la vez (sesión y preguntas
+de la sesión) para que se ejecuten en una sola transacción y con un número
+constante de consultas, sin importar cuántas preguntas tenga la sesión.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Min
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.core.lectura import preguntas_gestion
+from apps.core.serializers import MateriaSerializer
+from .models import SesionSimulacion, PreguntaSesion, calcular_progreso
+from .signals import sesion_completada
+
+
+class SesionCompletadaError(Exception):
+    """La sesión ya fue completada y no acepta más respuestas"""
+
+
+class SinPreguntasPendientesError(Exception):
+    """Todas las preguntas de la sesión ya tienen respuesta"""
+
+
+class RespuestaConcurrenteError(Exception):
+    """Otra petición respondió la misma pregunta o sesión al mismo tiempo"""
+
+
+# Clave de respuestas por sesión: {orden: respuesta_correcta}
+CLAVE_RESPUESTAS_SESION = 'simulacion:sesion:{}:clave_respuestas'
+TIEMPO_CLAVE_RESPUESTAS = 60 * 60 * 6
+
+
+def crear_sesion(estudiante, materia, preguntas, plantilla=None):
+    """
+    Crea la sesión y todos sus vínculos pregunta-sesión en una transacción.
+
+    ``preguntas`` es una lista de instancias de ``Pregunta`` en el orden en
+    que se presentarán. Retorna ``(sesion, preguntas_sesion)``.
+    """
+    with transaction.atomic():
+        sesion = SesionSimulacion.objects.create(
+            estudiante=estudiante,
+            materia=materia,
+            plantilla=plantilla,
+            total_preguntas=len(preguntas)
+        )
+        preguntas_sesion = PreguntaSesion.objects.bulk_create([
+            PreguntaSesion(sesion=sesion, pregunta=pregunta, orden=i + 1)
+            for i, pregunta in enumerate(preguntas)
+        ])
+
+        # Algunos motores no retornan las llaves primarias desde bulk_create
+        if any(ps.pk is None for ps in preguntas_sesion):
+            ids_por_orden = dict(
+                PreguntaSesion.objects.filter(sesion=sesion).values_list('orden', 'id')
+            )
+            for ps in preguntas_sesion:
+                ps.pk = ids_por_orden[ps.orden]
+
+    cache.set(
+        CLAVE_RESPUESTAS_SESION.format(sesion.pk),
+        {ps.orden: ps.pregunta.respuesta_correcta for ps in preguntas_sesion},
+        TIEMPO_CLAVE_RESPUESTAS
+    )
+    return sesion, preguntas_sesion
+
+
+def obtener_clave_respuestas(sesion_id):
+    """Retorna ``{orden: respuesta_correcta}`` de la sesión, desde el cache si existe"""
+    clave_cache = CLAVE_RESPUESTAS_SESION.format(sesion_id)
+    clave = cache.get(clave_cache)
+    if clave is None:
+        clave = dict(
+            PreguntaSesion.objects.filter(sesion_id=sesion_id)
+            .values_list('orden', 'pregunta__respuesta_correcta')
+        )
+        cache.set(clave_cache, clave, TIEMPO_CLAVE_RESPUESTAS)
+    return clave
+
+
+def construir_payload_sesion(sesion, preguntas_sesion, context=None):
+    """
+    Construye la representación de ``SesionSimulacionSerializer`` para una
+    sesión recién creada sin volver a consultar sus preguntas.
+
+    Las preguntas de ``preguntas_sesion`` deben traer ``materia`` y
+    ``competencia`` cargadas (``select_related``).
+    """
+    context = context or {}
+    preguntas_data = preguntas_gestion.desde_instancias(
+        [ps.pregunta for ps in preguntas_sesion], context.get('request')
+    )
+    fecha = serializers.DateTimeField()
+    total = len(preguntas_sesion)
+
+    return {
+        'id': sesion.id,
+        'estudiante': sesion.estudiante_id,
+        'materia': MateriaSerializer(sesion.materia, context=context).data,
+        'plantilla': sesion.plantilla_id,
+        'preguntas_sesion': [
+            {
+                'id': ps.id,
+                'pregunta': pregunta_data,
+                'respuesta_estudiante': ps.respuesta_estudiante,
+                'es_correcta': ps.es_correcta,
+                'tiempo_respuesta': ps.tiempo_respuesta,
+                'orden': ps.orden,
+            }
+            for ps, pregunta_data in zip(preguntas_sesion, preguntas_data)
+        ],
+        'fecha_inicio': fecha.to_representation(sesion.fecha_inicio),
+        'fecha_fin': fecha.to_representation(sesion.fecha_fin) if sesion.fecha_fin else None,
+        'completada': sesion.completada,
+        'puntuacion': sesion.puntuacion,
+        'progreso': {
+            'total': total,
+            'respondidas': 0,
+            'porcentaje': 0,
+        },
+    }
+
+
+def _pregunta_pendiente(sesion):
+    """
+    Retorna la siguiente pregunta sin responder como dict de valores.
+
+    Con los contadores al día la siguiente pregunta es ``respondidas + 1`` y
+    se obtiene por índice; si las respuestas llegaron fuera de orden se
+    recurre a la primera pregunta pendiente por ``orden``.
+    """
+    campos = ('id', 'orden', 'pregunta__respuesta_correcta')
+    pendientes = PreguntaSesion.objects.filter(
+        sesion_id=sesion.pk,
+        respuesta_estudiante__isnull=True
+    )
+    pendiente = pendientes.filter(orden=sesion.respondidas + 1).values(*campos).first()
+    if pendiente is None:
+        pendiente = pendientes.order_by('orden').values(*campos).first()
+    return pendiente
+
+
+def _siguiente_orden(sesion_id):
+    """Primer orden sin responder de la sesión, o ``None`` si no queda ninguno"""
+    return PreguntaSesion.objects.filter(
+        sesion_id=sesion_id,
+        respuesta_estudiante__isnull=True
+    ).aggregate(orden=Min('orden'))['orden']
+
+
+def registrar_respuesta(sesion, respuesta, tiempo_respuesta):
+    """
+    Registra la respuesta a la siguiente pregunta pendiente de la sesión.
+
+    La pregunta y los contadores de la sesión se actualizan con UPDATE
+    condicionales dentro de una transacción, por lo que el costo no depende
+    de la cantidad de preguntas. Actualiza ``sesion`` en memoria y retorna
+    el cambio producido.
+    """
+    if sesion.completada:
+        raise SesionCompletadaError()
+
+    pendiente = _pregunta_pendiente(sesion)
+    if pendiente is None:
+        raise SinPreguntasPendientesError()
+
+    es_correcta = respuesta == pendiente['pregunta__respuesta_correcta']
+    respondidas = sesion.respondidas + 1
+    completada = respondidas >= sesion.total_preguntas
+    fecha_fin = timezone.now() if completada else None
+
+    with transaction.atomic():
+        marcadas = PreguntaSesion.objects.filter(
+            pk=pendiente['id'],
+            respuesta_estudiante__isnull=True
+        ).update(
+            respuesta_estudiante=respuesta,
+            es_correcta=es_correcta,
+            tiempo_respuesta=tiempo_respuesta
+        )
+        actualizadas = SesionSimulacion.objects.filter(
+            pk=sesion.pk,
+            completada=False,
+            respondidas=sesion.respondidas
+        ).update(
+            respondidas=F('respondidas') + 1,
+            correctas=F('correctas') + int(es_correcta),
+            puntuacion=F('puntuacion') + int(es_correcta),
+            tiempo_total=F('tiempo_total') + tiempo_respuesta,
+            completada=completada,
+            fecha_fin=fecha_fin
+        )
+        if not (marcadas and actualizadas):
+            raise RespuestaConcurrenteError()
+
+        sesion.respondidas = respondidas
+        sesion.correctas += int(es_correcta)
+        sesion.puntuacion += int(es_correcta)
+        sesion.tiempo_total += tiempo_respuesta
+        sesion.completada = completada
+        sesion.fecha_fin = fecha_fin
+        if completada:
+            sesion_completada.send(sender=SesionSimulacion, sesion=sesion)
+
+    return {
+        'orden': pendiente['orden'],
+        'es_correcta': es_correcta,
+        'puntuacion': sesion.puntuacion,
+        'completada': completada,
+        'progreso': calcular_progreso(respondidas, sesion.total_preguntas),
+        # Con respuestas en lote fuera de orden no es necesariamente respondidas + 1
+        'siguiente_orden': None if completada else _siguiente_orden(sesion.pk),
+    }
+
+
+def registrar_respuestas_lote(sesion, respuestas):
+    """
+    Registra varias respuestas ``{orden, respuesta, tiempo_respuesta}`` de una
+    sola vez.
+
+    Es idempotente por ``(sesion, orden)``: un orden que ya tiene respuesta se
+    reporta en ``duplicadas`` y no se modifica, de modo que el cliente puede
+    reenviar el lote completo si no recibió la confirmación. Los órdenes se
+    validan contra la clave de respuestas en cache, pero se califica con la
+    respuesta correcta actual de cada pregunta (la misma consulta que trae
+    las pendientes) y se escribe con un solo ``bulk_update``.
+    """
+    if sesion.completada:
+        raise SesionCompletadaError()
+
+    clave = obtener_clave_respuestas(sesion.pk)
+
+    # Si un orden viene repetido en el lote, vale la primera respuesta
+    por_orden = {}
+    no_encontradas = []
+    for item in respuestas:
+        orden = item['orden']
+        if orden not in clave:
+            no_encontradas.append(orden)
+        else:
+            por_orden.setdefault(orden, item)
+
+    with transaction.atomic():
+        bloqueada = SesionSimulacion.objects.select_for_update().only(
+            'id', 'completada', 'respondidas', 'total_preguntas', 'correctas',
+            'puntuacion', 'tiempo_total'
+        ).get(pk=sesion.pk)
+        if bloqueada.completada:
+            raise SesionCompletadaError()
+
+        pendientes = list(PreguntaSesion.objects.filter(
+            sesion_id=sesion.pk,
+            orden__in=por_orden,
+            respuesta_estudiante__isnull=True
+        ).select_related('pregunta').only('id', 'orden', 'pregunta__respuesta_correcta'))
+
+        registradas = []
+        for ps in pendientes:
+            item = por_orden[ps.orden]
+            ps.respuesta_estudiante = item['respuesta']
+            ps.es_correcta = item['respuesta'] == ps.pregunta.respuesta_correcta
+            ps.tiempo_respuesta = item['tiempo_respuesta']
+            registradas.append({'orden': ps.orden, 'es_correcta': ps.es_correcta})
+
+        nuevas_correctas = sum(ps.es_correcta for ps in pendientes)
+        respondidas = bloqueada.respondidas + len(pendientes)
+        correctas = bloqueada.correctas + nuevas_correctas
+        puntuacion = bloqueada.puntuacion + nuevas_correctas
+        tiempo_total = bloqueada.tiempo_total + sum(ps.tiempo_respuesta for ps in pendientes)
+        completada = respondidas >= bloqueada.total_preguntas
+        fecha_fin = timezone.now() if completada else None
+
+        if pendientes:
+            PreguntaSesion.objects.bulk_update(
+                pendientes, ['respuesta_estudiante', 'es_correcta', 'tiempo_respuesta']
+            )
+            SesionSimulacion.objects.filter(pk=sesion.pk).update(
+                respondidas=respondidas,
+                correctas=correctas,
+                puntuacion=puntuacion,
+                tiempo_total=tiempo_total,
+                completada=completada,
+                fecha_fin=fecha_fin
+            )
+
+        sesion.respondidas = respondidas
+        sesion.correctas = correctas
+        sesion.puntuacion = puntuacion
+        sesion.tiempo_total = tiempo_total
+        sesion.completada = completada
+        sesion.fecha_fin = fecha_fin
+        sesion.total_preguntas = bloqueada.total_preguntas
+        if pendientes and completada:
+            sesion_completada.send(sender=SesionSimulacion, sesion=sesion)
+
+    registradas.sort(key=lambda r: r['orden'])
+    nuevas = {r['orden'] for r in registradas}
+
+    siguiente_orden = None if completada else _siguiente_orden(sesion.pk)
+
+    return {
+        'registradas': registradas,
+        'duplicadas': sorted(orden for orden in por_orden if orden not in nuevas),
+        'no_encontradas': sorted(set(no_encontradas)),
+        'puntuacion': puntuacion,
+        'completada': completada,
+        'progreso': calcular_progreso(respondidas, bloqueada.total_preguntas),
+        'siguiente_orden': siguiente_orden,
+    }
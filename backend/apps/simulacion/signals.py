@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from apps.core.models import Pregunta, Competencia, Materia
+from .catalogo import invalidar_materias_disponibles
+from .models import PlantillaSimulacion
+from .muestreo import pool_preguntas
+
+# Se envía (dentro de la transacción) cuando una sesión pasa a completada,
+# con el argumento ``sesion`` y sus contadores al día
+sesion_completada = Signal()
+
+
+@receiver(post_save, sender=Pregunta)
+@receiver(post_delete, sender=Pregunta)
+@receiver(post_save, sender=Competencia)
+@receiver(post_delete, sender=Competencia)
+def invalidar_pool_preguntas(sender, instance, **kwargs):
+    """
+    Invalida el pool de muestreo cuando cambia el banco de preguntas, y de
+    nuevo al confirmar para no servir un pool armado antes de la confirmación
+    """
+    pool_preguntas.invalidar()
+    transaction.on_commit(pool_preguntas.invalidar)
+
+
+@receiver(post_save, sender=PlantillaSimulacion)
+@receiver(post_delete, sender=PlantillaSimulacion)
+@receiver(post_save, sender=Pregunta)
+@receiver(post_delete, sender=Pregunta)
+@receiver(post_save, sender=Materia)
+@receiver(post_delete, sender=Materia)
+def invalidar_catalogo_materias(sender, instance, **kwargs):
+    """
+    Invalida las materias disponibles cacheadas para los estudiantes, y de
+    nuevo al confirmar la transacción para descartar lo que otro proceso
+    haya recalculado entre tanto con datos previos
+    """
+    invalidar_materias_disponibles()
+    transaction.on_commit(invalidar_materias_disponibles)
@@ -0,0 +1,85 @@
+"""
+Tests para materias_disponibles
+
+Cubre:
+- Consultas constantes sin importar cuántas materias haya
+- Catálogo de estudiantes cacheado e invalidado por las señales
+- Filtro de docentes por sus plantillas o preguntas suficientes
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.core.models import Materia, Usuario
+from apps.simulacion.models import PlantillaSimulacion
+from apps.simulacion.test_services import ServiciosSesionBaseTestCase
+
+URL = '/api/simulacion/plantillas/materias_disponibles/'
+
+
+class MateriasDisponiblesTestCase(ServiciosSesionBaseTestCase):
+    """Tests para PlantillaSimulacionViewSet.materias_disponibles"""
+
+    def setUp(self):
+        super().setUp()
+        self.docente = Usuario.objects.create_user(
+            username='docente_catalogo', password='testpass123', rol='docente'
+        )
+        self.plantilla = self.crear_plantilla(self.materia)
+
+    def crear_plantilla(self, materia, **kwargs):
+        return PlantillaSimulacion.objects.create(
+            docente=self.docente, materia=materia, titulo=f'Plantilla {materia.nombre}',
+            cantidad_preguntas=10, **kwargs
+        )
+
+    def consultar(self, usuario):
+        self.client.force_authenticate(user=usuario)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data, len(consultas)
+
+    def test_estudiante_ve_materias_con_plantillas(self):
+        Materia.objects.create(nombre='sin_plantillas', nombre_display='Sin plantillas')
+        data, _ = self.consultar(self.estudiante)
+        self.assertEqual([m['id'] for m in data], [self.materia.id])
+        self.assertEqual(data[0]['preguntas_disponibles'], 40)
+        self.assertEqual(data[0]['plantillas'][0]['id'], self.plantilla.id)
+
+    def test_consultas_constantes_y_cache(self):
+        _, pocas = self.consultar(self.docente)
+        for i in range(3):
+            materia = Materia.objects.create(nombre=f'materia_{i}', nombre_display=f'Materia {i}')
+            self.crear_plantilla(materia)
+        data, muchas = self.consultar(self.docente)
+        self.assertEqual(len(data), 4)
+        self.assertEqual(muchas, pocas)
+
+        self.consultar(self.estudiante)
+        _, cacheadas = self.consultar(self.estudiante)
+        self.assertEqual(cacheadas, 0)
+
+    def test_senales_invalidan_el_catalogo(self):
+        data, _ = self.consultar(self.estudiante)
+        self.assertEqual(len(data[0]['plantillas']), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            nueva = self.crear_plantilla(self.materia)
+        data, _ = self.consultar(self.estudiante)
+        # Como PlantillaSimulacion.Meta.ordering: la más reciente primero
+        self.assertEqual([p['id'] for p in data[0]['plantillas']], [nueva.id, self.plantilla.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.preguntas[0].delete()
+        data, _ = self.consultar(self.estudiante)
+        self.assertEqual(data[0]['preguntas_disponibles'], 39)
+
+    def test_docente_ve_solo_sus_plantillas(self):
+        otro = Usuario.objects.create_user(username='otro_docente', password='testpass123', rol='docente')
+        PlantillaSimulacion.objects.create(docente=otro, materia=self.materia, titulo='Ajena', cantidad_preguntas=5)
+        pocas = Materia.objects.create(nombre='pocas', nombre_display='Pocas preguntas')
+        data, _ = self.consultar(self.docente)
+        self.assertEqual([m['id'] for m in data], [self.materia.id])
+        self.assertEqual([p['id'] for p in data[0]['plantillas']], [self.plantilla.id])
+        self.assertEqual(data[0]['plantillas_disponibles'], 2)
+        self.assertNotIn(pocas.id, [m['id'] for m in data])
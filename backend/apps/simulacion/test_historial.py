@@ -0,0 +1,82 @@
+"""
+Tests para el listado (historial) de sesiones de simulación
+
+Cubre:
+- Resumen sin preguntas y con consultas constantes
+- Paginación por cursor
+- Detalle completo solo en retrieve
+"""
+
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+
+from apps.simulacion.models import SesionSimulacion
+from apps.simulacion.services import crear_sesion
+from apps.simulacion.test_services import ServiciosSesionBaseTestCase
+
+URL = '/api/simulacion/sesiones/'
+
+
+class HistorialSesionesTestCase(ServiciosSesionBaseTestCase):
+    """Tests para SesionSimulacionViewSet.list"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.estudiante)
+
+    def crear_sesiones(self, cantidad):
+        ahora = timezone.now()
+        for i in range(cantidad):
+            sesion = SesionSimulacion.objects.create(
+                estudiante=self.estudiante, materia=self.materia, completada=True,
+                total_preguntas=10, respondidas=10, correctas=7, puntuacion=7
+            )
+            SesionSimulacion.objects.filter(pk=sesion.pk).update(fecha_inicio=ahora - timedelta(hours=i))
+
+    def test_resumen_sin_preguntas(self):
+        self.crear_sesiones(1)
+
+        response = self.client.get(URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sesion = response.data['results'][0]
+        self.assertNotIn('preguntas_sesion', sesion)
+        self.assertEqual(sesion['materia']['nombre_display'], 'Matemáticas')
+        self.assertEqual((sesion['total_preguntas'], sesion['correctas']), (10, 7))
+        self.assertEqual(sesion['progreso']['porcentaje'], 100)
+        self.assertIsNone(sesion['plantilla_titulo'])
+
+    def test_consultas_constantes(self):
+        conteos = []
+        for cantidad in (2, 15):
+            self.crear_sesiones(cantidad)
+            with CaptureQueriesContext(connection) as consultas:
+                self.client.get(URL)
+            conteos.append(len(consultas))
+        self.assertEqual(conteos[0], conteos[1])
+
+    def test_paginacion_por_cursor(self):
+        self.crear_sesiones(5)
+
+        primera = self.client.get(URL, {'page_size': 3})
+        self.assertEqual(len(primera.data['results']), 3)
+        segunda = self.client.get(primera.data['next'])
+
+        ids = [s['id'] for s in primera.data['results'] + segunda.data['results']]
+        self.assertEqual(len(set(ids)), 5)
+        self.assertIsNone(segunda.data['next'])
+        fechas = [s['fecha_inicio'] for s in primera.data['results'] + segunda.data['results']]
+        self.assertEqual(fechas, sorted(fechas, reverse=True))
+
+    def test_retrieve_incluye_preguntas(self):
+        sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:3])
+
+        response = self.client.get(f'{URL}{sesion.id}/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['orden'] for p in response.data['preguntas_sesion']], [1, 2, 3])
+        self.assertIn('retroalimentacion', response.data['preguntas_sesion'][0]['pregunta'])
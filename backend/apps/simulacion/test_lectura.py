@@ -0,0 +1,84 @@
+"""
+Tests para los constructores de solo lectura de sesiones
+
+Cubre:
+- Reanudación de sesión (cargar_sesion) con consultas constantes
+- Modo compacto sin retroalimentación
+- Retroalimentación por pregunta
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.simulacion.lectura import CAMPOS_RETROALIMENTACION
+from apps.simulacion.services import crear_sesion, registrar_respuesta
+from apps.simulacion.test_services import ServiciosSesionBaseTestCase
+
+
+class CargarSesionTestCase(ServiciosSesionBaseTestCase):
+    """Tests para cargar_sesion y retroalimentacion"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.estudiante)
+
+    def test_reanudacion_con_respuestas_existentes(self):
+        sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:4])
+        registrar_respuesta(sesion, 'B', 12)
+        registrar_respuesta(sesion, 'A', 7)
+
+        response = self.client.get(f'/api/simulacion/sesiones/{sesion.id}/cargar_sesion/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['progreso'], {'respondidas': 2, 'total': 4, 'porcentaje': 50.0})
+        self.assertEqual(response.data['siguiente_pregunta_index'], 2)
+        self.assertEqual(
+            [r['es_correcta'] for r in response.data['respuestas_existentes']], [True, False]
+        )
+        primera = response.data['preguntas_sesion'][0]
+        self.assertEqual(primera['id'], self.preguntas[0].id)
+        self.assertEqual(primera['materia'], self.materia.id)
+        self.assertIsNone(primera['competencia'])
+        self.assertEqual(response.data['preguntas_sesion'][1]['competencia'], self.competencia.id)
+        self.assertEqual(primera['respuesta_correcta'], 'B')
+        self.assertEqual(response.data['materia']['nombre'], 'matematicas')
+
+    def test_cargar_sesion_consultas_constantes(self):
+        conteos = []
+        for cantidad in (5, 40):
+            sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:cantidad])
+            with CaptureQueriesContext(connection) as consultas:
+                response = self.client.get(f'/api/simulacion/sesiones/{sesion.id}/cargar_sesion/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['preguntas_sesion']), cantidad)
+            conteos.append(len(consultas))
+            sesion.delete()
+
+        self.assertEqual(conteos[0], conteos[1])
+
+    def test_modo_compacto_omite_retroalimentacion(self):
+        sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:3])
+
+        response = self.client.get(
+            f'/api/simulacion/sesiones/{sesion.id}/cargar_sesion/', {'compacto': 'true'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['compacto'])
+        for pregunta in response.data['preguntas_sesion']:
+            for campo in CAMPOS_RETROALIMENTACION:
+                self.assertNotIn(campo, pregunta)
+            self.assertIn('enunciado', pregunta)
+
+    def test_retroalimentacion_por_orden(self):
+        sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:3])
+        url = f'/api/simulacion/sesiones/{sesion.id}/retroalimentacion/'
+
+        response = self.client.get(url, {'orden': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['pregunta'], self.preguntas[1].id)
+        self.assertEqual(response.data['retroalimentacion'], 'Suma directa')
+
+        self.assertEqual(self.client.get(url, {'orden': 9}).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,107 @@
+"""
+Tests para el motor de métricas de sesiones
+
+Cubre:
+- Totales, por materia, abandono y duración con consultas constantes
+- Memoización por período
+- Endpoint metricas y comando session_metrics sobre el mismo motor
+"""
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+
+from apps.core.models import Materia
+from apps.simulacion.metricas import calcular_metricas
+from apps.simulacion.models import SesionSimulacion
+from apps.simulacion.services import crear_sesion, registrar_respuesta
+from apps.simulacion.test_services import ServiciosSesionBaseTestCase
+
+Usuario = get_user_model()
+
+
+class MetricasSesionesTestCase(ServiciosSesionBaseTestCase):
+    """Tests para calcular_metricas y sus consumidores"""
+
+    def setUp(self):
+        super().setUp()
+        self.lectura = Materia.objects.create(nombre='lectura', nombre_display='Lectura Crítica')
+
+        completa, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:4])
+        for _ in range(4):
+            registrar_respuesta(completa, 'B', 30)
+        inicio = timezone.now() - timedelta(hours=1)
+        SesionSimulacion.objects.filter(pk=completa.pk).update(
+            fecha_inicio=inicio, fecha_fin=inicio + timedelta(minutes=10)
+        )
+
+        abandonada, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[4:8])
+        registrar_respuesta(abandonada, 'A', 5)
+        crear_sesion(self.estudiante, self.lectura, self.preguntas[8:10])
+        cache.clear()
+
+    def test_metricas_generales(self):
+        generales = calcular_metricas(7)['generales']
+
+        self.assertEqual(generales['total_sesiones'], 3)
+        self.assertEqual(generales['sesiones_completadas'], 1)
+        self.assertEqual(generales['sesiones_activas'], 2)
+        self.assertAlmostEqual(generales['tasa_finalizacion'], 100 / 3)
+        self.assertEqual(generales['tiempo_respuesta_minutos'], 2)
+        self.assertAlmostEqual(generales['duracion_minutos'], 10)
+
+    def test_por_materia_y_abandono(self):
+        metricas = calcular_metricas(7)
+
+        matematicas, lectura = metricas['por_materia']
+        self.assertEqual(matematicas['materia'], 'Matemáticas')
+        self.assertEqual((matematicas['total_sesiones'], matematicas['completadas']), (2, 1))
+        self.assertEqual(matematicas['promedio_puntuacion'], 4)
+        self.assertEqual((lectura['total_sesiones'], lectura['activas']), (1, 1))
+        self.assertEqual(metricas['abandono']['por_pregunta'], {'pregunta_0': 50, 'pregunta_1': 50})
+
+    def test_usuarios_activos_solo_estudiantes(self):
+        docente = Usuario.objects.create_user(username='docente_metricas', password='x', rol='docente')
+        for materia in (self.materia, self.lectura):
+            SesionSimulacion.objects.create(estudiante=docente, materia=materia, total_preguntas=1)
+
+        usuarios = calcular_metricas(7)['usuarios_activos']
+
+        self.assertEqual([u['username'] for u in usuarios], [self.estudiante.username])
+
+    def test_consultas_constantes_y_memoizadas(self):
+        with self.assertNumQueries(4):
+            calcular_metricas(7)
+        with self.assertNumQueries(0):
+            calcular_metricas(7)
+        with self.assertNumQueries(4):
+            calcular_metricas(30)
+
+    def test_endpoint_metricas(self):
+        docente = Usuario.objects.create_user(
+            username='docente_metricas', email='docente_metricas@test.com',
+            password='testpass123', rol='docente'
+        )
+        self.client.force_authenticate(user=docente)
+
+        response = self.client.get('/api/simulacion/sesiones/metricas/', {'days': 7})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['generales']['tasa_finalizacion'], 33.3)
+        self.assertEqual(response.data['generales']['tiempo_promedio_minutos'], 2.0)
+        self.assertEqual(len(response.data['por_materia']), 2)
+        self.assertEqual(response.data['estudiantes_activos'][0]['total_sesiones'], 3)
+
+    def test_comando_session_metrics(self):
+        salida = io.StringIO()
+        call_command('session_metrics', '--format', 'json', stdout=salida)
+
+        metricas = json.loads(salida.getvalue())
+        self.assertEqual(metricas['generales']['tiempo_promedio_minutos'], 10.0)
+        self.assertEqual(metricas['por_materia']['Matemáticas']['completadas'], 1)
+        self.assertEqual(metricas['abandono']['pregunta_critica'], 0)
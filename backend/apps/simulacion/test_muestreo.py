@@ -0,0 +1,103 @@
+"""
+Tests para el pool de muestreo de preguntas
+
+Cubre:
+- Sorteo sin repetición y limitado al banco disponible
+- Invalidación al guardar o desactivar preguntas
+- Reparto estratificado según el peso ICFES de las competencias
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.core.models import Materia, Pregunta, Competencia
+from apps.simulacion.muestreo import pool_preguntas, repartir_cuotas
+
+
+class RepartirCuotasTestCase(TestCase):
+    """Tests para el reparto proporcional de cuotas"""
+
+    def test_reparto_proporcional(self):
+        cuotas = repartir_cuotas(10, {'a': (0.6, 50), 'b': (0.4, 50)})
+        self.assertEqual(cuotas, {'a': 6, 'b': 4})
+
+    def test_redistribuye_estratos_sin_capacidad(self):
+        cuotas = repartir_cuotas(10, {'a': (0.9, 2), 'b': (0.1, 50)})
+        self.assertEqual(cuotas, {'a': 2, 'b': 8})
+
+    def test_estratos_sin_peso_no_reciben_cuota(self):
+        cuotas = repartir_cuotas(5, {'a': (0, 50), 'b': (1, 50)})
+        self.assertEqual(cuotas, {'a': 0, 'b': 5})
+
+
+class PoolPreguntasTestCase(TestCase):
+    """Tests para el pool de IDs de preguntas activas"""
+
+    def setUp(self):
+        cache.clear()
+        self.materia = Materia.objects.create(nombre='matematicas', nombre_display='Matemáticas')
+        self.comp_alta = Competencia.objects.create(
+            nombre='razonamiento', materia=self.materia, peso_icfes=0.75
+        )
+        self.comp_baja = Competencia.objects.create(
+            nombre='comunicacion', materia=self.materia, peso_icfes=0.25
+        )
+        self.preguntas = []
+        for i in range(20):
+            self.preguntas.append(Pregunta.objects.create(
+                enunciado=f'Pregunta {i}',
+                opciones={'A': '1', 'B': '2', 'C': '3', 'D': '4'},
+                respuesta_correcta='A',
+                materia=self.materia,
+                competencia=self.comp_alta if i % 2 == 0 else self.comp_baja,
+                dificultad='facil' if i < 5 else 'media'
+            ))
+
+    def test_muestrear_sin_repeticion(self):
+        ids = pool_preguntas.muestrear(self.materia.id, 10)
+        self.assertEqual(len(ids), 10)
+        self.assertEqual(len(set(ids)), 10)
+
+    def test_muestrear_limitado_al_banco(self):
+        ids = pool_preguntas.muestrear(self.materia.id, 50)
+        self.assertEqual(sorted(ids), sorted(p.id for p in self.preguntas))
+
+    def test_muestrear_por_dificultad(self):
+        ids = pool_preguntas.muestrear(self.materia.id, 10, dificultad='facil')
+        self.assertEqual(sorted(ids), sorted(p.id for p in self.preguntas[:5]))
+
+    def test_pool_no_consulta_la_base_de_datos_en_cada_sorteo(self):
+        pool_preguntas.muestrear(self.materia.id, 5)
+        with self.assertNumQueries(0):
+            pool_preguntas.muestrear(self.materia.id, 5)
+
+    def test_invalidacion_al_desactivar_pregunta(self):
+        pool_preguntas.muestrear(self.materia.id, 5)
+        desactivada = self.preguntas[0]
+        desactivada.activa = False
+        desactivada.save()
+
+        ids = pool_preguntas.muestrear(self.materia.id, 50)
+        self.assertEqual(len(ids), 19)
+        self.assertNotIn(desactivada.id, ids)
+
+    def test_confirmar_descarta_el_pool_armado_antes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.preguntas[0].activa = False
+            self.preguntas[0].save()
+            # Otra petición arma el pool antes de la confirmación
+            pool_preguntas.muestrear(self.materia.id, 5)
+        with self.assertNumQueries(2):
+            pool_preguntas.muestrear(self.materia.id, 5)
+
+    def test_muestrear_estratificado_respeta_peso_icfes(self):
+        ids = pool_preguntas.muestrear_estratificado(self.materia.id, 8)
+        competencias = dict(Pregunta.objects.filter(id__in=ids).values_list('id', 'competencia_id'))
+
+        self.assertEqual(len(ids), 8)
+        self.assertEqual(list(competencias.values()).count(self.comp_alta.id), 6)
+        self.assertEqual(list(competencias.values()).count(self.comp_baja.id), 2)
+
+    def test_muestrear_estratificado_completa_con_resto_del_banco(self):
+        ids = pool_preguntas.muestrear_estratificado(self.materia.id, 20)
+        self.assertEqual(sorted(ids), sorted(p.id for p in self.preguntas))
@@ -0,0 +1,338 @@
+"""
+Tests para los servicios de escritura de sesiones
+
+Cubre:
+- Creación de sesión y preguntas con bulk_create
+- Payload precalculado compatible con SesionSimulacionSerializer
+- Costo constante en consultas al iniciar sesión
+- Registro de respuestas con contadores y UPDATE condicionales
+- Registro de respuestas en lote idempotente por orden
+- Contadores de progreso y comando sincronizar_contadores
+"""
+
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core.models import Materia, Pregunta, Competencia
+from apps.simulacion.models import SesionSimulacion, PreguntaSesion
+from apps.simulacion.serializers import SesionSimulacionSerializer
+from apps.simulacion.services import (
+    crear_sesion, construir_payload_sesion, registrar_respuesta, registrar_respuestas_lote,
+    SesionCompletadaError, SinPreguntasPendientesError
+)
+
+Usuario = get_user_model()
+
+
+class ServiciosSesionBaseTestCase(APITestCase):
+    """Datos comunes para los tests de servicios"""
+
+    def setUp(self):
+        cache.clear()
+        self.estudiante = Usuario.objects.create_user(
+            username='estudiante_servicios',
+            email='estudiante_servicios@test.com',
+            password='testpass123',
+            rol='estudiante'
+        )
+        self.materia = Materia.objects.create(nombre='matematicas', nombre_display='Matemáticas')
+        self.competencia = Competencia.objects.create(nombre='razonamiento', materia=self.materia)
+        self.preguntas = [
+            Pregunta.objects.create(
+                enunciado=f'¿Cuánto es {i}+1?',
+                opciones={'A': str(i), 'B': str(i + 1), 'C': str(i + 2), 'D': str(i + 3)},
+                respuesta_correcta='B',
+                retroalimentacion='Suma directa',
+                materia=self.materia,
+                competencia=self.competencia if i % 2 else None
+            )
+            for i in range(40)
+        ]
+
+
+class CrearSesionTestCase(ServiciosSesionBaseTestCase):
+    """Tests para crear_sesion y construir_payload_sesion"""
+
+    def test_crear_sesion_con_orden(self):
+        sesion, preguntas_sesion = crear_sesion(self.estudiante, self.materia, self.preguntas[:5])
+
+        self.assertEqual(len(preguntas_sesion), 5)
+        self.assertTrue(all(ps.pk for ps in preguntas_sesion))
+        self.assertEqual(
+            list(PreguntaSesion.objects.filter(sesion=sesion).values_list('pregunta_id', 'orden')),
+            [(p.id, i + 1) for i, p in enumerate(self.preguntas[:5])]
+        )
+
+    def test_payload_igual_al_serializer(self):
+        preguntas = list(Pregunta.objects.select_related('materia', 'competencia')[:6])
+        sesion, preguntas_sesion = crear_sesion(self.estudiante, self.materia, preguntas)
+
+        payload = construir_payload_sesion(sesion, preguntas_sesion)
+        sesion = SesionSimulacion.objects.get(pk=sesion.pk)
+        self.assertEqual(payload, SesionSimulacionSerializer(sesion).data)
+
+    def test_iniciar_sesion_consultas_constantes(self):
+        self.client.force_authenticate(user=self.estudiante)
+        # Calentar el pool de muestreo
+        self.client.post('/api/simulacion/sesiones/iniciar_sesion/', {
+            'materia': self.materia.id, 'cantidad_preguntas': 5, 'forzar_reinicio': True
+        })
+
+        conteos = []
+        for cantidad in (5, 40):
+            with CaptureQueriesContext(connection) as consultas:
+                response = self.client.post('/api/simulacion/sesiones/iniciar_sesion/', {
+                    'materia': self.materia.id,
+                    'cantidad_preguntas': cantidad,
+                    'forzar_reinicio': True
+                })
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(len(response.data['preguntas_sesion']), cantidad)
+            conteos.append(len(consultas))
+
+        self.assertEqual(conteos[0], conteos[1])
+
+
+class RegistrarRespuestaTestCase(ServiciosSesionBaseTestCase):
+    """Tests para registrar_respuesta y los endpoints de respuesta"""
+
+    def test_registrar_respuesta_actualiza_contadores(self):
+        sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:3])
+
+        resultado = registrar_respuesta(sesion, 'B', 12)
+
+        self.assertEqual(resultado['orden'], 1)
+        self.assertTrue(resultado['es_correcta'])
+        self.assertEqual(resultado['siguiente_orden'], 2)
+        self.assertEqual(resultado['progreso'], {'respondidas': 1, 'total': 3, 'porcentaje': 33.3})
+
+        sesion.refresh_from_db()
+        self.assertEqual(sesion.respondidas, 1)
+        self.assertEqual(sesion.puntuacion, 1)
+        primera = PreguntaSesion.objects.get(sesion=sesion, orden=1)
+        self.assertEqual(primera.respuesta_estudiante, 'B')
+        self.assertEqual(primera.tiempo_respuesta, 12)
+
+    def test_ultima_respuesta_completa_la_sesion(self):
+        sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:2])
+        registrar_respuesta(sesion, 'B', 5)
+        resultado = registrar_respuesta(sesion, 'A', 5)
+
+        self.assertTrue(resultado['completada'])
+        self.assertIsNone(resultado['siguiente_orden'])
+        sesion.refresh_from_db()
+        self.assertTrue(sesion.completada)
+        self.assertIsNotNone(sesion.fecha_fin)
+        self.assertEqual(sesion.puntuacion, 1)
+
+        with self.assertRaises(SesionCompletadaError):
+            registrar_respuesta(sesion, 'B', 5)
+
+    def test_respuesta_fuera_de_orden_usa_primera_pendiente(self):
+        sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:3])
+        PreguntaSesion.objects.filter(sesion=sesion, orden=1).update(respuesta_estudiante='A')
+        sesion.respondidas = 1
+        sesion.save()
+        PreguntaSesion.objects.filter(sesion=sesion, orden=3).update(respuesta_estudiante='A')
+
+        resultado = registrar_respuesta(sesion, 'B', 5)
+        self.assertEqual(resultado['orden'], 2)
+
+    def test_sin_preguntas_pendientes(self):
+        sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:1])
+        PreguntaSesion.objects.filter(sesion=sesion).update(respuesta_estudiante='A')
+
+        with self.assertRaises(SinPreguntasPendientesError):
+            registrar_respuesta(sesion, 'B', 5)
+
+    def test_endpoint_responder_retorna_delta(self):
+        sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:4])
+        self.client.force_authenticate(user=self.estudiante)
+
+        response = self.client.post(
+            f'/api/simulacion/sesiones/{sesion.id}/responder/',
+            {'respuesta': 'b', 'tiempo_respuesta': 20}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('preguntas_sesion', response.data)
+        self.assertTrue(response.data['es_correcta'])
+        self.assertEqual(response.data['siguiente_orden'], 2)
+
+    def test_responder_consultas_constantes(self):
+        self.client.force_authenticate(user=self.estudiante)
+        conteos = []
+        for cantidad in (5, 40):
+            sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:cantidad])
+            with CaptureQueriesContext(connection) as consultas:
+                response = self.client.post(
+                    f'/api/simulacion/sesiones/{sesion.id}/responder/',
+                    {'respuesta': 'B', 'tiempo_respuesta': 10}
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            conteos.append(len(consultas))
+            sesion.delete()
+
+        self.assertEqual(conteos[0], conteos[1])
+
+    def test_responder_pregunta_mantiene_respuesta_completa(self):
+        sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:2])
+        self.client.force_authenticate(user=self.estudiante)
+
+        response = self.client.post(
+            f'/api/simulacion/sesiones/{sesion.id}/responder_pregunta/',
+            {'respuesta': 'B', 'tiempo_respuesta': 10}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['puntuacion'], 1)
+        self.assertEqual(response.data['progreso']['respondidas'], 1)
+        self.assertEqual(len(response.data['preguntas_sesion']), 2)
+
+
+class RegistrarRespuestasLoteTestCase(ServiciosSesionBaseTestCase):
+    """Tests para registrar_respuestas_lote y el endpoint responder_lote"""
+
+    def setUp(self):
+        super().setUp()
+        self.sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:5])
+        self.url = f'/api/simulacion/sesiones/{self.sesion.id}/responder_lote/'
+
+    def test_registra_lote_y_actualiza_contadores(self):
+        resultado = registrar_respuestas_lote(self.sesion, [
+            {'orden': 1, 'respuesta': 'B', 'tiempo_respuesta': 10},
+            {'orden': 2, 'respuesta': 'C', 'tiempo_respuesta': 15},
+            {'orden': 3, 'respuesta': 'B', 'tiempo_respuesta': 8},
+        ])
+
+        self.assertEqual(resultado['registradas'], [
+            {'orden': 1, 'es_correcta': True},
+            {'orden': 2, 'es_correcta': False},
+            {'orden': 3, 'es_correcta': True},
+        ])
+        self.assertEqual(resultado['siguiente_orden'], 4)
+        self.sesion.refresh_from_db()
+        self.assertEqual(self.sesion.respondidas, 3)
+        self.assertEqual(self.sesion.puntuacion, 2)
+
+    def test_reenviar_lote_es_idempotente(self):
+        lote = [
+            {'orden': 1, 'respuesta': 'B', 'tiempo_respuesta': 10},
+            {'orden': 2, 'respuesta': 'B', 'tiempo_respuesta': 10},
+        ]
+        registrar_respuestas_lote(self.sesion, lote)
+        resultado = registrar_respuestas_lote(self.sesion, lote + [
+            {'orden': 3, 'respuesta': 'A', 'tiempo_respuesta': 10},
+        ])
+
+        self.assertEqual(resultado['registradas'], [{'orden': 3, 'es_correcta': False}])
+        self.assertEqual(resultado['duplicadas'], [1, 2])
+        self.sesion.refresh_from_db()
+        self.assertEqual(self.sesion.respondidas, 3)
+        self.assertEqual(self.sesion.puntuacion, 2)
+
+    def test_califica_sin_clave_en_cache(self):
+        cache.clear()
+        resultado = registrar_respuestas_lote(self.sesion, [
+            {'orden': 5, 'respuesta': 'B', 'tiempo_respuesta': 10},
+            {'orden': 9, 'respuesta': 'B', 'tiempo_respuesta': 10},
+        ])
+
+        self.assertEqual(resultado['registradas'], [{'orden': 5, 'es_correcta': True}])
+        self.assertEqual(resultado['no_encontradas'], [9])
+        self.assertEqual(resultado['siguiente_orden'], 1)
+
+    def test_lote_y_respuesta_individual_mezclados(self):
+        registrar_respuestas_lote(self.sesion, [
+            {'orden': 3, 'respuesta': 'B', 'tiempo_respuesta': 10},
+            {'orden': 4, 'respuesta': 'B', 'tiempo_respuesta': 10},
+        ])
+        resultado = registrar_respuesta(self.sesion, 'B', 10)
+
+        self.assertEqual(resultado['orden'], 1)
+        self.assertEqual(resultado['siguiente_orden'], 2)
+
+    def test_califica_con_respuesta_correcta_vigente(self):
+        pregunta = self.preguntas[1]
+        pregunta.respuesta_correcta = 'C'
+        pregunta.save()
+
+        resultado = registrar_respuestas_lote(self.sesion, [
+            {'orden': 2, 'respuesta': 'C', 'tiempo_respuesta': 10},
+        ])
+
+        self.assertEqual(resultado['registradas'], [{'orden': 2, 'es_correcta': True}])
+
+    def test_lote_completo_finaliza_sesion(self):
+        self.client.force_authenticate(user=self.estudiante)
+        response = self.client.post(self.url, {
+            'respuestas': [
+                {'orden': i, 'respuesta': 'b', 'tiempo_respuesta': 5} for i in range(1, 6)
+            ]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['completada'])
+        self.assertEqual(response.data['puntuacion'], 5)
+        self.sesion.refresh_from_db()
+        self.assertTrue(self.sesion.completada)
+        self.assertIsNotNone(self.sesion.fecha_fin)
+
+        response = self.client.post(self.url, {
+            'respuestas': [{'orden': 1, 'respuesta': 'B', 'tiempo_respuesta': 5}]
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_lote_vacio_es_invalido(self):
+        self.client.force_authenticate(user=self.estudiante)
+        response = self.client.post(self.url, {'respuestas': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ContadoresSesionTestCase(ServiciosSesionBaseTestCase):
+    """Tests para los contadores de progreso de la sesión"""
+
+    def test_respuestas_actualizan_todos_los_contadores(self):
+        sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:4])
+        registrar_respuesta(sesion, 'B', 10)
+        registrar_respuesta(sesion, 'C', 15)
+        registrar_respuestas_lote(sesion, [{'orden': 3, 'respuesta': 'B', 'tiempo_respuesta': 5}])
+
+        sesion.refresh_from_db()
+        self.assertEqual(
+            (sesion.respondidas, sesion.total_preguntas, sesion.correctas, sesion.tiempo_total),
+            (3, 4, 2, 30)
+        )
+        with self.assertNumQueries(0):
+            progreso = sesion.progreso
+            progreso_serializer = SesionSimulacionSerializer().get_progreso(sesion)
+        self.assertEqual(progreso, sesion.get_progreso())
+        self.assertEqual(progreso_serializer['respondidas'], 3)
+        self.assertEqual(progreso_serializer['total'], 4)
+
+    def test_sincronizar_contadores_corrige_desalineados(self):
+        sesion, _ = crear_sesion(self.estudiante, self.materia, self.preguntas[:3])
+        registrar_respuesta(sesion, 'B', 10)
+        SesionSimulacion.objects.filter(pk=sesion.pk).update(
+            respondidas=0, total_preguntas=7, correctas=0, tiempo_total=0
+        )
+
+        salida = io.StringIO()
+        call_command('sincronizar_contadores', '--verificar', stdout=salida)
+        self.assertIn('desalineados: 1', salida.getvalue())
+        sesion.refresh_from_db()
+        self.assertEqual(sesion.total_preguntas, 7)
+
+        call_command('sincronizar_contadores', stdout=io.StringIO())
+        sesion.refresh_from_db()
+        self.assertEqual(
+            (sesion.respondidas, sesion.total_preguntas, sesion.correctas, sesion.tiempo_total),
+            (1, 3, 1, 10)
+        )
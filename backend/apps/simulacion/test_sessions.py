@@ -294,6 +294,40 @@ class SesionAPITestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertFalse(response.data['tiene_sesion_activa'])
 
+    def test_verificar_sesion_activa_consultas_constantes(self):
+        """Test que las sesiones activas se leen en una consulta"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.force_authenticate(user=self.estudiante)
+        for materia in (self.materia1, self.materia2):
+            SesionSimulacion.objects.create(
+                estudiante=self.estudiante, materia=materia, total_preguntas=10, respondidas=4
+            )
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get('/api/simulacion/sesiones/verificar_sesion_activa/')
+
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(response.data['sesiones'][0]['progreso']['respondidas'], 4)
+
+    def test_verificar_sesion_activa_etag(self):
+        """Test que If-None-Match responde 304 hasta que cambia el progreso"""
+        self.client.force_authenticate(user=self.estudiante)
+        sesion = SesionSimulacion.objects.create(
+            estudiante=self.estudiante, materia=self.materia1, total_preguntas=10
+        )
+        url = '/api/simulacion/sesiones/verificar_sesion_activa/'
+
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        SesionSimulacion.objects.filter(pk=sesion.pk).update(respondidas=1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
     def test_iniciar_sesion_nueva(self):
         """Test iniciar nueva sesión"""
         self.client.force_authenticate(user=self.estudiante)
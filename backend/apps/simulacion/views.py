@@ -1,20 +1,31 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
-from django.db.models import Q, Count
+from django.utils.http import parse_etags
+from django.db.models import Prefetch
 from django.db.models.functions import Coalesce
 import random
 import logging
 
 from .models import PlantillaSimulacion, SesionSimulacion, PreguntaSesion
 from .serializers import (
-    PlantillaSimulacionSerializer, SesionSimulacionSerializer,
-    IniciarSesionSerializer, ResponderPreguntaSerializer
+    PlantillaSimulacionSerializer, SesionSimulacionSerializer, SesionSimulacionResumenSerializer,
+    IniciarSesionSerializer, ResponderPreguntaSerializer, ResponderLoteSerializer
 )
 from .permissions import EsDocente, SoloEstudiantes
+from .muestreo import pool_preguntas
+from .lectura import construir_reanudacion, etag_sesiones, obtener_retroalimentacion, sesiones_activas
+from .metricas import calcular_metricas
+from .catalogo import materias_disponibles
+from .services import (
+    crear_sesion, construir_payload_sesion, registrar_respuesta, registrar_respuestas_lote,
+    SesionCompletadaError, SinPreguntasPendientesError, RespuestaConcurrenteError
+)
 from apps.core.models import Pregunta, Materia
+from apps.core.lectura import preguntas_gestion
 
 # Logger para sesiones
 logger = logging.getLogger('simulacion.sessions')
@@ -64,93 +75,53 @@ class PlantillaSimulacionViewSet(viewsets.ModelViewSet):
                 materia=plantilla.materia,
                 activa=True
             )[:plantilla.cantidad_preguntas]
-        from apps.core.serializers import PreguntaSerializer
-        serializer = PreguntaSerializer(preguntas, many=True)
-        return Response(serializer.data)
+        return Response(preguntas_gestion.desde_queryset(preguntas))
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def materias_disponibles(self, request):
         """Obtiene las materias que tienen preguntas activas o plantillas disponibles"""
-        print(f"Usuario: {request.user}, Rol: {request.user.rol}")
-        
-        # Base query para materias activas
-        materias = Materia.objects.filter(activa=True).annotate(
-            preguntas_activas=Count(
-                'preguntas',
-                filter=Q(preguntas__activa=True)
-            ),
-            plantillas_disponibles=Count(
-                'plantillas_simulacion',
-                filter=Q(plantillas_simulacion__activa=True),
-                distinct=True
-            )
-        )
-
-        if request.user.rol == 'docente':
-            # Para docentes, mostrar materias donde tienen plantillas o suficientes preguntas
-            materias = materias.filter(
-                Q(preguntas_activas__gte=5) |
-                Q(plantillas_simulacion__activa=True, plantillas_simulacion__docente=request.user)
-            ).distinct()
-        else:
-            # Para estudiantes, mostrar SOLO materias con plantillas activas
-            materias = materias.filter(
-                plantillas_disponibles__gt=0
-            )
+        return Response(materias_disponibles(request.user))
 
-        # Serializar y agregar información de preguntas/plantillas disponibles
-        materias_data = []
-        for materia in materias:
-            preguntas_disponibles = materia.preguntas.filter(activa=True).count()
-
-            # Plantillas visibles según rol
-            if request.user.rol == 'docente':
-                # Para docentes, listar solo sus plantillas activas de la materia
-                plantillas_qs = PlantillaSimulacion.objects.filter(
-                    materia=materia,
-                    activa=True,
-                    docente=request.user,
-                )
-            else:
-                # Para estudiantes, listar todas las plantillas activas de la materia
-                plantillas_qs = PlantillaSimulacion.objects.filter(
-                    materia=materia,
-                    activa=True,
-                )
-
-            plantillas_data = [
-                {
-                    'id': p.id,
-                    'titulo': p.titulo,
-                    'descripcion': p.descripcion,
-                    'cantidad_preguntas': p.cantidad_preguntas,
-                }
-                for p in plantillas_qs
-            ]
-
-            materias_data.append({
-                'id': materia.id,
-                'nombre': materia.nombre,
-                'nombre_display': materia.nombre_display,
-                'color': materia.color,
-                'icono': materia.icono,
-                'descripcion': materia.descripcion,
-                'preguntas_disponibles': preguntas_disponibles,
-                'plantillas_disponibles': materia.plantillas_disponibles,
-                'plantillas': plantillas_data,
-            })
+class PaginacionSesiones(CursorPagination):
+    """Historial por cursor: estable aunque se creen sesiones mientras se pagina"""
+    ordering = ('-fecha_inicio', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
 
-        return Response(materias_data)
 
 class SesionSimulacionViewSet(viewsets.ModelViewSet):
     """ViewSet para sesiones de simulación"""
     queryset = SesionSimulacion.objects.all()
     serializer_class = SesionSimulacionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = PaginacionSesiones
+    # El OrderingFilter global debe entregar al cursor un orden fijo
+    ordering = PaginacionSesiones.ordering
+    ordering_fields = ['fecha_inicio']
 
     def get_queryset(self):
         """Filtrar sesiones por estudiante"""
-        return self.queryset.filter(estudiante=self.request.user)
+        queryset = self.queryset.filter(estudiante=self.request.user)
+        if self.action in ('list', 'cargar_sesion', 'retroalimentacion'):
+            queryset = queryset.select_related('materia', 'plantilla')
+        elif self.action == 'retrieve':
+            queryset = queryset.select_related('materia').prefetch_related(
+                Prefetch(
+                    'preguntas_sesion',
+                    queryset=PreguntaSesion.objects.select_related(
+                        'pregunta__materia', 'pregunta__competencia'
+                    ).order_by('orden')
+                )
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        # El listado es el historial: resumen sin preguntas. El detalle completo
+        # solo se carga en retrieve
+        if self.action == 'list':
+            return SesionSimulacionResumenSerializer
+        return super().get_serializer_class()
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def test_endpoint(self, request):
@@ -261,65 +232,39 @@ class SesionSimulacionViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, SoloEstudiantes])
     def verificar_sesion_activa(self, request):
-        """Verifica sesiones activas del estudiante"""
+        """
+        Verifica sesiones activas del estudiante. Responde con ``ETag`` y
+        ``304`` si el cliente envía ``If-None-Match`` y nada cambió.
+        """
         materia_id = request.query_params.get('materia_id')
-        
+        sesiones = sesiones_activas(request.user, materia_id)
+
         if materia_id:
-            # Verificar sesión activa para materia específica
-            try:
-                materia = Materia.objects.get(pk=materia_id)
-                sesion_activa = SesionSimulacion.get_sesion_activa_por_materia(
-                    request.user, materia
-                )
-                
-                if sesion_activa:
-                    progreso = sesion_activa.get_progreso()
-                    return Response({
-                        'tiene_sesion_activa': True,
-                        'sesion': {
-                            'id': sesion_activa.id,
-                            'materia': sesion_activa.materia.nombre,
-                            'materia_display': sesion_activa.materia.nombre_display,
-                            'materia_id': sesion_activa.materia.id,
-                            'fecha_inicio': sesion_activa.fecha_inicio,
-                            'progreso': progreso
-                        }
-                    })
-                else:
-                    return Response({'tiene_sesion_activa': False})
-                    
-            except Materia.DoesNotExist:
+            if not sesiones and not Materia.objects.filter(pk=materia_id).exists():
                 return Response(
                     {'error': 'Materia no encontrada'},
                     status=status.HTTP_404_NOT_FOUND
                 )
-        else:
-            # Obtener todas las sesiones activas del estudiante
-            sesiones_activas = SesionSimulacion.objects.filter(
-                estudiante=request.user,
-                completada=False
-            ).select_related('materia')
-            
-            if sesiones_activas.exists():
-                sesiones_data = []
-                for sesion in sesiones_activas:
-                    progreso = sesion.get_progreso()
-                    sesiones_data.append({
-                        'id': sesion.id,
-                        'materia': sesion.materia.nombre,
-                        'materia_display': sesion.materia.nombre_display,
-                        'materia_id': sesion.materia.id,
-                        'fecha_inicio': sesion.fecha_inicio,
-                        'progreso': progreso
-                    })
-                
-                return Response({
-                    'tiene_sesiones_activas': True,
-                    'sesiones': sesiones_data,
-                    'count': len(sesiones_data)
-                })
+            if sesiones:
+                data = {'tiene_sesion_activa': True, 'sesion': sesiones[0]}
             else:
-                return Response({'tiene_sesiones_activas': False, 'sesiones': [], 'count': 0})
+                data = {'tiene_sesion_activa': False}
+        else:
+            data = {
+                'tiene_sesiones_activas': bool(sesiones),
+                'sesiones': sesiones,
+                'count': len(sesiones)
+            }
+
+        etag = etag_sesiones(sesiones)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        # El navegador revalida en cada llamada en lugar de reutilizar la copia
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, SoloEstudiantes])
     def iniciar_sesion(self, request):
@@ -348,7 +293,7 @@ class SesionSimulacionViewSet(viewsets.ModelViewSet):
                 logger.info(f"Sesión forzada a reiniciar: ID={sesion_activa.id}, Usuario={request.user.username}, Materia={materia.nombre_display}")
                 sesion_activa.delete()
             else:
-                progreso = sesion_activa.get_progreso()
+                progreso = sesion_activa.progreso
                 return Response({
                     'detail': 'Ya tienes una sesión activa para esta materia',
                     'sesion_activa': {
@@ -367,18 +312,13 @@ class SesionSimulacionViewSet(viewsets.ModelViewSet):
                     activa=True
                 )
 
-            # Crear sesión
-            sesion = SesionSimulacion.objects.create(
-                estudiante=request.user,
-                materia=materia,
-                plantilla=plantilla
-            )
-
-            # Obtener preguntas
-            if plantilla and plantilla.preguntas_especificas.exists():
-                # Si la plantilla define preguntas específicas, usar exactamente esas
-                preguntas = plantilla.preguntas_especificas.all()
-            else:
+            # Obtener preguntas: si la plantilla define preguntas específicas, usar exactamente esas
+            preguntas = []
+            if plantilla:
+                preguntas = list(
+                    plantilla.preguntas_especificas.select_related('materia', 'competencia')
+                )
+            if not preguntas:
                 # Determinar cantidad priorizando: dato del request > cantidad de plantilla > 10 por defecto
                 cantidad = serializer.validated_data.get('cantidad_preguntas')
                 if cantidad is None and plantilla:
@@ -386,22 +326,27 @@ class SesionSimulacionViewSet(viewsets.ModelViewSet):
                 if cantidad is None:
                     cantidad = 10
 
-                preguntas = Pregunta.objects.filter(
-                    materia=materia,
-                    activa=True
-                ).order_by('?')[:cantidad]
-
-            # Crear relaciones pregunta-sesión
-            for i, pregunta in enumerate(preguntas):
-                PreguntaSesion.objects.create(
-                    sesion=sesion,
-                    pregunta=pregunta,
-                    orden=i + 1
-                )
+                # Sortear IDs desde el pool en memoria en lugar de ORDER BY RANDOM()
+                if serializer.validated_data.get('estratificar'):
+                    ids = pool_preguntas.muestrear_estratificado(materia.id, cantidad)
+                else:
+                    ids = pool_preguntas.muestrear(materia.id, cantidad)
+                por_id = Pregunta.objects.filter(activa=True).select_related(
+                    'materia', 'competencia'
+                ).in_bulk(ids)
+                preguntas = [por_id[pregunta_id] for pregunta_id in ids if pregunta_id in por_id]
+
+            # Crear sesión y relaciones pregunta-sesión en una sola transacción
+            sesion, preguntas_sesion = crear_sesion(
+                request.user, materia, preguntas, plantilla=plantilla
+            )
 
-            logger.info(f"Nueva sesión creada: ID={sesion.id}, Usuario={request.user.username}, Materia={materia.nombre_display}, Preguntas={preguntas.count()}")
+            logger.info(f"Nueva sesión creada: ID={sesion.id}, Usuario={request.user.username}, Materia={materia.nombre_display}, Preguntas={len(preguntas_sesion)}")
 
-            return Response(SesionSimulacionSerializer(sesion).data, status=status.HTTP_201_CREATED)
+            return Response(
+                construir_payload_sesion(sesion, preguntas_sesion),
+                status=status.HTTP_201_CREATED
+            )
 
         except Exception as e:
             logger.error(f"Error al crear sesión: {str(e)}")
@@ -410,143 +355,134 @@ class SesionSimulacionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _registrar_respuesta(self, request, sesion):
+        """Valida y registra una respuesta; retorna (resultado, respuesta_error)"""
+        if sesion.completada:
+            return None, Response(
+                {'detail': 'Esta sesión ya está completada'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = ResponderPreguntaSerializer(data=request.data)
+        if not serializer.is_valid():
+            return None, Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            resultado = registrar_respuesta(
+                sesion,
+                serializer.validated_data['respuesta'].upper(),
+                serializer.validated_data['tiempo_respuesta']
+            )
+        except SesionCompletadaError:
+            return None, Response(
+                {'detail': 'Esta sesión ya está completada'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except SinPreguntasPendientesError:
+            return None, Response(
+                {'detail': 'No hay preguntas pendientes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except RespuestaConcurrenteError:
+            return None, Response(
+                {'detail': 'La pregunta ya fue respondida en otra petición, recarga la sesión'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        if resultado['completada']:
+            # Log de finalización de sesión
+            logger.info(f"Sesión completada: ID={sesion.id}, Usuario={request.user.username}, Materia ID={sesion.materia_id}, Puntuación={sesion.puntuacion}")
+
+        return resultado, None
+
     @action(detail=True, methods=['post'])
     def responder_pregunta(self, request, pk=None):
-        """Registra la respuesta a una pregunta"""
+        """Registra la respuesta a una pregunta y retorna la sesión completa"""
+        sesion = self.get_object()
+        resultado, error = self._registrar_respuesta(request, sesion)
+        if error:
+            return error
+        return Response(SesionSimulacionSerializer(sesion).data)
+
+    @action(detail=True, methods=['post'])
+    def responder(self, request, pk=None):
+        """Registra la respuesta a una pregunta y retorna solo el cambio producido"""
+        sesion = self.get_object()
+        resultado, error = self._registrar_respuesta(request, sesion)
+        if error:
+            return error
+        return Response(resultado)
+    
+    @action(detail=True, methods=['post'])
+    def responder_lote(self, request, pk=None):
+        """Registra varias respuestas a la vez; reenviar un orden ya respondido no lo modifica"""
         sesion = self.get_object()
         if sesion.completada:
             return Response(
                 {'detail': 'Esta sesión ya está completada'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        serializer = ResponderPreguntaSerializer(data=request.data)
+
+        serializer = ResponderLoteSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        pregunta_actual = sesion.preguntas_sesion.filter(
-            respuesta_estudiante=None
-        ).order_by('orden').first()
-
-        if not pregunta_actual:
+        respuestas = [
+            dict(item, respuesta=item['respuesta'].upper())
+            for item in serializer.validated_data['respuestas']
+        ]
+        try:
+            resultado = registrar_respuestas_lote(sesion, respuestas)
+        except SesionCompletadaError:
             return Response(
-                {'detail': 'No hay preguntas pendientes'},
+                {'detail': 'Esta sesión ya está completada'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Registrar respuesta
-        respuesta = serializer.validated_data['respuesta'].upper()
-        tiempo = serializer.validated_data['tiempo_respuesta']
-        es_correcta = respuesta == pregunta_actual.pregunta.respuesta_correcta
-
-        pregunta_actual.respuesta_estudiante = respuesta
-        pregunta_actual.es_correcta = es_correcta
-        pregunta_actual.tiempo_respuesta = tiempo
-        pregunta_actual.save()
-
-        # Actualizar puntuación
-        if es_correcta:
-            sesion.puntuacion += 1
-
-        # Verificar si es la última pregunta
-        if not sesion.preguntas_sesion.filter(respuesta_estudiante=None).exists():
-            sesion.completada = True
-            sesion.fecha_fin = timezone.now()
-            
+        if resultado['completada'] and resultado['registradas']:
             # Log de finalización de sesión
-            logger.info(f"Sesión completada: ID={sesion.id}, Usuario={sesion.estudiante.username}, Materia={sesion.materia.nombre_display}, Puntuación={sesion.puntuacion}")
+            logger.info(f"Sesión completada: ID={sesion.id}, Usuario={request.user.username}, Materia ID={sesion.materia_id}, Puntuación={sesion.puntuacion}")
+
+        return Response(resultado)
 
-        sesion.save()
-        return Response(SesionSimulacionSerializer(sesion).data)
-    
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, EsDocente])
     def metricas(self, request):
         """Endpoint para obtener métricas de sesiones para docentes (shape compatible con frontend)"""
-        from django.db.models import Count, Avg, Sum
-        from datetime import timedelta
-        
-        # Parámetros de consulta
         days = int(request.query_params.get('days', 7))
-        fecha_fin = timezone.now()
-        start_date = fecha_fin - timedelta(days=days)
-        
-        sesiones_periodo = SesionSimulacion.objects.filter(fecha_inicio__gte=start_date)
-        completadas_periodo = sesiones_periodo.filter(completada=True)
-        
-        # Métricas generales
-        total_sesiones = sesiones_periodo.count()
-        sesiones_completadas = completadas_periodo.count()
-        sesiones_activas = sesiones_periodo.filter(completada=False).count()
-        tasa_finalizacion = (sesiones_completadas / total_sesiones * 100) if total_sesiones > 0 else 0
-        
-        # Tiempo promedio por sesión (en minutos)
-        from apps.simulacion.models import PreguntaSesion
-        total_tiempo_seg = PreguntaSesion.objects.filter(sesion__in=completadas_periodo).aggregate(total=Sum('tiempo_respuesta'))['total'] or 0
-        tiempo_promedio_min = None
-        if sesiones_completadas > 0:
-            tiempo_promedio_min = round(float(total_tiempo_seg) / sesiones_completadas / 60.0, 1)
-        
-        # Métricas por materia
-        from apps.core.models import Materia
-        por_materia = []
-        for materia in Materia.objects.all():
-            sesiones_materia = sesiones_periodo.filter(materia=materia)
-            total_materia = sesiones_materia.count()
-            if total_materia > 0:
-                completadas_materia = sesiones_materia.filter(completada=True).count()
-                promedio_puntuacion = sesiones_materia.filter(completada=True).aggregate(avg_score=Avg('puntuacion'))['avg_score'] or 0
-                por_materia.append({
-                    'materia': materia.nombre_display,
-                    'total_sesiones': total_materia,
-                    'completadas': completadas_materia,
-                    'activas': total_materia - completadas_materia,
-                    'tasa_finalizacion': round((completadas_materia / total_materia * 100), 1),
-                    'promedio_puntuacion': round(promedio_puntuacion, 2),
-                })
-        
-        # Top estudiantes activos
-        from apps.core.models import Usuario
-        estudiantes_qs = Usuario.objects.filter(
-            rol='estudiante',
-            sesiones_simulacion__fecha_inicio__gte=start_date
-        ).annotate(
-            sesiones_count=Count('sesiones_simulacion'),
-            sesiones_completadas=Count('sesiones_simulacion', filter=Q(sesiones_simulacion__completada=True))
-        ).order_by('-sesiones_count')[:10]
-        estudiantes_activos = []
-        for est in estudiantes_qs:
-            total = est.sesiones_count or 0
-            comp = est.sesiones_completadas or 0
-            tasa = round((comp / total * 100), 1) if total > 0 else 0
-            estudiantes_activos.append({
-                'username': est.username,
-                'nombre_completo': f"{est.first_name} {est.last_name}".strip() or est.username,
-                'total_sesiones': total,
-                'sesiones_completadas': comp,
-                'tasa_finalizacion': tasa,
-            })
-        
+        metricas = calcular_metricas(days)
+        generales = metricas['generales']
+        tiempo_promedio_min = generales['tiempo_respuesta_minutos']
+
         return Response({
-            'periodo': {
-                'dias': days,
-                'fecha_inicio': start_date,
-                'fecha_fin': fecha_fin,
-            },
+            'periodo': metricas['periodo'],
             'generales': {
-                'total_sesiones': total_sesiones,
-                'sesiones_completadas': sesiones_completadas,
-                'sesiones_activas': sesiones_activas,
-                'tasa_finalizacion': round(tasa_finalizacion, 1),
-                'tiempo_promedio_minutos': tiempo_promedio_min,
+                'total_sesiones': generales['total_sesiones'],
+                'sesiones_completadas': generales['sesiones_completadas'],
+                'sesiones_activas': generales['sesiones_activas'],
+                'tasa_finalizacion': round(generales['tasa_finalizacion'], 1),
+                'tiempo_promedio_minutos': round(tiempo_promedio_min, 1) if tiempo_promedio_min is not None else None,
             },
-            'por_materia': por_materia,
-            'estudiantes_activos': estudiantes_activos,
-            'timestamp': fecha_fin,
+            'por_materia': [
+                {
+                    **materia,
+                    'tasa_finalizacion': round(materia['tasa_finalizacion'], 1),
+                    'promedio_puntuacion': round(materia['promedio_puntuacion'], 2),
+                }
+                for materia in metricas['por_materia']
+            ],
+            'estudiantes_activos': [
+                {**usuario, 'tasa_finalizacion': round(usuario['tasa_finalizacion'], 1)}
+                for usuario in metricas['usuarios_activos']
+            ],
+            'timestamp': metricas['timestamp'],
         })
 
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
     def cargar_sesion(self, request, pk=None):
-        """Carga una sesión activa con todas sus preguntas para continuar"""
+        """
+        Carga una sesión activa con todas sus preguntas para continuar.
+        Con ``?compacto=true`` omite la retroalimentación de cada pregunta.
+        """
         sesion = self.get_object()
         
         # Verificar que la sesión pertenece al usuario actual
@@ -563,94 +499,30 @@ class SesionSimulacionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Obtener preguntas con sus respuestas
-        preguntas_sesion = sesion.preguntas_sesion.select_related('pregunta').order_by('orden')
-        
-        # Formatear preguntas para el frontend
-        preguntas_data = []
-        respuestas_data = []
-        siguiente_pregunta_index = None
-        
-        from django.core.files.storage import default_storage
-        for i, ps in enumerate(preguntas_sesion):
-            # Construir URL absoluta de imagen si existe
-            imagen_url = None
-            if ps.pregunta.imagen and getattr(ps.pregunta.imagen, 'name', None):
-                try:
-                    if default_storage.exists(ps.pregunta.imagen.name):
-                        if request:
-                            imagen_url = request.build_absolute_uri(ps.pregunta.imagen.url)
-                        else:
-                            imagen_url = ps.pregunta.imagen.url
-                except Exception:
-                    imagen_url = None
-            pregunta_data = {
-                'id': ps.pregunta.id,
-                'enunciado': ps.pregunta.enunciado,
-                'contexto': ps.pregunta.contexto,
-                'opciones': ps.pregunta.opciones,
-                'imagen_url': imagen_url,
-                # Campos adicionales solicitados para retroalimentación
-                'respuesta_correcta': ps.pregunta.respuesta_correcta,
-                'explicacion': ps.pregunta.explicacion,
-                'estrategias_resolucion': ps.pregunta.estrategias_resolucion,
-                # Campos de apoyo (mejor UX del modal)
-                'retroalimentacion': ps.pregunta.retroalimentacion,
-                'retroalimentacion_estructurada': ps.pregunta.retroalimentacion_estructurada,
-                'explicacion_opciones_incorrectas': ps.pregunta.explicacion_opciones_incorrectas,
-                'dificultad': ps.pregunta.dificultad,
-                'tiempo_estimado': ps.pregunta.tiempo_estimado,
-                'materia': ps.pregunta.materia.id,
-                'competencia': ps.pregunta.competencia.id if ps.pregunta.competencia else None,
-                'tags': ps.pregunta.tags,
-                'orden': ps.orden
-            }
-            preguntas_data.append(pregunta_data)
-            
-            # Si ya fue respondida, agregar a respuestas
-            if ps.respuesta_estudiante:
-                respuestas_data.append({
-                    'pregunta': ps.pregunta.id,
-                    'respuesta': ps.respuesta_estudiante,
-                    'es_correcta': ps.es_correcta,
-                    'tiempo_respuesta': ps.tiempo_respuesta or 0,
-                    'orden': ps.orden
-                })
-            elif siguiente_pregunta_index is None:
-                # Esta es la primera pregunta sin responder
-                siguiente_pregunta_index = i
-        
-        # Si no encontramos pregunta sin responder, ir al final
-        if siguiente_pregunta_index is None:
-            siguiente_pregunta_index = len(preguntas_data) - 1
-        
-        # Calcular progreso
-        progreso = sesion.get_progreso()
-        
-        # Preparar datos de respuesta
-        sesion_data = {
-            'id': sesion.id,
-            'materia': {
-                'id': sesion.materia.id,
-                'nombre': sesion.materia.nombre,
-                'nombre_display': sesion.materia.nombre_display,
-                'color': sesion.materia.color
-            },
-            'plantilla': {
-                'id': sesion.plantilla.id,
-                'titulo': sesion.plantilla.titulo,
-                'descripcion': sesion.plantilla.descripcion
-            } if sesion.plantilla else None,
-            'fecha_inicio': sesion.fecha_inicio,
-            'completada': sesion.completada,
-            'puntuacion': sesion.puntuacion,
-            'progreso': progreso,
-            'preguntas_sesion': preguntas_data,
-            'respuestas_existentes': respuestas_data,
-            'siguiente_pregunta_index': siguiente_pregunta_index,
-            'puede_continuar': True
-        }
+        compacto = request.query_params.get('compacto', '').lower() in ('1', 'true')
+        sesion_data = construir_reanudacion(sesion, request, compacto=compacto)
+        progreso = sesion_data['progreso']
         
         logger.info(f"Sesión cargada para continuar: ID={sesion.id}, Usuario={request.user.username}, Progreso={progreso['porcentaje']}%")
         
-        return Response(sesion_data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(sesion_data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    def retroalimentacion(self, request, pk=None):
+        """Retroalimentación de una pregunta de la sesión (``?orden=N``), para el modo compacto"""
+        sesion = self.get_object()
+        try:
+            orden = int(request.query_params.get('orden', ''))
+        except ValueError:
+            return Response(
+                {'detail': 'Debe indicar el parámetro orden'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        data = obtener_retroalimentacion(sesion, orden)
+        if data is None:
+            return Response(
+                {'detail': 'Pregunta no encontrada en la sesión'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(data)
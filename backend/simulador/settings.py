@@ -11,10 +11,12 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+import tempfile
 import logging.handlers
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -258,10 +260,39 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 # Cache Configuration
-CACHES = {
-    'default': {
+# CACHE_BACKEND elige el cache; con varios workers de gunicorn conviene uno
+# compartido entre procesos:
+#   locmem -> memoria de cada proceso (por defecto, desarrollo)
+#   redis  -> servidor Redis en REDIS_URL
+#   file   -> directorio CACHE_LOCATION compartido por los workers del host
+#   db     -> tabla CACHE_LOCATION (crear con ``manage.py createcachetable``)
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHES_DISPONIBLES = {
+    'locmem': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('REDIS_URL', default='redis://127.0.0.1:6379/1'),
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CACHE_LOCATION', default=os.path.join(tempfile.gettempdir(), 'simulador_cache')),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': config('CACHE_LOCATION', default='cache_simulador'),
+    },
+}
+if CACHE_BACKEND not in CACHES_DISPONIBLES:
+    raise ImproperlyConfigured(
+        f'CACHE_BACKEND debe ser uno de: {", ".join(CACHES_DISPONIBLES)}'
+    )
+CACHES = {
+    'default': {
+        **CACHES_DISPONIBLES[CACHE_BACKEND],
+        'KEY_PREFIX': 'simulador',
     }
 }
 
@@ -379,6 +410,15 @@ CELERY_TIMEZONE = TIME_ZONE
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Importaciones masivas de preguntas: en segundo plano se procesan en hilos
+# del propio proceso (sin broker) y carga_masiva responde 202
+IMPORTACIONES_EN_SEGUNDO_PLANO = config('IMPORTACIONES_EN_SEGUNDO_PLANO', default=True, cast=bool)
+IMPORTACIONES_HILOS = config('IMPORTACIONES_HILOS', default=1, cast=int)
+
+# Gamificación (puntos e insignias): las señales registran eventos y un hilo
+# del proceso los aplica al confirmar la transacción de la request
+GAMIFICACION_EN_SEGUNDO_PLANO = config('GAMIFICACION_EN_SEGUNDO_PLANO', default=True, cast=bool)
+
 # Email Configuration (for development)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 EMAIL_HOST = config('EMAIL_HOST', default='localhost')
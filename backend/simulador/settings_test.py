@@ -74,4 +74,10 @@ USE_TZ = True
 # Password hashers más rápidos para testing
 PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.MD5PasswordHasher',
-]
\ No newline at end of file
+]
+
+# Las importaciones de preguntas se procesan en línea durante los tests
+IMPORTACIONES_EN_SEGUNDO_PLANO = False
+
+# Los eventos de gamificación se aplican en línea durante los tests
+GAMIFICACION_EN_SEGUNDO_PLANO = False
@@ -6,25 +6,45 @@ import Card from '../ui/Card';
 import { useNotifications } from '../../store';
 import { api } from '../../services/api';
 
-interface ResultadoCarga {
-  mensaje: string;
-  total_procesadas: number;
+interface ImportacionPreguntas {
+  id: number;
+  nombre_archivo: string;
+  formato: 'json' | 'ndjson';
+  estado: 'pendiente' | 'procesando' | 'completada' | 'fallida';
+  terminada: boolean;
+  total: number | null;
+  procesadas: number;
   exitosas: number;
   errores: number;
-  detalles: Array<{
-    fila: number;
-    estado: 'exitosa' | 'error';
-    id_pregunta?: number;
-    mensaje: string;
-  }>;
+  mensaje_error: string;
+}
+
+interface DetalleImportacion {
+  fila: number;
+  estado: 'exitosa' | 'advertencia' | 'error';
+  id_pregunta?: number | null;
+  mensaje: string;
 }
 
+interface PaginaDetalles {
+  count: number;
+  next: string | null;
+  results: DetalleImportacion[];
+}
+
+const INTERVALO_CONSULTA_MS = 1500;
+const DETALLES_POR_PAGINA = 500;
+const EXTENSIONES_PERMITIDAS = ['.json', '.ndjson', '.jsonl'];
+
+const esperar = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
 const CargaMasivaPreguntas: React.FC = () => {
   const { user } = useAuth();
   const { addNotification } = useNotifications();
   const [archivo, setArchivo] = useState<File | null>(null);
   const [cargando, setCargando] = useState(false);
-  const [resultado, setResultado] = useState<ResultadoCarga | null>(null);
+  const [resultado, setResultado] = useState<ImportacionPreguntas | null>(null);
+  const [detalles, setDetalles] = useState<PaginaDetalles | null>(null);
   const [mostrarDetalles, setMostrarDetalles] = useState(false);
 
   // Verificar permisos
@@ -42,17 +62,18 @@ const CargaMasivaPreguntas: React.FC = () => {
   const manejarSeleccionArchivo = (event: React.ChangeEvent<HTMLInputElement>) => {
     const archivoSeleccionado = event.target.files?.[0];
     if (archivoSeleccionado) {
-      if (!archivoSeleccionado.name.endsWith('.json')) {
+      if (!EXTENSIONES_PERMITIDAS.some((extension) => archivoSeleccionado.name.endsWith(extension))) {
         addNotification({
           type: 'error',
           title: 'Archivo inválido',
-          message: 'Por favor selecciona un archivo JSON (.json)',
+          message: 'Por favor selecciona un archivo JSON (.json) o NDJSON (.ndjson, .jsonl)',
           duration: 5000,
         });
         return;
       }
       setArchivo(archivoSeleccionado);
       setResultado(null);
+      setDetalles(null);
     }
   };
 
@@ -104,11 +125,28 @@ const CargaMasivaPreguntas: React.FC = () => {
       const formData = new FormData();
       formData.append('archivo', archivo);
 
-      const response = await api.post('/core/preguntas/carga_masiva/', formData);
+      // El servidor responde 202 con la importación; el avance se consulta aparte
+      const response = await api.post<ImportacionPreguntas>('/core/preguntas/carga_masiva/', formData);
+      let data = response.data;
+      setResultado(data);
+      setDetalles(null);
 
-      const data = response.data;
+      while (!data.terminada) {
+        await esperar(INTERVALO_CONSULTA_MS);
+        data = (await api.get<ImportacionPreguntas>(`/core/preguntas/importaciones/${data.id}/`)).data;
+        setResultado(data);
+      }
+
+      if (data.estado === 'fallida') {
+        addNotification({
+          type: 'error',
+          title: 'Error en la carga',
+          message: data.mensaje_error,
+          duration: 5000,
+        });
+        return;
+      }
 
-      setResultado(data);
       addNotification({
         type: data.errores > 0 ? 'warning' : 'success',
         title: 'Carga completada',
@@ -116,10 +154,11 @@ const CargaMasivaPreguntas: React.FC = () => {
         duration: 5000,
       });
     } catch (error: unknown) {
+      const respuesta = (error as AxiosError<{ detail?: string; error?: string }>)?.response?.data;
       addNotification({
         type: 'error',
         title: 'Error en la carga',
-        message: (error as AxiosError<{ detail?: string }>)?.response?.data?.detail || (error instanceof Error ? error.message : 'Error desconocido'),
+        message: respuesta?.error || respuesta?.detail || (error instanceof Error ? error.message : 'Error desconocido'),
         duration: 5000,
       });
     } finally {
@@ -127,6 +166,28 @@ const CargaMasivaPreguntas: React.FC = () => {
     }
   };
 
+  const alternarDetalles = async () => {
+    const mostrar = !mostrarDetalles;
+    setMostrarDetalles(mostrar);
+    if (!mostrar || !resultado || detalles) {
+      return;
+    }
+    try {
+      const response = await api.get<PaginaDetalles>(
+        `/core/preguntas/importaciones/${resultado.id}/detalles/`,
+        { params: { page_size: DETALLES_POR_PAGINA } }
+      );
+      setDetalles(response.data);
+    } catch (error: unknown) {
+      addNotification({
+        type: 'error',
+        title: 'Error',
+        message: error instanceof Error ? error.message : 'No se pudieron cargar los detalles',
+        duration: 5000,
+      });
+    }
+  };
+
   return (
     <div className="space-y-6">
       <Card title="Carga Masiva de Preguntas">
@@ -153,12 +214,12 @@ const CargaMasivaPreguntas: React.FC = () => {
 
           <div>
             <label htmlFor="archivo" className="block text-sm font-medium text-gray-700 mb-2">
-              Seleccionar archivo JSON
+              Seleccionar archivo JSON o NDJSON
             </label>
             <input
               id="archivo"
               type="file"
-              accept=".json"
+              accept=".json,.ndjson,.jsonl"
               onChange={manejarSeleccionArchivo}
               className="block w-full text-sm text-gray-500 
                 file:mr-4 file:py-2 file:px-4 
@@ -183,7 +244,9 @@ const CargaMasivaPreguntas: React.FC = () => {
             {cargando ? (
               <div className="flex items-center justify-center gap-2">
                 <div className="animate-spin rounded-full h-4 w-4 border-b-2 border-white"></div>
-                Procesando...
+                {resultado && resultado.total
+                  ? `Procesando ${resultado.procesadas} de ${resultado.total}...`
+                  : 'Procesando...'}
               </div>
             ) : (
               'Cargar Preguntas'
@@ -210,7 +273,7 @@ const CargaMasivaPreguntas: React.FC = () => {
               </div>
               <div className="bg-blue-50 p-4 rounded-lg">
                 <div className="text-blue-800 font-semibold text-lg">
-                  {resultado.total_procesadas}
+                  {resultado.procesadas}
                 </div>
                 <div className="text-blue-600 text-sm">Total</div>
               </div>
@@ -218,27 +281,35 @@ const CargaMasivaPreguntas: React.FC = () => {
 
             <Button
               variant="secondary"
-              onClick={() => setMostrarDetalles(!mostrarDetalles)}
+              onClick={alternarDetalles}
+              disabled={!resultado.terminada}
               className="w-full"
             >
               {mostrarDetalles ? 'Ocultar' : 'Mostrar'} Detalles
             </Button>
 
-            {mostrarDetalles && (
+            {mostrarDetalles && detalles && (
               <div className="mt-4">
                 <h4 className="font-semibold mb-2">Detalles por pregunta:</h4>
+                {detalles.next && (
+                  <p className="text-xs text-gray-500 mb-2">
+                    Mostrando {detalles.results.length} de {detalles.count} filas
+                  </p>
+                )}
                 <div className="max-h-64 overflow-y-auto space-y-2">
-                  {resultado.detalles.map((detalle, index) => (
+                  {detalles.results.map((detalle, index) => (
                     <div
                       key={index}
                       className={`p-3 rounded-lg text-sm ${
                         detalle.estado === 'exitosa'
                           ? 'bg-green-50 text-green-800'
-                          : 'bg-red-50 text-red-800'
+                          : detalle.estado === 'advertencia'
+                            ? 'bg-yellow-50 text-yellow-800'
+                            : 'bg-red-50 text-red-800'
                       }`}
                     >
                       <div className="font-medium">
-                        Fila {detalle.fila}: {detalle.estado === 'exitosa' ? '✓' : '✗'}
+                        Fila {detalle.fila}: {detalle.estado === 'exitosa' ? '✓' : detalle.estado === 'advertencia' ? '⚠' : '✗'}
                       </div>
                       <div className="text-xs opacity-75">
                         {detalle.mensaje}
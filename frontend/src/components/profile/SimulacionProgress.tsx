@@ -10,16 +10,12 @@ interface SesionActiva {
     id: number;
     nombre_display: string;
   };
-  plantilla?: {
-    titulo: string;
-  };
+  plantilla_titulo: string | null;
   fecha_inicio: string;
   completada: boolean;
   puntuacion: number;
-  preguntas_sesion: Array<{
-    respuesta_estudiante: string | null;
-    es_correcta: boolean | null;
-  }>;
+  total_preguntas: number;
+  respondidas: number;
 }
 
 interface EstadisticasSimulacion {
@@ -55,7 +51,7 @@ const SimulacionProgress: React.FC = () => {
         
         // La respuesta puede ser directa o paginada
         const sesionesData = (response as unknown as { results?: unknown[] }).results || (response as unknown as unknown[]);
-        const sesiones: Array<{ completada: boolean; puntuacion: number; preguntas_sesion?: Array<unknown> }> = Array.isArray(sesionesData) ? sesionesData as Array<{ completada: boolean; puntuacion: number; preguntas_sesion?: Array<unknown> }> : [];
+        const sesiones: Array<{ completada: boolean; puntuacion: number; total_preguntas?: number }> = Array.isArray(sesionesData) ? sesionesData as Array<{ completada: boolean; puntuacion: number; total_preguntas?: number }> : [];
         
         console.log('📊 Sesiones procesadas:', sesiones);
         
@@ -68,13 +64,13 @@ const SimulacionProgress: React.FC = () => {
           const completadas = sesiones.filter((s) => s.completada);
           const promedioPuntuacion = completadas.length > 0 
             ? completadas.reduce((acc: number, s) => {
-                const totalPreguntas = s.preguntas_sesion?.length || 1;
+                const totalPreguntas = s.total_preguntas || 1;
                 return acc + (s.puntuacion / totalPreguntas * 100);
               }, 0) / completadas.length
             : 0;
           const mejorPuntuacion = completadas.length > 0
             ? Math.max(...completadas.map((s) => {
-                const totalPreguntas = s.preguntas_sesion?.length || 1;
+                const totalPreguntas = s.total_preguntas || 1;
                 return s.puntuacion / totalPreguntas * 100;
               }))
             : 0;
@@ -128,9 +124,9 @@ const SimulacionProgress: React.FC = () => {
   }
 
   const calcularProgreso = (sesion: SesionActiva) => {
-    const preguntasRespondidas = sesion.preguntas_sesion.filter(p => p.respuesta_estudiante !== null).length;
-    const totalPreguntas = sesion.preguntas_sesion.length;
-    return { preguntasRespondidas, totalPreguntas, porcentaje: (preguntasRespondidas / totalPreguntas) * 100 };
+    const preguntasRespondidas = sesion.respondidas;
+    const totalPreguntas = sesion.total_preguntas;
+    return { preguntasRespondidas, totalPreguntas, porcentaje: totalPreguntas > 0 ? (preguntasRespondidas / totalPreguntas) * 100 : 0 };
   };
 
   return (
@@ -144,8 +140,8 @@ const SimulacionProgress: React.FC = () => {
                 <h3 className="font-semibold text-lg text-gray-900">
                   {sesionActiva.materia.nombre_display}
                 </h3>
-                {sesionActiva.plantilla && (
-                  <p className="text-sm text-gray-600">{sesionActiva.plantilla.titulo}</p>
+                {sesionActiva.plantilla_titulo && (
+                  <p className="text-sm text-gray-600">{sesionActiva.plantilla_titulo}</p>
                 )}
                 <p className="text-xs text-gray-500">
                   Iniciada: {new Date(sesionActiva.fecha_inicio).toLocaleDateString()}
@@ -154,7 +150,7 @@ const SimulacionProgress: React.FC = () => {
               <div className="text-right">
                 <div className="text-sm text-gray-600">Puntuación actual</div>
                 <div className="text-2xl font-bold text-indigo-600">
-                  {sesionActiva.puntuacion}/{sesionActiva.preguntas_sesion.length}
+                  {sesionActiva.puntuacion}/{sesionActiva.total_preguntas}
                 </div>
               </div>
             </div>
@@ -11,6 +11,7 @@ import RetroalimentacionSimple from './RetroalimentacionSimple';
 import Button from '../ui/Button';
 import Card from '../ui/Card';
 import ImageModal from '../ui/ImageModal';
+import ImagenResponsiva from '../ui/ImagenResponsiva';
 import LoadingSpinner from '../ui/LoadingSpinner';
 import ConfirmDialog from '../ui/ConfirmDialog';
 import IndicePreguntasModal from './IndicePreguntasModal';
@@ -520,8 +521,9 @@ const SimulacionActiva: React.FC = () => {
             {/* Imagen contextual si existe */}
             {preguntaActual.imagen_url && (
               <div className="mb-4">
-                <img
+                <ImagenResponsiva
                   src={preguntaActual.imagen_url}
+                  srcsets={preguntaActual.imagen_srcset}
                   alt="Imagen de contexto"
                   className="w-full max-h-72 object-contain rounded-lg border cursor-zoom-in"
                   onClick={() => setMostrarImagen(true)}
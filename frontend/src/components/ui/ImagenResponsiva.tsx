@@ -0,0 +1,35 @@
+import React from 'react';
+
+// Formatos en orden de preferencia; el navegador usa el primero que soporte
+const TIPOS: Record<string, string> = {
+  avif: 'image/avif',
+  webp: 'image/webp',
+};
+
+interface ImagenResponsivaProps extends React.ImgHTMLAttributes<HTMLImageElement> {
+  src: string;
+  srcsets?: Record<string, string>;
+  sizes?: string;
+}
+
+/**
+ * Imagen con las variantes AVIF/WebP generadas por el backend
+ * (`imagen_srcset`). Sin variantes se comporta como un <img> normal.
+ */
+const ImagenResponsiva: React.FC<ImagenResponsivaProps> = ({
+  src,
+  srcsets,
+  sizes = '(max-width: 768px) 100vw, 768px',
+  ...props
+}) => (
+  <picture>
+    {Object.keys(TIPOS)
+      .filter((formato) => srcsets?.[formato])
+      .map((formato) => (
+        <source key={formato} type={TIPOS[formato]} srcSet={srcsets![formato]} sizes={sizes} />
+      ))}
+    <img src={src} loading="lazy" decoding="async" {...props} />
+  </picture>
+);
+
+export default ImagenResponsiva;
@@ -79,14 +79,14 @@ const SimulacionPage: React.FC = () => {
       // Cargar simulaciones completadas
       const response = await simulacionService.getSesiones();
       const sesionesData = (response as unknown as { results?: unknown[] }).results || (response as unknown as unknown[]);
-      const sesiones: Array<{ completada: boolean; materia: { id: number }; preguntas_sesion?: unknown[]; puntuacion: number }> = Array.isArray(sesionesData) ? sesionesData as Array<{ completada: boolean; materia: { id: number }; preguntas_sesion?: unknown[]; puntuacion: number }> : [];
+      const sesiones: Array<{ completada: boolean; materia: { id: number }; total_preguntas?: number; puntuacion: number }> = Array.isArray(sesionesData) ? sesionesData as Array<{ completada: boolean; materia: { id: number }; total_preguntas?: number; puntuacion: number }> : [];
       
       const simulaciones = sesiones
         .filter((s) => s.completada)
         .map((s) => ({
           materia_id: s.materia.id,
-          total_preguntas: Array.isArray(s.preguntas_sesion) ? s.preguntas_sesion.length : 0,
-          mejor_puntaje: Array.isArray(s.preguntas_sesion) && s.preguntas_sesion.length > 0 ? (s.puntuacion / s.preguntas_sesion.length) * 100 : 0
+          total_preguntas: s.total_preguntas || 0,
+          mejor_puntaje: s.total_preguntas ? (s.puntuacion / s.total_preguntas) * 100 : 0
         }));
       setSimulacionesCompletadas(simulaciones);
     } catch (error) {
@@ -53,6 +53,8 @@ export interface Materia {
   descripcion: string;
   activa: boolean;
   preguntas_count: number;
+  preguntas_activas: number;
+  preguntas_por_dificultad: Record<'facil' | 'media' | 'dificil', number>;
 }
 
 export interface Competencia {
@@ -63,6 +65,8 @@ export interface Competencia {
   descripcion: string;
   peso_icfes: number;
   preguntas_count: number;
+  preguntas_activas: number;
+  preguntas_por_dificultad: Record<'facil' | 'media' | 'dificil', number>;
 }
 
 // Tipos de preguntas
@@ -79,6 +83,7 @@ export interface Pregunta {
   retroalimentacion_estructurada?: string;
   explicacion_opciones_incorrectas?: string;
   imagen_url?: string | null;
+  imagen_srcset?: Record<string, string>;
   retroalimentacion?: string;
   explicacion?: string;
   dificultad: 'facil' | 'media' | 'dificil';